@@ -0,0 +1,91 @@
+"""
+Latency of set_http_data calls made while slow reads of main data are in progress against the local
+simulator. With '--lock-io' every read holds the data lock across the network request, as it did before
+network requests were moved out of the lock.
+
+    python3 benchmarks/contention.py [--lock-io] [latency] [seconds]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "custom_components", "aquaariston"))
+sys.path.insert(0, ROOT)
+
+from aristonaqua import AquaAristonHandler  # noqa: E402
+from tests.simulator import SimulatedApi  # noqa: E402
+
+SET_INTERVAL = 0.05
+
+
+class LockedSession:
+    """Session holding the data lock of the handler during each read."""
+
+    def __init__(self, session, handler):
+        self._session = session
+        self._handler = handler
+
+    def get(self, url, **kwargs):
+        with self._handler._data_lock:
+            return self._session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._session.post(url, **kwargs)
+
+    def close(self):
+        self._session.close()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    lock_io = "--lock-io" in sys.argv
+    latency = float(args[0]) if args else 1.
+    duration = float(args[1]) if len(args) > 1 else 10.
+
+    api = SimulatedApi()
+    handler = AquaAristonHandler(
+        "user", "password", "lydos", sensors=["current_temperature", "required_temperature"],
+        store_folder=tempfile.mkdtemp())
+    handler._session = api.session("ABC123")
+    handler._started = True
+    handler._get_http_data(handler._REQUEST_GET_MAIN)
+    # settings are only stored, nothing is sent to the simulator
+    handler._started = False
+    if lock_io:
+        handler._session = LockedSession(handler._session, handler)
+    api.latency = latency
+
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            handler._get_http_data(handler._REQUEST_GET_MAIN)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    durations = []
+    end = time.monotonic() + duration
+    temperature = 50
+    while time.monotonic() < end:
+        temperature = 101 - temperature
+        started = time.perf_counter()
+        handler.set_http_data(required_temperature=temperature)
+        durations.append(time.perf_counter() - started)
+        time.sleep(SET_INTERVAL)
+    stop.set()
+    reader.join()
+
+    durations.sort()
+    print("read latency {} s, data lock {} network requests".format(
+        latency, "held during" if lock_io else "released for"))
+    print("    {} set calls, {} reads".format(len(durations), api.requests["/api/v2/velis/medPlantData/ABC123"]))
+    print("    median {:.3f} ms, 99th percentile {:.3f} ms, max {:.3f} ms".format(
+        statistics.median(durations) * 1000, durations[int(len(durations) * 0.99)] * 1000, durations[-1] * 1000))
+
+
+if __name__ == "__main__":
+    main()
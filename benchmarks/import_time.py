@@ -0,0 +1,35 @@
+"""
+Import time of the library and constants reported by 'python -X importtime', best of several fresh
+interpreters. 'requests' is the cost that was paid on import before it was deferred to the first handler.
+Modules of Home Assistant platforms are not measured as they need Home Assistant installed.
+
+    python3 benchmarks/import_time.py [repeats]
+"""
+import os
+import subprocess
+import sys
+
+FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "aquaariston")
+MODULES = ("aristonaqua", "const", "requests")
+
+
+def cumulative_time(module):
+    """Return cumulative import time of the module in microseconds."""
+    script = "import sys\nsys.path.append({!r})\nimport {}".format(FOLDER, module)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script], check=True, capture_output=True, text=True).stderr
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise Exception("Module {} not found in import times".format(module))
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for module in MODULES:
+        print("{:<12} {:>8} us".format(module, min(cumulative_time(module) for _ in range(repeats))))
+
+
+if __name__ == "__main__":
+    main()
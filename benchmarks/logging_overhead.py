@@ -0,0 +1,82 @@
+"""
+Logging overhead per poll of main data with 10 handlers at DEBUG level against the local simulator.
+With '--per-instance' a console handler is added to the module logger for each handler, as it was
+before logging was configured once for all handlers. Log output is counted and discarded.
+
+    python3 benchmarks/logging_overhead.py [--per-instance] [polls]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "custom_components", "aquaariston"))
+sys.path.insert(0, ROOT)
+
+import aristonaqua  # noqa: E402
+from tests.simulator import SimulatedApi  # noqa: E402
+
+HANDLERS = 10
+
+
+class CountingStream:
+    """Stream discarding written text while counting lines and characters."""
+
+    def __init__(self):
+        self.lines = 0
+        self.characters = 0
+
+    def write(self, text):
+        self.lines += text.count("\n")
+        self.characters += len(text)
+
+    def flush(self):
+        pass
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    per_instance = "--per-instance" in sys.argv
+    polls = int(args[0]) if args else 1000
+
+    stream = CountingStream()
+    aristonaqua._setup_logging(logging.DEBUG)
+    aristonaqua._LOGGING_HANDLER.setStream(stream)
+    plants = ["PLANT{:02}".format(index) for index in range(HANDLERS)]
+    api = SimulatedApi(plants=plants)
+    handlers = []
+    for plant in plants:
+        handler = aristonaqua.AquaAristonHandler(
+            "user", "password", "lydos", sensors=["current_temperature", "mode"],
+            store_folder=tempfile.mkdtemp(), logging_level="DEBUG")
+        handler._session = api.session(plant)
+        handler._started = True
+        if per_instance and handlers:
+            # the first one is the shared console handler
+            console = logging.StreamHandler(stream)
+            console.setFormatter(aristonaqua._LOGGING_HANDLER.formatter)
+            aristonaqua._LOGGER.addHandler(console)
+        handlers.append(handler)
+    for handler in handlers:
+        handler._control_availability_state(handler._REQUEST_GET_MAIN)
+
+    stream.lines = stream.characters = 0
+    started = time.perf_counter()
+    for poll in range(polls):
+        for plant in plants:
+            # every reply differs, so it is parsed and compared
+            api.main[plant]["temp"] = 40 + poll % 10
+        for handler in handlers:
+            handler._control_availability_state(handler._REQUEST_GET_MAIN)
+    elapsed = time.perf_counter() - started
+
+    print("{} handlers at DEBUG, {} console handlers".format(
+        HANDLERS, len(aristonaqua._LOGGER.handlers)))
+    print("    per poll of all handlers: {:.3f} ms, {:.1f} lines, {:.0f} characters written".format(
+        elapsed / polls * 1000, stream.lines / polls, stream.characters / polls))
+
+
+if __name__ == "__main__":
+    main()
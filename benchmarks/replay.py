@@ -0,0 +1,63 @@
+"""
+CPU time per poll of main data over a replayed day against the local simulator, with replies identical
+to the last accepted one skipped by their hash compared to every reply being parsed. Main data is polled
+every 20 s and the heater changes its temperature or heating state on average every 10 minutes.
+
+    python3 benchmarks/replay.py [days]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "custom_components", "aquaariston"))
+sys.path.insert(0, ROOT)
+
+from aristonaqua import AquaAristonHandler  # noqa: E402
+from tests.simulator import SimulatedApi  # noqa: E402
+
+POLLS_PER_DAY = 24 * 3600 // 20
+CHANGE_PROBABILITY = 20 / 600
+
+
+def replay(polls, fast_path):
+    """Return CPU time per poll and number of changed replies."""
+    changes = random.Random(0)
+    api = SimulatedApi()
+    handler = AquaAristonHandler(
+        "user", "password", "velis", sensors=["current_temperature", "mode", "heating", "showers"],
+        store_folder=tempfile.mkdtemp())
+    handler._session = api.session("ABC123")
+    handler._started = True
+    handler._control_availability_state(handler._REQUEST_GET_MAIN)
+    main = api.main["ABC123"]
+    changed = 0
+    cpu = 0.
+    for _ in range(polls):
+        if changes.random() < CHANGE_PROBABILITY:
+            changed += 1
+            if changes.random() < 0.8:
+                main["temp"] = changes.randint(35, 55)
+            else:
+                main["heatReq"] = not main["heatReq"]
+        if not fast_path:
+            handler._body_hashes.clear()
+        started = time.process_time()
+        handler._control_availability_state(handler._REQUEST_GET_MAIN)
+        cpu += time.process_time() - started
+    return cpu / polls, changed
+
+
+def main():
+    polls = int(float(sys.argv[1]) * POLLS_PER_DAY) if len(sys.argv) > 1 else POLLS_PER_DAY
+    parsed, changed = replay(polls, False)
+    skipped, _ = replay(polls, True)
+    print("{} polls, {} changed replies".format(polls, changed))
+    print("    every reply parsed {:.1f} us, identical replies skipped {:.1f} us CPU per poll".format(
+        parsed * 1e6, skipped * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Simulation of data freshness against number of requests for the deadline scheduler compared to the
+former rotation of high and low priority lists, one request at most per tick of default polling.
+
+    python3 benchmarks/scheduler.py [hours]
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "aquaariston"))
+
+from aristonaqua import AquaAristonHandler, _DeadlineScheduler  # noqa: E402
+
+TICK = AquaAristonHandler._HTTP_PARAM_DELAY
+HIGH_PRIORITY = ["_get_main", "_get_showers", "_get_cleanse", "_get_error"]
+LOW_PRIORITY = ["_get_time_prog", "_get_use", "_get_version"]
+
+
+def rotation(duration):
+    """Former scheme: high priority list with one slot reserved for the next low priority request."""
+    log = []
+    high = low = 0
+    tick = 0.
+    while tick < duration:
+        if high < len(HIGH_PRIORITY):
+            log.append((tick, HIGH_PRIORITY[high]))
+            high += 1
+        elif high > len(HIGH_PRIORITY):
+            high = 0
+        else:
+            high += 1
+            log.append((tick, LOW_PRIORITY[low]))
+            low = (low + 1) % len(LOW_PRIORITY)
+        tick += TICK
+    return log
+
+
+def deadlines(duration):
+    """Deadline scheduler with maximum age and weight of the endpoint registry."""
+    scheduler = _DeadlineScheduler()
+    for request, endpoint in AquaAristonHandler._ENDPOINTS.items():
+        if endpoint.max_age is not None:
+            scheduler.add(request, endpoint.max_age, endpoint.weight)
+    log = []
+    tick = 0.
+    while tick < duration:
+        request = scheduler.next(tick)
+        if request is not None:
+            log.append((tick, request))
+        tick += TICK
+    return log
+
+
+def report(name, log):
+    print("{}: {} requests".format(name, len(log)))
+    for request in HIGH_PRIORITY + LOW_PRIORITY:
+        ticks = [tick for tick, logged in log if logged == request]
+        gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+        print("    {:<16} {:>5} requests, longest gap {:>7} s".format(
+            request, len(ticks), max(gaps) if gaps else "-"))
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 6.
+    report("rotation", rotation(hours * 3600))
+    report("deadlines", deadlines(hours * 3600))
+
+
+if __name__ == "__main__":
+    main()
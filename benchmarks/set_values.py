@@ -0,0 +1,60 @@
+"""
+Cost of reading allowed values to be set as entities do on each update, shared dictionary of
+'supported_sensors_set_values' compared to building it on each read, with data from the local simulator.
+
+    python3 benchmarks/set_values.py [reads]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "custom_components", "aquaariston"))
+sys.path.insert(0, ROOT)
+
+from aristonaqua import AquaAristonHandler  # noqa: E402
+from tests.simulator import SimulatedApi  # noqa: E402
+
+# water heater entity reads allowed values for min_temp, max_temp, target_temperature_step,
+# extra_state_attributes and operation_list
+READS_PER_UPDATE = 5
+
+
+def handler_with_data(boiler_type, requests):
+    api = SimulatedApi()
+    handler = AquaAristonHandler(
+        "user", "password", boiler_type, sensors=["mode", "required_temperature", "required_showers"],
+        store_folder=tempfile.mkdtemp())
+    handler._session = api.session("ABC123")
+    handler._started = True
+    for request in requests:
+        handler._get_http_data(request)
+    return handler
+
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    heaters = {
+        "velis": handler_with_data("velis", ["_get_main", "_get_showers"]),
+        "lydos_hybrid": handler_with_data("lydos_hybrid", ["_get_main", "_get_cleanse"]),
+    }
+    for boiler_type, handler in heaters.items():
+        assert handler.supported_sensors_set_values == handler._build_set_values()
+
+        def shared():
+            for _ in range(READS_PER_UPDATE):
+                handler.supported_sensors_set_values
+
+        def built():
+            for _ in range(READS_PER_UPDATE):
+                handler._build_set_values()
+
+        shared_time = min(timeit.repeat(shared, number=updates, repeat=3)) / updates
+        built_time = min(timeit.repeat(built, number=updates, repeat=3)) / updates
+        print("{}: {} reads per entity update".format(boiler_type, READS_PER_UPDATE))
+        print("    shared {:.2f} us, built on each read {:.2f} us".format(shared_time * 1e6, built_time * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput of the sharded runtime against the local simulator. Each heater has its own account, so heaters
+are spread over all workers. Handlers of the workers poll main data back to back with every reply changed,
+changes of sensors are sent to the parent process and delivered to a subscriber there, which counts them.
+Scaling is bounded by CPUs of the host, numbers of workers above it show no gain.
+
+    python3 benchmarks/sharding_scaling.py [heaters] [seconds]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "custom_components", "aquaariston"))
+sys.path.insert(0, ROOT)
+
+from sharding import ShardedAquaAriston  # noqa: E402
+from tests.simulator import simulated_handler  # noqa: E402
+
+PROCESSES = (1, 2, 4)
+WARM_UP = 2.
+
+
+def busy_handler(plant_id="ABC123", **config):
+    """Handler polling main data back to back from start to stop instead of by its timers."""
+    handler = simulated_handler(plant_id, **config)
+    main = handler._session.api.main[plant_id]
+    stopped = threading.Event()
+
+    def poll():
+        polls = 0
+        while not stopped.is_set():
+            main["temp"] = 40 + polls % 10
+            handler._control_availability_state(handler._REQUEST_GET_MAIN)
+            polls += 1
+
+    poller = threading.Thread(target=poll, daemon=True)
+
+    def start():
+        handler._started = True
+        poller.start()
+
+    def stop():
+        stopped.set()
+        poller.join()
+
+    handler.start = start
+    handler.stop = stop
+    return handler
+
+
+def run(processes, heaters, duration, store_folder):
+    config = {
+        "HEATER{:03}".format(index): dict(
+            username="user{:03}".format(index), password="password", boiler_type="lydos",
+            plant_id="PLANT{:03}".format(index), sensors=["current_temperature"], store_folder=store_folder)
+        for index in range(heaters)
+    }
+    lock = threading.Lock()
+    delivered = [0]
+
+    def count(name, changed_data):
+        with lock:
+            delivered[0] += 1
+
+    sharded = ShardedAquaAriston(config, processes=processes, factory=busy_handler)
+    sharded.subscribe_sensors(count)
+    sharded.start()
+    try:
+        time.sleep(WARM_UP)
+        with lock:
+            first = delivered[0]
+        time.sleep(duration)
+        with lock:
+            last = delivered[0]
+    finally:
+        sharded.stop()
+    return (last - first) / duration
+
+
+def main():
+    heaters = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.
+    store_folder = tempfile.mkdtemp()
+    print("{} heaters, {} CPUs".format(heaters, multiprocessing.cpu_count()))
+    single = None
+    for processes in PROCESSES:
+        rate = run(processes, heaters, duration, store_folder)
+        single = single or rate
+        print("    {} workers: {:.0f} changes delivered/s, {:.2f}x".format(processes, rate, rate / single))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
 """Suppoort for Ariston Aqua."""
+import asyncio
 import logging
+from functools import partial
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR
-from homeassistant.components.sensor import DOMAIN as SENSOR
-from homeassistant.components.switch import DOMAIN as SWITCH
-from homeassistant.components.select import DOMAIN as SELECT
-from homeassistant.components.water_heater import DOMAIN as WATER_HEATER
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
 from homeassistant.const import (
-    ATTR_ENTITY_ID,
     CONF_BINARY_SENSORS,
     CONF_NAME,
     CONF_PASSWORD,
@@ -18,12 +18,13 @@ from homeassistant.const import (
     CONF_SELECTOR,
     CONF_USERNAME,
 )
-from homeassistant.helpers import discovery
 
 from .aristonaqua import AquaAristonHandler
-
-from .binary_sensor import BINARY_SENSORS
 from .const import (
+    BINARY_SENSORS,
+    SENSORS,
+    SWITCHES,
+    SELECTS,
     DOMAIN,
     DATA_ARISTONAQUA,
     DEVICES,
@@ -36,6 +37,8 @@ from .const import (
     CONF_LOG,
     CONF_PATH,
     CONF_GW,
+    CONF_HEDGING,
+    CONF_FLEET_READ,
     VALUE,
     PARAM_MODE,
     PARAM_ECO,
@@ -49,9 +52,13 @@ from .const import (
     TYPE_LYDOS_HYBRID,
     TYPE_VELIS,
 )
-from .sensor import SENSORS
-from .switch import SWITCHES
-from .select import SELECTS
+
+# platform domains, platform modules are only imported by Home Assistant when loaded
+BINARY_SENSOR = "binary_sensor"
+SENSOR = "sensor"
+SWITCH = "switch"
+SELECT = "select"
+WATER_HEATER = "water_heater"
 
 DEFAULT_NAME = "Aqua Ariston"
 DEFAULT_MAX_RETRIES = 5
@@ -83,6 +90,8 @@ ARISTONAQUA_SCHEMA = vol.Schema(
             ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"]
         ),
         vol.Optional(CONF_PATH, default="/config/aquaariston_http_data"): cv.string,
+        vol.Optional(CONF_HEDGING, default=False): cv.boolean,
+        vol.Optional(CONF_FLEET_READ, default=False): cv.boolean,
     }
 )
 
@@ -93,6 +102,19 @@ def _has_unique_names(devices):
     return devices
 
 
+SERVICE_PARAMETERS = [
+    PARAM_MODE,
+    PARAM_ON,
+    PARAM_REQUIRED_TEMPERATURE,
+    PARAM_CLEANSE_TEMPERATURE,
+    PARAM_ECO,
+    PARAM_REQUIRED_SHOWERS,
+]
+
+SERVICE_SET_DATA_SCHEMA = cv.make_entity_service_schema(
+    {vol.Optional(parameter): cv.string for parameter in SERVICE_PARAMETERS}
+)
+
 CONFIG_SCHEMA = vol.Schema(
     {DOMAIN: vol.All(cv.ensure_list, [ARISTONAQUA_SCHEMA], _has_unique_names)},
     extra=vol.ALLOW_EXTRA,
@@ -118,7 +140,9 @@ class AristonAquaChecker:
         polling,
         logging,
         path,
-        gw
+        gw,
+        hedging,
+        fleet_read
     ):
         """Initialize."""
 
@@ -151,168 +175,140 @@ class AristonAquaChecker:
             polling=polling,
             logging_level=logging,
             store_folder=path,
-            gw=gw
+            gw=gw,
+            hedging=hedging,
+            fleet_read=fleet_read
         )
 
 
-def setup(hass, config):
-    """Set up the Ariston Aqua component."""
-    if DOMAIN not in config:
-        return True
-    hass.data.setdefault(DATA_ARISTONAQUA, {DEVICES: {}, WATER_HEATERS: []})
-    api_list = []
-    dev_gateways = set()
-    dev_names = set()
-    for device in config[DOMAIN]:
-        name = device[CONF_NAME]
-        username = device[CONF_USERNAME]
-        password = device[CONF_PASSWORD]
-        store_file = device[CONF_STORE_CONFIG_FILES]
-        binary_sensors = device.get(CONF_BINARY_SENSORS)
-        sensors = device.get(CONF_SENSORS)
-        switches = device.get(CONF_SWITCHES)
-        selects = device.get(CONF_SELECTOR)
-        boiler_type = device.get(CONF_TYPE)
-        polling = device.get(CONF_POLLING)
-        logging = device.get(CONF_LOG)
-        path = device.get(CONF_PATH)
-        gw = device.get(CONF_GW)
-        if gw in dev_gateways:
-            _LOGGER.error(f"Duplicate value of 'gw': {gw}")
-            raise Exception(f"Duplicate value of 'gw': {gw}")
-        if name in dev_names:
-            _LOGGER.error(f"Duplicate value of 'name': {name}")
-            raise Exception(f"Duplicate value of 'name': {name}")
-        dev_gateways.add(gw)
-        dev_names.add(name)
-
-        api = AristonAquaChecker(
-            hass=hass,
-            device=device,
-            name=name,
-            username=username,
-            password=password,
-            store_file=store_file,
-            sensors=sensors,
-            binary_sensors=binary_sensors,
-            switches=switches,
-            selects=selects,
-            boiler_type=boiler_type,
-            polling=polling,
-            logging=logging,
-            path=path,
-            gw=gw,
+async def async_setup(hass, config):
+    """Set up the Ariston Aqua component, YAML configuration is imported as config entries."""
+    hass.data.setdefault(DATA_ARISTONAQUA, {DEVICES: {}, WATER_HEATERS: {}})
+
+    for device in config.get(DOMAIN, []):
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=device
+            )
         )
 
-        api_list.append(api)
-        # start api execution
-        api.ariston_api.start()
+    async def async_set_ariston_aqua_data(call):
+        """Handle the service call to set the data on all targeted water heaters concurrently."""
+        parameter_list = {
+            parameter: str(call.data[parameter]).lower()
+            for parameter in SERVICE_PARAMETERS
+            if call.data.get(parameter, "") != ""
+        }
+
+        selected = async_extract_referenced_entity_ids(hass, call)
+        water_heaters = hass.data[DATA_ARISTONAQUA][WATER_HEATERS]
+        targets = {
+            entity_id: water_heaters[entity_id]
+            for entity_id in sorted(selected.referenced | selected.indirectly_referenced)
+            if entity_id in water_heaters
+        }
+        if not targets:
+            raise ServiceValidationError("Corresponding entity_id for Ariston Aqua not found")
+
+        _LOGGER.debug("Ariston Aqua devices found, data to check and send: %s", ", ".join(targets))
+        results = await asyncio.gather(
+            *(
+                hass.async_add_executor_job(partial(aqua_device.api.ariston_api.set_http_data, **parameter_list))
+                for aqua_device in targets.values()
+            ),
+            return_exceptions=True,
+        )
+        response = {}
+        for entity_id, result in zip(targets, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Setting data of %s failed: %s", entity_id, result)
+                response[entity_id] = {"success": False, "error": str(result)}
+            else:
+                response[entity_id] = {"success": True}
+        return {"results": response}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_DATA,
+        async_set_ariston_aqua_data,
+        schema=SERVICE_SET_DATA_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
-        # load all devices
-        hass.data[DATA_ARISTONAQUA][DEVICES][name] = AristonAquaDevice(api, device)
+    return True
 
-        discovery.load_platform(hass, WATER_HEATER, DOMAIN, {CONF_NAME: name}, config)
 
-        if switches:
-            discovery.load_platform(
-                hass,
-                SWITCH,
-                DOMAIN,
-                {CONF_NAME: name, CONF_SWITCHES: switches},
-                config,
-            )
+def _entry_platforms(device):
+    """Return platforms used by the device configuration."""
+    platforms = [WATER_HEATER]
+    for platform, conf in (
+        (SWITCH, CONF_SWITCHES),
+        (SELECT, CONF_SELECTOR),
+        (BINARY_SENSOR, CONF_BINARY_SENSORS),
+        (SENSOR, CONF_SENSORS),
+    ):
+        if device.get(conf):
+            platforms.append(platform)
+    return platforms
 
-        if selects:
-            discovery.load_platform(
-                hass,
-                SELECT,
-                DOMAIN,
-                {CONF_NAME: name, CONF_SELECTOR: selects},
-                config,
-            )
 
-        if binary_sensors:
-            discovery.load_platform(
-                hass,
-                BINARY_SENSOR,
-                DOMAIN,
-                {CONF_NAME: name, CONF_BINARY_SENSORS: binary_sensors},
-                config,
-            )
+async def async_setup_entry(hass, entry):
+    """Set up Ariston Aqua water heater from a config entry."""
+    from .energy_statistics import ENERGY_SENSORS, energy_changed
 
-        if sensors:
-            discovery.load_platform(
-                hass, SENSOR, DOMAIN, {CONF_NAME: name, CONF_SENSORS: sensors}, config
-            )
+    hass.data.setdefault(DATA_ARISTONAQUA, {DEVICES: {}, WATER_HEATERS: {}})
+    device = ARISTONAQUA_SCHEMA(dict(entry.data))
+    name = device[CONF_NAME]
+    sensors = device.get(CONF_SENSORS)
 
-    gateways_txt = ", ".join(dev_gateways)
-    names_txt = ", ".join(dev_names)
-    _LOGGER.info(f"All gateways: {gateways_txt}")
-    _LOGGER.info(f"All names: {names_txt}")
-
-    def set_ariston_aqua_data(call):
-        """Handle the service call to set the data."""
-        # Start with mandatory parameter
-        entity_id = call.data.get(ATTR_ENTITY_ID, "")
-
-        try:
-            domain = entity_id.split(".")[0]
-        except:
-            _LOGGER.warning("Invalid entity_id domain for Ariston Aqua")
-            raise Exception("Invalid entity_id domain for Ariston Aqua")
-        if domain.lower() != "water_heater":
-            _LOGGER.warning("Invalid entity_id domain for Ariston Aqua")
-            raise Exception("Invalid entity_id domain for Ariston Aqua")
-        try:
-            device_id = entity_id.split(".")[1]
-        except:
-            _LOGGER.warning("Invalid entity_id device for Ariston Aqua")
-            raise Exception("Invalid entity_id device for Ariston Aqua")
-
-        for api in api_list:
-            if api.name.replace(' ', '_').lower() == device_id.lower():
-                # water_heater entity is found
-                parameter_list = {}
-
-                data = call.data.get(PARAM_MODE, "")
-                if data != "":
-                    parameter_list[PARAM_MODE] = str(data).lower()
-
-                data = call.data.get(PARAM_ON, "")
-                if data != "":
-                    parameter_list[PARAM_ON] = str(data).lower()
-
-                data = call.data.get(PARAM_REQUIRED_TEMPERATURE, "")
-                if data != "":
-                    parameter_list[PARAM_REQUIRED_TEMPERATURE] = str(data).lower()
-
-                data = call.data.get(PARAM_CLEANSE_TEMPERATURE, "")
-                if data != "":
-                    parameter_list[PARAM_CLEANSE_TEMPERATURE] = str(data).lower()
-
-                data = call.data.get(PARAM_ECO, "")
-                if data != "":
-                    parameter_list[PARAM_ECO] = str(data).lower()
-
-                data = call.data.get(PARAM_REQUIRED_SHOWERS, "")
-                if data != "":
-                    parameter_list[PARAM_REQUIRED_SHOWERS] = str(data).lower()
-
-                _LOGGER.debug("Ariston Aqua device found, data to check and send")
-
-                api.ariston_api.set_http_data(**parameter_list)
-                return
-            raise Exception("Corresponding entity_id for Ariston Aqua not found")
-        return
-
-    hass.services.register(DOMAIN, SERVICE_SET_DATA, set_ariston_aqua_data)
-
-    if not hass.data[DATA_ARISTONAQUA][DEVICES]:
-        return False
-    # Return boolean to indicate that initialization was successful.
+    # handler creates folders and reads stored files, so it is created outside of the event loop
+    api = await hass.async_add_executor_job(
+        partial(
+            AristonAquaChecker,
+            hass=hass,
+            device=device,
+            name=name,
+            username=device[CONF_USERNAME],
+            password=device[CONF_PASSWORD],
+            store_file=device[CONF_STORE_CONFIG_FILES],
+            sensors=sensors,
+            binary_sensors=device.get(CONF_BINARY_SENSORS),
+            switches=device.get(CONF_SWITCHES),
+            selects=device.get(CONF_SELECTOR),
+            boiler_type=device.get(CONF_TYPE),
+            polling=device.get(CONF_POLLING),
+            logging=device.get(CONF_LOG),
+            path=device.get(CONF_PATH),
+            gw=device.get(CONF_GW),
+            hedging=device.get(CONF_HEDGING),
+            fleet_read=device.get(CONF_FLEET_READ),
+        )
+    )
+
+    if sensors and ENERGY_SENSORS & set(sensors):
+        # keep long-term statistics of energy use
+        api.ariston_api.subscribe_sensors(energy_changed, hass, name, api.ariston_api)
+    # start api execution
+    api.ariston_api.start()
+
+    hass.data[DATA_ARISTONAQUA][DEVICES][name] = AristonAquaDevice(api, device)
+
+    await hass.config_entries.async_forward_entry_setups(entry, _entry_platforms(device))
+    _LOGGER.info("Ariston Aqua %s is set up with gateway '%s'", name, device.get(CONF_GW))
     return True
 
 
+async def async_unload_entry(hass, entry):
+    """Unload Ariston Aqua config entry."""
+    device = ARISTONAQUA_SCHEMA(dict(entry.data))
+    unloaded = await hass.config_entries.async_unload_platforms(entry, _entry_platforms(device))
+    if unloaded:
+        aqua_device = hass.data[DATA_ARISTONAQUA][DEVICES].pop(device[CONF_NAME], None)
+        if aqua_device is not None:
+            await hass.async_add_executor_job(aqua_device.api.ariston_api.stop)
+    return unloaded
+
+
 class AristonAquaDevice:
     """Representation of a base Ariston discovery device."""
 
@@ -1,14 +1,854 @@
 """Suppoort for Ariston."""
-import copy
+import hashlib
+import heapq
 import json
 import logging
+from array import array
+from bisect import bisect_left, bisect_right
 import math
 import os
+import queue
+import random
 import re
 import threading
 import time
+from collections import deque, namedtuple
+from itertools import accumulate, chain
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
 from typing import Union
-import requests
+
+# imported on first use by '_requests'
+requests = None
+
+_LOGGER = logging.getLogger(__name__)
+_LOGGING_LOCK = threading.Lock()
+_LOGGING_HANDLER = None
+
+
+def _setup_logging(level: int) -> None:
+    """
+    Configure module logger once for all handlers.
+    Console handler is added only once and the most verbose requested level is used.
+    """
+    global _LOGGING_HANDLER
+    with _LOGGING_LOCK:
+        if _LOGGING_HANDLER is None:
+            _LOGGING_HANDLER = logging.StreamHandler()
+            _LOGGING_HANDLER.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            _LOGGER.addHandler(_LOGGING_HANDLER)
+        if level != logging.NOTSET and (_LOGGER.level == logging.NOTSET or level < _LOGGER.level):
+            _LOGGER.setLevel(level)
+
+
+class _DeviceLoggerAdapter(logging.LoggerAdapter):
+    """Prefix log records with the device, formatting of the message itself stays lazy."""
+
+    def process(self, msg, kwargs):
+        return "%s %s" % (self.extra["device"], msg), kwargs
+
+
+# gateways per account shared by all handlers: (url, user) -> (fetch time, gateways)
+_GATEWAY_CACHE = {}
+_GATEWAY_CACHE_LOCK = threading.Lock()
+_GATEWAY_FETCH_LOCKS = {}
+# plants listing per account shared by all handlers: (url, user) -> (fetch time, plants by gateway)
+_FLEET_CACHE = {}
+_FLEET_CACHE_LOCK = threading.Lock()
+_FLEET_FETCH_LOCKS = {}
+
+_NUMPY = None
+_PERIOD_KEYS = []
+
+
+def _requests():
+    """Import requests when first handler is created, importing the module itself stays fast."""
+    global requests
+    if requests is None:
+        import requests as requests_module
+        requests = requests_module
+    return requests
+
+
+def _numpy():
+    """Return NumPy module if it is available, it is imported on first use only"""
+    global _NUMPY
+    if _NUMPY is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _NUMPY = numpy
+    return _NUMPY or None
+
+
+def _period_keys(count: int) -> list:
+    """Return names of report periods, names are built only once"""
+    while len(_PERIOD_KEYS) < count:
+        _PERIOD_KEYS.append('Period' + str(len(_PERIOD_KEYS) + 1))
+    return _PERIOD_KEYS[:count]
+
+
+def _aggregate_energy(reports, horizons: int = 4) -> list:
+    """
+    Aggregate energy reports of all horizons in one pass.
+
+    Returns list with a dictionary per horizon with keys 'total', 'periods', 'deltas' and 'running_sums',
+    or None if horizon is missing in reports. Period values are rounded to 2 digits, 'total' is a rounded sum
+    of unrounded values, 'deltas' are changes from the previous period. NumPy is used if available.
+    """
+    series = []
+    for index in range(horizons):
+        try:
+            series.append(list(reports[index]['v']))
+        except (IndexError, KeyError, TypeError):
+            series.append(None)
+    filled = [values for values in series if values]
+    lengths = [len(values) for values in filled]
+    numpy = _numpy()
+    if numpy is not None and filled:
+        flat = numpy.fromiter(chain.from_iterable(filled), dtype=float, count=sum(lengths))
+        bounds = numpy.cumsum([0] + lengths).tolist()
+        deltas = numpy.diff(flat, prepend=0.)
+        deltas[bounds[:-1]] = 0.
+        # each horizon is summed separately, so that sums are the same as without NumPy
+        running = numpy.concatenate([numpy.cumsum(flat[start:end]) for start, end in zip(bounds, bounds[1:])])
+        # Python rounds values exactly, numpy.round might round halves differently
+        rounded = [round(value, 2) for value in flat.tolist()]
+        running = [round(value, 2) for value in running.tolist()]
+        deltas = [round(value, 2) for value in deltas.tolist()]
+        segments = [
+            (running[end - 1], rounded[start:end], deltas[start:end], running[start:end])
+            for start, end in zip(bounds, bounds[1:])]
+    else:
+        segments = []
+        for values in filled:
+            running = list(accumulate(values))
+            segments.append((
+                round(running[-1], 2),
+                [round(value, 2) for value in values],
+                [0.] + [round(current - previous, 2) for previous, current in zip(values, values[1:])],
+                [round(value, 2) for value in running],
+            ))
+    segments = iter(segments)
+    aggregated = []
+    for values in series:
+        if values is None:
+            aggregated.append(None)
+            continue
+        if values:
+            total, rounded, deltas, running = next(segments)
+        else:
+            total, rounded, deltas, running = 0, [], [], []
+        aggregated.append({
+            "total": total,
+            "periods": dict(zip(_period_keys(len(rounded)), rounded)),
+            "deltas": deltas,
+            "running_sums": running,
+        })
+    return aggregated
+
+
+class _DeadlineScheduler:
+    """
+    Scheduler of periodic requests with freshness deadlines.
+
+    Each job has maximum age of its data and a weight. Deadlines are kept in a heap, on each tick the most
+    overdue job is picked, overdue time is relative to maximum age and multiplied by the weight, so the job
+    with stricter freshness or higher weight wins among jobs due at the same time. Nothing is picked if no
+    job is due.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._deadlines = {}
+        self._heap = []
+
+    def add(self, job, max_age: float, weight: float = 1.) -> None:
+        """Add job which is due immediately."""
+        with self._lock:
+            if job in self._jobs:
+                return
+            self._jobs[job] = (max_age, weight)
+            self._deadlines[job] = 0.
+            heapq.heappush(self._heap, (0., job))
+
+    def __contains__(self, job) -> bool:
+        return job in self._jobs
+
+    def done(self, job, now: float) -> None:
+        """Set next deadline of the job after its data has been fetched."""
+        with self._lock:
+            if job not in self._jobs:
+                return
+            deadline = now + self._jobs[job][0]
+            self._deadlines[job] = deadline
+            heapq.heappush(self._heap, (deadline, job))
+
+    def next(self, now: float, allowed=None):
+        """
+        Return the most overdue job and postpone its deadline by its maximum age, None if nothing is due.
+
+        'allowed' is a function telling if the job may run now, jobs not allowed stay due.
+        """
+        with self._lock:
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                deadline, job = heapq.heappop(self._heap)
+                if self._deadlines.get(job) == deadline:
+                    due.append((deadline, job))
+            best = None
+            best_score = None
+            for deadline, job in due:
+                if allowed is not None and not allowed(job):
+                    continue
+                max_age, weight = self._jobs[job]
+                score = (now - deadline + max_age) / max_age * weight
+                if best_score is None or score > best_score:
+                    best, best_score = job, score
+            for deadline, job in due:
+                if job != best:
+                    heapq.heappush(self._heap, (deadline, job))
+            if best is not None:
+                deadline = now + self._jobs[best][0]
+                self._deadlines[best] = deadline
+                heapq.heappush(self._heap, (deadline, best))
+            return best
+
+    def remove(self, job) -> None:
+        """Remove job from the schedule."""
+        with self._lock:
+            self._jobs.pop(job, None)
+            self._deadlines.pop(job, None)
+
+    def deadlines(self) -> dict:
+        """Return deadlines of all jobs."""
+        with self._lock:
+            return dict(self._deadlines)
+
+
+class _CircuitBreaker:
+    """
+    Circuit breaker of a single endpoint.
+
+    Breaker is 'closed' while endpoint responds. After 'threshold' consecutive failures it becomes 'open' and
+    requests are skipped until backoff with jitter expires. Then it is 'half_open' and the next request decides
+    if breaker closes or opens again with doubled backoff.
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, backoff: float, max_backoff: float, jitter: float = 0.2) -> None:
+        self._threshold = threshold
+        self._base_backoff = backoff
+        self._max_backoff = max_backoff
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._state = self.STATE_CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.
+
+    @property
+    def state(self) -> str:
+        """Return breaker state."""
+        return self._state
+
+    def can_request(self) -> bool:
+        """Return if request to the endpoint could be sent, state of the breaker is not changed."""
+        with self._lock:
+            return self._state != self.STATE_OPEN or time.time() >= self._open_until
+
+    def allow_request(self) -> bool:
+        """Return if request to the endpoint may be sent, open breaker becomes half open once backoff expires."""
+        with self._lock:
+            if self._state == self.STATE_OPEN:
+                if time.time() < self._open_until:
+                    return False
+                self._state = self.STATE_HALF_OPEN
+            return True
+
+    def record_success(self) -> None:
+        """Close breaker after successful request."""
+        with self._lock:
+            self._state = self.STATE_CLOSED
+            self._failures = 0
+            self._trips = 0
+            self._open_until = 0.
+
+    def record_failure(self) -> None:
+        """Count failed request and open breaker if needed."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.STATE_HALF_OPEN or self._failures >= self._threshold:
+                backoff = min(self._base_backoff * 2 ** self._trips, self._max_backoff)
+                backoff *= 1 + random.uniform(-self._jitter, self._jitter)
+                self._trips += 1
+                self._state = self.STATE_OPEN
+                self._open_until = time.time() + backoff
+
+    def diagnostics(self) -> dict:
+        """Return breaker data for troubleshooting."""
+        with self._lock:
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "trips": self._trips,
+                "retry_in": round(max(self._open_until - time.time(), 0.), 1),
+            }
+
+
+class _EnergyHistory:
+    """
+    Long term energy use history built incrementally from reports.
+
+    Each report series ('day', 'week', 'month', 'year') is split into local calendar periods ending with the
+    current one: hours of the day, days of the week and month, months of the year. Periods are stored as
+    sorted columns of start timestamps and values, a newer report
+    replaces overlapping periods instead of duplicating them. Running sums allow energy use between any
+    two moments to be read without iterating over periods. Columns are stored as binary array files.
+    """
+
+    # calendar unit of periods of each series
+    SERIES = {
+        "day": "hour",
+        "week": "day",
+        "month": "day",
+        "year": "month",
+    }
+
+    def __init__(self, folder: str, prefix: str) -> None:
+        self._folder = folder
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._starts = dict()
+        self._values = dict()
+        self._sums = dict()
+        for series in self.SERIES:
+            self._starts[series] = self._load(series, "ts", "q")
+            self._values[series] = self._load(series, "val", "d")
+            if len(self._starts[series]) != len(self._values[series]):
+                # partially written history is dropped
+                self._starts[series] = array("q")
+                self._values[series] = array("d")
+            self._sums[series] = array("d")
+            self._update_sums(series, 0)
+
+    def _path(self, series, column):
+        return os.path.join(self._folder, self._prefix + "energy_history_" + series + "." + column)
+
+    def _load(self, series, column, typecode):
+        column_data = array(typecode)
+        path = self._path(series, column)
+        try:
+            with open(path, "rb") as history_file:
+                column_data.fromfile(history_file, os.path.getsize(path) // column_data.itemsize)
+        except (OSError, EOFError):
+            return array(typecode)
+        return column_data
+
+    def _save(self, series):
+        if not os.path.isdir(self._folder):
+            os.makedirs(self._folder)
+        for column, column_data in (("ts", self._starts[series]), ("val", self._values[series])):
+            path = self._path(series, column)
+            with open(path + ".tmp", "wb") as history_file:
+                column_data.tofile(history_file)
+            os.replace(path + ".tmp", path)
+
+    def _update_sums(self, series, index):
+        sums = self._sums[series]
+        del sums[index:]
+        total = sums[-1] if sums else 0.
+        for value in self._values[series][index:]:
+            total += value
+            sums.append(total)
+
+    @classmethod
+    def period_starts(cls, series: str, count: int, fetched: float) -> list:
+        """Return local start timestamps of 'count' periods of the series, last one contains 'fetched'."""
+        unit = cls.SERIES[series]
+        if unit == "hour":
+            # day is split into equal number of hours
+            hours = max(24 // count, 1)
+            now = datetime.fromtimestamp(fetched)
+            last = now.replace(hour=now.hour // hours * hours, minute=0, second=0, microsecond=0)
+            local_starts = [last - timedelta(hours=hours * back) for back in range(count)]
+        elif unit == "day":
+            last = date.fromtimestamp(fetched)
+            local_starts = [last - timedelta(days=back) for back in range(count)]
+        else:
+            last = date.fromtimestamp(fetched)
+            month_index = last.year * 12 + last.month - 1
+            local_starts = [
+                date((month_index - back) // 12, (month_index - back) % 12 + 1, 1) for back in range(count)]
+        return [int(time.mktime(local_start.timetuple())) for local_start in reversed(local_starts)]
+
+    def merge(self, series: str, values: list, fetched: float) -> None:
+        """Merge report values of the series fetched at the given time, last value is the current period."""
+        if series not in self.SERIES or not values:
+            return
+        period_starts = self.period_starts(series, len(values), fetched)
+        with self._lock:
+            starts = self._starts[series]
+            cut = bisect_left(starts, period_starts[0])
+            del starts[cut:]
+            del self._values[series][cut:]
+            starts.extend(period_starts)
+            self._values[series].extend(float(value) for value in values)
+            self._update_sums(series, cut)
+            self._save(series)
+
+    def history(self, series: str) -> tuple:
+        """Return tuple of period start timestamps and values of the series."""
+        with self._lock:
+            return tuple(self._starts[series]), tuple(self._values[series])
+
+    def energy_use(self, series: str, start: float, end: float) -> float:
+        """Return energy use of periods of the series starting within [start, end)."""
+        with self._lock:
+            starts = self._starts[series]
+            sums = self._sums[series]
+            first = bisect_left(starts, start)
+            last = bisect_left(starts, end)
+            if last <= first:
+                return 0.
+            return sums[last - 1] - (sums[first - 1] if first else 0.)
+
+
+class _TimeProgram:
+    """
+    Time program compiled into setpoints sorted by minute of the week.
+
+    Minute of the week starts on sunday at 00:00 local time to match day numbering of the time program.
+    Current and next setpoints are found with binary search.
+    """
+
+    WEEK_MINUTES = 7 * 24 * 60
+
+    __slots__ = ("minutes", "temperatures")
+
+    def __init__(self, time_prog_data):
+        events = {}
+        for plan in time_prog_data:
+            for list_in_plan in time_prog_data[plan]:
+                for showers in list_in_plan["shws"]:
+                    hours, minutes = showers["time"].split(":")
+                    for day in list_in_plan["days"]:
+                        events[day * 1440 + int(hours) * 60 + int(minutes)] = showers["temp"]
+        self.minutes = sorted(events)
+        self.temperatures = [events[minute] for minute in self.minutes]
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @staticmethod
+    def _week_minute(timestamp: float) -> int:
+        local = time.localtime(timestamp)
+        return ((local.tm_wday + 1) % 7) * 1440 + local.tm_hour * 60 + local.tm_min
+
+    def current(self, timestamp: float):
+        """Return setpoint active at the timestamp, last event of previous week applies before first one."""
+        if not self.minutes:
+            return None
+        return self.temperatures[bisect_right(self.minutes, self._week_minute(timestamp)) - 1]
+
+    def previous_event(self, timestamp: float):
+        """Return timestamp and setpoint of the latest event not after the timestamp."""
+        if not self.minutes:
+            return None
+        week_minute = self._week_minute(timestamp)
+        index = bisect_right(self.minutes, week_minute) - 1
+        if index >= 0:
+            minutes_ago = week_minute - self.minutes[index]
+        else:
+            minutes_ago = week_minute + self.WEEK_MINUTES - self.minutes[index]
+        event_time = timestamp - timestamp % 60 - minutes_ago * 60
+        return event_time, self.temperatures[index]
+
+    def next_event(self, timestamp: float):
+        """Return timestamp and setpoint of the first event after the timestamp."""
+        if not self.minutes:
+            return None
+        week_minute = self._week_minute(timestamp)
+        index = bisect_right(self.minutes, week_minute)
+        if index < len(self.minutes):
+            minutes_left = self.minutes[index] - week_minute
+        else:
+            index = 0
+            minutes_left = self.minutes[0] + self.WEEK_MINUTES - week_minute
+        event_time = timestamp - timestamp % 60 + minutes_left * 60
+        return event_time, self.temperatures[index]
+
+
+class _ThermalModel:
+    """
+    Incremental thermal model of the water tank.
+
+    Heating rate is learnt while heating is requested and standby loss while heater is idle, both as
+    exponentially weighted averages of temperature change per second between fetches. Remaining heating
+    time reported by the heater gives heating rate until enough heating was observed. Error of each
+    prediction per second of prediction horizon is tracked the same way and gives confidence of estimate.
+    """
+
+    ALPHA = 0.2
+    MIN_SAMPLES = 3
+    # observations over longer gaps mix several heating cycles and are not used
+    MAX_GAP = 3600.
+    # estimation error in °C at which confidence drops to zero
+    TOLERANCE = 1.
+
+    __slots__ = ("heating_rate", "loss_rate", "error_rate", "heating_samples", "loss_samples",
+                 "temp", "time", "heating", "target")
+
+    def __init__(self):
+        self.heating_rate = 0.
+        self.loss_rate = 0.
+        self.error_rate = 0.
+        self.heating_samples = 0
+        self.loss_samples = 0
+        self.temp = None
+        self.time = None
+        self.heating = False
+        self.target = None
+
+    @staticmethod
+    def _remaining_minutes(remaining_time):
+        """Return remaining heating time in minutes from a number of minutes or 'hh:mm' string."""
+        if isinstance(remaining_time, bool):
+            return None
+        if isinstance(remaining_time, (int, float)):
+            return remaining_time
+        try:
+            hours, minutes = str(remaining_time).split(":")[:2]
+            return int(hours) * 60 + int(minutes)
+        except (TypeError, ValueError):
+            return None
+
+    def _ewma(self, average, sample, samples):
+        return sample if samples == 0 else average + self.ALPHA * (sample - average)
+
+    def update(self, timestamp: float, temp, heating, target=None, remaining_time=None) -> None:
+        """Add fetched state of the heater to the model."""
+        if not isinstance(temp, (int, float)) or isinstance(temp, bool):
+            return
+        if self.temp is not None and 0 < timestamp - self.time <= self.MAX_GAP:
+            elapsed = timestamp - self.time
+            error = abs(self.estimate(timestamp) - temp) / elapsed
+            self.error_rate = self._ewma(self.error_rate, error, self.heating_samples + self.loss_samples)
+            rate = (temp - self.temp) / elapsed
+            if self.heating:
+                if rate > 0:
+                    self.heating_rate = self._ewma(self.heating_rate, rate, self.heating_samples)
+                    self.heating_samples += 1
+            else:
+                if rate <= 0:
+                    self.loss_rate = self._ewma(self.loss_rate, -rate, self.loss_samples)
+                    self.loss_samples += 1
+        remaining_minutes = self._remaining_minutes(remaining_time)
+        if heating and self.heating_samples < self.MIN_SAMPLES and \
+                isinstance(target, (int, float)) and remaining_minutes and target > temp:
+            self.heating_rate = self._ewma(
+                self.heating_rate, (target - temp) / (remaining_minutes * 60), self.heating_samples)
+            self.heating_samples += 1
+        self.temp = temp
+        self.time = timestamp
+        self.heating = bool(heating)
+        self.target = target if isinstance(target, (int, float)) else None
+
+    def copy(self) -> "_ThermalModel":
+        """Return copy of the model."""
+        model = _ThermalModel.__new__(_ThermalModel)
+        for attribute in self.__slots__:
+            setattr(model, attribute, getattr(self, attribute))
+        return model
+
+    def estimate(self, timestamp: float):
+        """Return estimated temperature at the timestamp."""
+        if self.temp is None:
+            return None
+        elapsed = max(timestamp - self.time, 0.)
+        if self.heating:
+            temp = self.temp + self.heating_rate * elapsed
+            if self.target is not None:
+                temp = min(temp, max(self.target, self.temp))
+        else:
+            temp = self.temp - self.loss_rate * elapsed
+        return temp
+
+    def confidence(self, timestamp: float) -> float:
+        """Return confidence of estimate at the timestamp between 0 and 1."""
+        samples = self.heating_samples if self.heating else self.loss_samples
+        if self.temp is None or samples < self.MIN_SAMPLES:
+            return 0.
+        if self.heating and self.target is not None and \
+                self.estimate(timestamp) >= self.target - self.TOLERANCE / 2:
+            # heating is about to stop, which model does not predict
+            return 0.
+        elapsed = max(timestamp - self.time, 0.)
+        return max(0., 1. - self.error_rate * elapsed / self.TOLERANCE)
+
+
+class _Capabilities:
+    """
+    Endpoints supported by the heater model behind the gateway.
+
+    Endpoint is supported once it replies successfully and unsupported after several consecutive replies
+    rejecting the request. Result is stored as JSON file together with the model, discovery is repeated
+    when model changes and periodically for unsupported endpoints.
+    """
+
+    REPROBE = 24 * 3600.
+    MIN_REJECTS = 3
+
+    def __init__(self, folder: str, prefix: str, model: str, request_types: set):
+        self._path = os.path.join(folder, prefix + "capabilities.json")
+        self._model = model
+        self._lock = threading.Lock()
+        self.supported = set()
+        self.unsupported = set()
+        self.probed = time.time()
+        self._rejects = dict()
+        try:
+            with open(self._path) as capabilities_file:
+                stored = json.load(capabilities_file)
+            if stored["model"] == model:
+                self.supported = set(stored["supported"]) & request_types
+                self.unsupported = set(stored["unsupported"]) & request_types
+                self.probed = float(stored["probed"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        self.probing = request_types - self.supported - self.unsupported
+
+    def _save(self):
+        folder = os.path.dirname(self._path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(self._path + ".tmp", "w") as capabilities_file:
+            json.dump({
+                "model": self._model,
+                "probed": self.probed,
+                "supported": sorted(self.supported),
+                "unsupported": sorted(self.unsupported),
+            }, capabilities_file)
+        os.replace(self._path + ".tmp", self._path)
+
+    def record(self, request, supported: bool) -> bool:
+        """Store result of probing the endpoint, return True if endpoint is found unsupported."""
+        with self._lock:
+            if supported:
+                self._rejects.pop(request, None)
+                self.supported.add(request)
+                self.unsupported.discard(request)
+            else:
+                self._rejects[request] = self._rejects.get(request, 0) + 1
+                if self._rejects[request] < self.MIN_REJECTS:
+                    return False
+                self._rejects.pop(request)
+                self.unsupported.add(request)
+                self.supported.discard(request)
+            self.probing.discard(request)
+            try:
+                self._save()
+            except OSError:
+                pass
+            return not supported
+
+    def reprobe(self, timestamp: float) -> set:
+        """Return unsupported endpoints to be probed again if discovery is old."""
+        with self._lock:
+            if timestamp - self.probed < self.REPROBE or not self.unsupported:
+                return set()
+            self.probed = timestamp
+            self.probing |= self.unsupported
+            return set(self.unsupported)
+
+
+class _ShowersController:
+    """
+    Predictive control of required showers to keep required temperature of Velis heaters.
+
+    Temperature at which heating stops is learnt for each number of showers as exponentially weighted
+    average and stored as JSON file. Required showers are selected from learnt temperatures in a single
+    step, interpolating between known numbers of showers. While less than two numbers of showers are
+    known, showers are changed by one as before. Number of changes within an hour is limited.
+    """
+
+    ALPHA = 0.3
+    MAX_SETS_PER_HOUR = 3
+
+    def __init__(self, folder: str, prefix: str):
+        self._path = os.path.join(folder, prefix + "showers_temperatures.json")
+        self._heating = None
+        self._sets = deque(maxlen=self.MAX_SETS_PER_HOUR)
+        try:
+            with open(self._path) as showers_file:
+                self.temperatures = {int(showers): temp for showers, temp in json.load(showers_file).items()}
+        except (OSError, ValueError, AttributeError):
+            self.temperatures = {}
+
+    def _save(self):
+        folder = os.path.dirname(self._path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(self._path + ".tmp", "w") as showers_file:
+            json.dump(self.temperatures, showers_file)
+        os.replace(self._path + ".tmp", self._path)
+
+    def observe(self, showers, temp, heating) -> None:
+        """Learn temperature reached with the number of showers when heating stops."""
+        if self._heating and not heating and showers and temp:
+            known = self.temperatures.get(showers)
+            self.temperatures[showers] = temp if known is None else round(known + self.ALPHA * (temp - known), 1)
+            try:
+                self._save()
+            except OSError:
+                pass
+        self._heating = heating
+
+    def _predicted_temperature(self, showers):
+        if showers in self.temperatures:
+            return self.temperatures[showers]
+        known = sorted(self.temperatures)
+        lower = [known_showers for known_showers in known if known_showers < showers]
+        upper = [known_showers for known_showers in known if known_showers > showers]
+        if lower and upper:
+            first, second = lower[-1], upper[0]
+        elif lower:
+            first, second = lower[-2:]
+        else:
+            first, second = upper[:2]
+        first_temp, second_temp = self.temperatures[first], self.temperatures[second]
+        return first_temp + (second_temp - first_temp) * (showers - first) / (second - first)
+
+    def target(self, current_showers, min_showers, max_showers, temp, required_temp, heating):
+        """Return number of showers to keep required temperature."""
+        if len(self.temperatures) >= 2:
+            for showers in range(min_showers, max_showers + 1):
+                if self._predicted_temperature(showers) >= required_temp:
+                    return showers
+            return max_showers
+        if temp > required_temp and current_showers > min_showers:
+            return current_showers - 1
+        if temp < required_temp - 2 and current_showers < max_showers and not heating:
+            return current_showers + 1
+        return current_showers
+
+    def allow_set(self, timestamp: float) -> bool:
+        """Register change of showers at the timestamp unless hourly limit is reached."""
+        if len(self._sets) == self._sets.maxlen and timestamp - self._sets[0] < 3600:
+            return False
+        self._sets.append(timestamp)
+        return True
+
+
+_Endpoint = namedtuple("_Endpoint", "url method timeout max_age weight parameters")
+
+
+class _SingleFlight:
+    """
+    Deduplication of identical calls in progress.
+
+    The first caller with a key runs the call, callers arriving with the same key while it runs
+    wait for it to finish and share its result or exception instead of running the call again.
+    """
+
+    __slots__ = ("_lock", "_calls", "joined")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.joined = 0
+
+    def do(self, key, func, *args):
+        """Run the call unless identical one is in progress, return its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = [threading.Event(), None, None]
+                leader = True
+            else:
+                self.joined += 1
+                leader = False
+        event = call[0]
+        if not leader:
+            event.wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+        try:
+            call[1] = func(*args)
+        except Exception as ex:
+            call[2] = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            event.set()
+        return call[1]
+
+
+class _SensorRecord(Mapping):
+    """Value and units of a sensor, can be read as a dictionary with keys 'value' and 'units'."""
+
+    __slots__ = ("value", "units")
+
+    _KEYS = ("value", "units")
+
+    def __init__(self, value=None, units=None) -> None:
+        self.value = value
+        self.units = units
+
+    def __getitem__(self, key):
+        if key == "value":
+            return self.value
+        if key == "units":
+            return self.units
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"{{'value': {self.value!r}, 'units': {self.units!r}}}"
+
+    def copy(self):
+        """Return copy of the record."""
+        return _SensorRecord(self.value, self.units)
+
+
+class SensorSnapshot:
+    """
+    Immutable state of sensors published after each change of data.
+
+    'version' - increases every time any of sensors changes;
+
+    'values' - read only mapping of all sensors to read only mappings with keys 'value' and 'units';
+
+    'versions' - read only mapping of sensors to version in which they were changed last time.
+
+    Mappings of unchanged sensors are shared between snapshots.
+    """
+
+    __slots__ = ("version", "values", "versions")
+
+    def __init__(self, version: int, values: MappingProxyType, versions: MappingProxyType) -> None:
+        self.version = version
+        self.values = values
+        self.versions = versions
+
+    def changed_since(self, version: int) -> set:
+        """Return set of sensors changed after the given version."""
+        if version >= self.version:
+            return set()
+        return {sensor for sensor, changed in self.versions.items() if changed > version}
 
 
 class AquaAristonHandler:
@@ -65,12 +905,18 @@ class AquaAristonHandler:
 
     'logging_level' - defines level of logging - allowed values [CRITICAL, ERROR, WARNING, INFO, DEBUG, NOTSET=(default)]
 
+    'gw' - gateway to be used if there are multiple boilers under one account;
+
+    'hedging' - indicates if second main data request is sent when first one is slower than usually (95th percentile);
+
+    'fleet_read' - indicates if main data is read from listing of all plants of the account, which is fetched once
+    per cycle for all handlers of the account. Data missing in the listing is read from the plant less often;
+
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     """
 
     _VERSION = "1.0.49"
 
-    _LOGGER = logging.getLogger(__name__)
     _LEVEL_CRITICAL = "CRITICAL"
     _LEVEL_ERROR = "ERROR"
     _LEVEL_WARNING = "WARNING"
@@ -160,6 +1006,14 @@ class AquaAristonHandler:
         _PARAM_ENERGY_USE_YEAR_PERIODS
     }
 
+    # energy use sensors of reports in order of horizons: day, week, month and year
+    _ENERGY_USE_SENSORS = (
+        (_PARAM_ENERGY_USE_DAY, _PARAM_ENERGY_USE_DAY_PERIODS),
+        (_PARAM_ENERGY_USE_WEEK, _PARAM_ENERGY_USE_WEEK_PERIODS),
+        (_PARAM_ENERGY_USE_MONTH, _PARAM_ENERGY_USE_MONTH_PERIODS),
+        (_PARAM_ENERGY_USE_YEAR, _PARAM_ENERGY_USE_YEAR_PERIODS),
+    )
+
     _SENSOR_LIST = {
         *_GET_REQUEST_MAIN,
         *_GET_REQUEST_ERRORS,
@@ -209,6 +1063,16 @@ class AquaAristonHandler:
     _MAX_ERRORS = 10
     _MAX_ERRORS_TIMER_EXTEND = 7
 
+    _HEDGE_SAMPLES = 50
+    _HEDGE_MIN_SAMPLES = 10
+    _HEDGE_PERCENTILE = 0.95
+    _HEDGE_MAX_RATIO = 0.1
+    _HEDGE_MIN_DELAY = 1.0
+
+    _BREAKER_THRESHOLD = 3
+    _BREAKER_BACKOFF_MAX = 3600.
+    _BREAKER_BACKOFF_MAX_MAIN = 300.
+
     _HTTP_DELAY_MULTIPLY = 3
     _HTTP_TIMER_SET_LOCK = 20
     _HTTP_TIMER_SET_WAIT = 25
@@ -218,6 +1082,29 @@ class AquaAristonHandler:
     _HTTP_TIMEOUT_GET_SHORT = 7.0
     _HTTP_PARAM_DELAY = 20.0
 
+    # reply codes of endpoints not supported by the heater model
+    _CAPABILITY_REJECT_CODES = {400, 404, 405, 501}
+
+    # listing of plants is fetched once per cycle for all handlers of the account, it replaces main data
+    # request only if it carries all polled main values, other fields are still fetched at least that often
+    _FLEET_PLANT_KEY = "gw"
+    _FLEET_MAIN_VALUES = frozenset({"temp", "reqTemp", "mode", "on", "avShw", "heatReq", "antiLeg", "eco", "rmTm"})
+    _FLEET_MAIN_MAX_AGE = 900.
+
+    # gateways of the account are extracted from plant management page and cached per account
+    _GW_ID_PATTERN = re.compile(r'"GwId"\s*:\s*"([a-zA-Z0-9]+)"')
+    _GATEWAY_CACHE_TTL = 24 * 3600.
+
+    # main data polling in program mode: cloud applies new setpoint shortly after transition,
+    # main data is polled as usual within the window after it and sparsely otherwise
+    _PROGRAM_TRANSITION_DELAY = 60.
+    _PROGRAM_DENSE_WINDOW = 600.
+    _PROGRAM_SPARSE_INTERVAL = 900.
+    # main data request may be skipped while temperature estimate stays confident until the next main data
+    # request, but not for longer than that at default polling
+    _THERMAL_CONFIDENCE = 0.8
+    _THERMAL_MAX_SKIP = 300.
+
     _REQUEST_GET_MAIN = "_get_main"
     _REQUEST_GET_ERROR = "_get_error"
     _REQUEST_GET_CLEANSE = "_get_cleanse"
@@ -232,6 +1119,63 @@ class AquaAristonHandler:
     _REQUEST_SET_ECO = "_set_eco"
     _REQUEST_SET_CLEANSE = "_set_cleanse"
     _REQUEST_SET_SHOWERS = "_set_showers"
+    _REQUEST_SET_BOOST_TEMPERATURE = "_set_boost_temperature"
+
+    # registry of endpoints, url templates are bound to the plant once it is known;
+    # maximum age of data in seconds at default polling and weight are used to schedule reading requests
+    _ENDPOINTS = {
+        _REQUEST_GET_MAIN: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}?appId=com.remotethermo.velis",
+            "get", "long", 30., 4., _GET_REQUEST_MAIN),
+        _REQUEST_GET_SHOWERS: _Endpoint(
+            "{url}/api/v2/velis/plantData/{plant}?appId=com.remotethermo.velis",
+            "get", "long", 60., 3., _GET_REQUEST_SHOWERS),
+        _REQUEST_GET_ERROR: _Endpoint(
+            "{url}/api/v2/busErrors?gatewayId={plant}&culture=en-US&appId=com.remotethermo.velis",
+            "get", "medium", 300., 2., _GET_REQUEST_ERRORS),
+        _REQUEST_GET_CLEANSE: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/plantSettings?wheType=Med&appId=com.remotethermo.velis",
+            "get", "medium", 600., 1., _GET_REQUEST_CLEANSE),
+        _REQUEST_GET_TIME_PROG: _Endpoint(
+            "{url}/api/v2/velis/timeProgs/{plant}?appId=com.remotethermo.velis",
+            "get", "long", 3600., 1., _GET_REQUEST_TIME_PROGRAM),
+        _REQUEST_GET_USE: _Endpoint(
+            "{url}/api/v2/velis/reports/{plant}?usages=Dhw&appId=com.remotethermo.velis",
+            "get", "long", 3600., 1., _GET_REQUEST_USE),
+        _REQUEST_GET_VERSION: _Endpoint(
+            _GITHUB_LATEST_RELEASE,
+            "get", "short", 24 * 3600., 1., _GET_REQUEST_UPDATE),
+        _REQUEST_SET_MAIN: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/mode?appId=com.remotethermo.velis",
+            "post", "long", None, None, _SET_REQUEST_MODE),
+        _REQUEST_SET_ON: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/switch?appId=com.remotethermo.velis",
+            "post", "medium", None, None, _SET_REQUEST_ON),
+        _REQUEST_SET_TEMPERATURE: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/temperature?appId=com.remotethermo.velis",
+            "post", "medium", None, None, _SET_REQUEST_TEMPERATURE),
+        _REQUEST_SET_BOOST_TEMPERATURE: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/boosttemperature?appId=com.remotethermo.velis",
+            "post", "medium", None, None, frozenset()),
+        _REQUEST_SET_ECO: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/switchEco?appId=com.remotethermo.velis",
+            "post", "medium", None, None, _SET_REQUEST_ECO),
+        _REQUEST_SET_CLEANSE: _Endpoint(
+            "{url}/api/v2/velis/{boiler}PlantData/{plant}/plantSettings?appId=com.remotethermo.velis",
+            "post", "medium", None, None, _SET_REQUEST_CLEANSE),
+        _REQUEST_SET_SHOWERS: _Endpoint(
+            "{url}/api/v2/velis/plantData/{plant}/showers?appId=com.remotethermo.velis",
+            "post", "medium", None, None, _SET_REQUEST_SHOWERS),
+    }
+    # requests serving each parameter, parameters not listed are served by main data
+    _GET_REQUEST_FOR_PARAMETER = {
+        parameter: request for request, endpoint in _ENDPOINTS.items() if endpoint.method == "get"
+        for parameter in endpoint.parameters
+    }
+    _SET_REQUEST_FOR_PARAMETER = {
+        parameter: request for request, endpoint in _ENDPOINTS.items() if endpoint.method == "post"
+        for parameter in endpoint.parameters
+    }
 
     _TYPE_VELIS = "velis"
     _TYPE_LYDOS = "lydos"
@@ -281,34 +1225,10 @@ class AquaAristonHandler:
     }
 
     def _get_request_for_parameter(self, data):
-        if data in self._GET_REQUEST_ERRORS:
-            return self._REQUEST_GET_ERROR
-        elif data in self._GET_REQUEST_CLEANSE:
-            return self._REQUEST_GET_CLEANSE
-        elif data in self._GET_REQUEST_UPDATE:
-            return self._REQUEST_GET_VERSION
-        elif data in self._GET_REQUEST_TIME_PROGRAM:
-            return self._REQUEST_GET_TIME_PROG
-        elif data in self._GET_REQUEST_USE:
-            return self._REQUEST_GET_USE
-        elif data in self._GET_REQUEST_SHOWERS:
-            return self._REQUEST_GET_SHOWERS
-        else:
-            return self._REQUEST_GET_MAIN
+        return self._GET_REQUEST_FOR_PARAMETER.get(data, self._REQUEST_GET_MAIN)
 
     def _set_request_for_parameter(self, data):
-        if data in self._SET_REQUEST_ON:
-            return self._REQUEST_SET_ON
-        elif data in self._SET_REQUEST_TEMPERATURE:
-            return self._REQUEST_SET_TEMPERATURE
-        elif data in self._SET_REQUEST_ECO:
-            return self._REQUEST_SET_ECO
-        elif data in self._SET_REQUEST_CLEANSE:
-            return self._REQUEST_SET_CLEANSE
-        elif data in self._SET_REQUEST_SHOWERS:
-            return self._REQUEST_SET_SHOWERS
-        else:
-            return self._REQUEST_SET_MAIN
+        return self._SET_REQUEST_FOR_PARAMETER.get(data, self._REQUEST_SET_MAIN)
 
     def __init__(self,
                  username: str,
@@ -321,6 +1241,8 @@ class AquaAristonHandler:
                  store_folder: str = "",
                  logging_level: str = _LEVEL_NOTSET,
                  gw: str = "",
+                 hedging: bool = False,
+                 fleet_read: bool = False,
                  ) -> None:
         """
         Initialize API.
@@ -361,15 +1283,11 @@ class AquaAristonHandler:
                 os.makedirs(self._store_folder)
 
         """
-        Logging settings
+        Logging settings, records are prefixed by the gateway or plant id
         """
-        self._logging_level = logging.getLevelName(logging_level)
-        self._LOGGER.setLevel(self._logging_level)
-        self._console_handler = logging.StreamHandler()
-        self._console_handler.setLevel(self._logging_level)
-        self._formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        self._console_handler.setFormatter(self._formatter)
-        self._LOGGER.addHandler(self._console_handler)
+        _setup_logging(logging.getLevelName(logging_level))
+        self._log_context = {"device": gw or "aqua"}
+        self._LOGGER = _DeviceLoggerAdapter(_LOGGER, self._log_context)
 
         self._available = False
         self._dhw_available = False
@@ -384,9 +1302,7 @@ class AquaAristonHandler:
         self._ariston_sensors = dict()
         self._subscribed_sensors_old = dict()
         for sensor_all in self._SENSOR_LIST:
-            self._ariston_sensors[sensor_all] = dict()
-            self._ariston_sensors[sensor_all][self._VALUE] = None
-            self._ariston_sensors[sensor_all][self._UNITS] = None
+            self._ariston_sensors[sensor_all] = _SensorRecord()
             if sensor_all in {
                 self._PARAM_CURRENT_TEMPERATURE,
                 self._PARAM_REQUIRED_TEMPERATURE,
@@ -394,7 +1310,7 @@ class AquaAristonHandler:
                 self._PARAM_CLEANSE_MIN,
                 self._PARAM_CLEANSE_MAX
             }:
-                self._ariston_sensors[sensor_all][self._UNITS] = "°C"
+                self._ariston_sensors[sensor_all].units = "°C"
             if sensor_all in {
                 self._PARAM_ENERGY_USE_DAY,
                 self._PARAM_ENERGY_USE_WEEK,
@@ -405,8 +1321,15 @@ class AquaAristonHandler:
                 self._PARAM_ENERGY_USE_MONTH_PERIODS,
                 self._PARAM_ENERGY_USE_YEAR_PERIODS,
             }:
-                self._ariston_sensors[sensor_all][self._UNITS] = "kWh"
-            self._subscribed_sensors_old[sensor_all] = copy.deepcopy(self._ariston_sensors[sensor_all])
+                self._ariston_sensors[sensor_all].units = "kWh"
+            self._subscribed_sensors_old[sensor_all] = self._ariston_sensors[sensor_all].copy()
+
+        self._snapshot_lock = threading.Lock()
+        self._snapshot = SensorSnapshot(
+            version=0,
+            values=MappingProxyType(
+                {sensor: self._freeze_sensor(record) for sensor, record in self._ariston_sensors.items()}),
+            versions=MappingProxyType({sensor: 0 for sensor in self._ariston_sensors}))
 
         self._boiler_type = boiler_type
         if boiler_type == self._TYPE_VELIS:
@@ -426,6 +1349,18 @@ class AquaAristonHandler:
         self._max_temp_green = 53
         self._showers_required_temp = 0
         self._showers_mode = self._VAL_SHOWERS
+        self._set_values_cache = {}
+        self._set_values_cache_key = None
+        self._energy_history = None
+        self._energy_reports = []
+        self._single_flight = _SingleFlight()
+        # hash of the last accepted reply per request
+        self._body_hashes = {}
+        self._time_program = None
+        self._thermal_model = _ThermalModel()
+        # copy of the model replaced as a whole after each update, read without locks
+        self._thermal_state = _ThermalModel()
+        self._showers_controller = None
         # clear configuration data
         self._ariston_main_data = {}
         self._ariston_error_data = []
@@ -440,8 +1375,6 @@ class AquaAristonHandler:
         self._timer_set_delay = threading.Timer(1, self._preparing_setting_http_data)
         self._data_lock = threading.Lock()
         self._errors = 0
-        self._get_request_number_low_prio = 0
-        self._get_request_number_high_prio = 0
         self._get_time_start = {
             self._REQUEST_GET_MAIN: 0.,
             self._REQUEST_GET_ERROR: 0.,
@@ -458,12 +1391,15 @@ class AquaAristonHandler:
             self._REQUEST_GET_USE: 0.,
             self._REQUEST_GET_SHOWERS: 0.,
         }
+        # start of the request which fetched the stored data, only data requested after setting confirms it
+        self._get_data_start = dict(self._get_time_start)
         self._lock = threading.Lock()
         self._login = False
         self._password = password
         self._plant_id = ""
+        self._endpoint_urls = {}
         self._plant_id_lock = threading.Lock()
-        self._session = requests.Session()
+        self._session = _requests().Session()
         self._set_param = {}
         self._set_param_group = {
             self._REQUEST_GET_MAIN: False,
@@ -531,24 +1467,13 @@ class AquaAristonHandler:
         if sensors:
             for item in sensors:
                 self._valid_requests[self._get_request_for_parameter(item)] = True
-        # prepare list of higher priority
-        self._request_list_high_prio = []
-        if self._valid_requests[self._REQUEST_GET_MAIN]:
-            self._request_list_high_prio.append(self._REQUEST_GET_MAIN)
-        if self._valid_requests[self._REQUEST_GET_SHOWERS]:
-            self._request_list_high_prio.append(self._REQUEST_GET_SHOWERS)
-        if self._valid_requests[self._REQUEST_GET_CLEANSE]:
-            self._request_list_high_prio.append(self._REQUEST_GET_CLEANSE)
-        if self._valid_requests[self._REQUEST_GET_ERROR]:
-            self._request_list_high_prio.append(self._REQUEST_GET_ERROR)
-        # prepare list of lower priority
-        self._request_list_low_prio = []
-        if self._valid_requests[self._REQUEST_GET_TIME_PROG]:
-            self._request_list_low_prio.append(self._REQUEST_GET_TIME_PROG)
-        if self._valid_requests[self._REQUEST_GET_USE]:
-            self._request_list_low_prio.append(self._REQUEST_GET_USE)
-        if self._valid_requests[self._REQUEST_GET_VERSION]:
-            self._request_list_low_prio.append(self._REQUEST_GET_VERSION)
+        # prepare schedule of requests
+        self._scheduler = _DeadlineScheduler()
+        self._polling = polling
+        for request, endpoint in self._ENDPOINTS.items():
+            if endpoint.max_age is not None and self._valid_requests[request]:
+                self._schedule_request(request)
+        self._capabilities = None
 
         # initiate timer between requests within one loop
         self._timer_between_param_delay = self._HTTP_PARAM_DELAY * polling
@@ -557,10 +1482,46 @@ class AquaAristonHandler:
         self._timeout_long = self._HTTP_TIMEOUT_GET_LONG * polling
         self._timeout_medium = self._HTTP_TIMEOUT_GET_MEDIUM * polling
         self._timeout_short = self._HTTP_TIMEOUT_GET_SHORT * polling
+        self._timeouts = {
+            "long": self._timeout_long,
+            "medium": self._timeout_medium,
+            "short": self._timeout_short,
+        }
 
         # initiate timer between set request attempts
         self._timer_between_set = self._timer_between_param_delay + self._HTTP_TIMER_SET_WAIT
 
+        # circuit breakers per endpoint, main data only trips when API is considered offline anyway
+        self._breakers = dict()
+        for request in self._get_time_start:
+            self._breakers[request] = _CircuitBreaker(
+                threshold=self._BREAKER_THRESHOLD,
+                backoff=self._timer_between_param_delay * self._HTTP_DELAY_MULTIPLY,
+                max_backoff=self._BREAKER_BACKOFF_MAX)
+        self._breakers[self._REQUEST_GET_MAIN] = _CircuitBreaker(
+            threshold=self._MAX_ERRORS + 1,
+            backoff=self._timer_between_param_delay,
+            max_backoff=self._BREAKER_BACKOFF_MAX_MAIN)
+        self._breakers[self._REQUEST_GET_VERSION] = _CircuitBreaker(
+            threshold=self._BREAKER_THRESHOLD,
+            backoff=self._timer_between_param_delay * self._HTTP_DELAY_MULTIPLY,
+            max_backoff=self._BREAKER_BACKOFF_MAX)
+
+        # hedging of main data requests
+        self._hedging = hedging
+        self._hedge_lock = threading.Lock()
+        self._main_latencies = deque(maxlen=self._HEDGE_SAMPLES)
+        self._hedged_recently = deque(maxlen=self._HEDGE_SAMPLES)
+        self._hedge_stats = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_won": 0,
+        }
+
+        # reading of main data from listing of all plants of the account
+        self._fleet_read = fleet_read
+        self._fleet_main_max_age = self._FLEET_MAIN_MAX_AGE * polling
+
         self._current_temp_economy_ch = None
         self._current_temp_economy_dhw = None
 
@@ -571,8 +1532,8 @@ class AquaAristonHandler:
         if self._boiler_type == self._TYPE_VELIS:
             # presumably it is Velis, which uses showers instead of temperatures
             self._valid_requests[self._REQUEST_GET_SHOWERS] = True
-            if self._REQUEST_GET_SHOWERS not in self._request_list_high_prio:
-                self._request_list_high_prio.insert(1, self._REQUEST_GET_SHOWERS)
+            if self._REQUEST_GET_SHOWERS not in self._scheduler:
+                self._schedule_request(self._REQUEST_GET_SHOWERS)
                 self._showers_mode = self._VAL_SHOWERS
                 self._read_showers_temp()
                 if not os.path.isdir(self._store_folder):
@@ -643,32 +1604,60 @@ class AquaAristonHandler:
 
         for sensor in self._SENSOR_LIST:
             if sensor in self._ariston_sensors:
-                if self._ariston_sensors[sensor][self._VALUE] != self._subscribed_sensors_old[sensor][self._VALUE] or \
-                    self._ariston_sensors[sensor][self._UNITS] != self._subscribed_sensors_old[sensor][self._UNITS]:
+                if self._ariston_sensors[sensor].value != self._subscribed_sensors_old[sensor].value or \
+                    self._ariston_sensors[sensor].units != self._subscribed_sensors_old[sensor].units:
                     
-                    if isinstance(self._ariston_sensors[sensor][self._VALUE], dict) and isinstance(self._subscribed_sensors_old[sensor][self._VALUE], dict):
-                        if self._ariston_sensors[sensor][self._VALUE] == {} or self._subscribed_sensors_old[sensor][self._VALUE] == {}:
+                    if isinstance(self._ariston_sensors[sensor].value, dict) and isinstance(self._subscribed_sensors_old[sensor].value, dict):
+                        if self._ariston_sensors[sensor].value == {} or self._subscribed_sensors_old[sensor].value == {}:
                             inform = True
-                        elif len(self._ariston_sensors[sensor][self._VALUE]) != len(self._subscribed_sensors_old[sensor][self._VALUE]):
+                        elif len(self._ariston_sensors[sensor].value) != len(self._subscribed_sensors_old[sensor].value):
                             inform = True
                         else:
                             inform = False
-                            for key, value in self._ariston_sensors[sensor][self._VALUE].items():
-                                if self._subscribed_sensors_old[sensor][self._VALUE][key] != value:
+                            for key, value in self._ariston_sensors[sensor].value.items():
+                                if self._subscribed_sensors_old[sensor].value[key] != value:
                                     inform = True
                     else:
                         inform = True
 
                     if inform:
-                        self._subscribed_sensors_old[sensor] = copy.deepcopy(self._ariston_sensors[sensor])
+                        self._subscribed_sensors_old[sensor] = self._ariston_sensors[sensor].copy()
                         changed_data[sensor] = self._ariston_sensors[sensor]
 
         if changed_data:
+            self._publish_snapshot(changed_data)
             for iteration in range(len(self._subscribed)):
                 self._subscribed_thread = threading.Timer(
                     0, self._subscribed[iteration], args=(changed_data, *self._subscribed_args[iteration]), kwargs=self._subscribed_kwargs[iteration])
                 self._subscribed_thread.start()
 
+    @staticmethod
+    def _freeze_sensor(record):
+        """Read only copy of the sensor record"""
+        value = record.value
+        if isinstance(value, dict):
+            value = MappingProxyType(dict(value))
+        elif isinstance(value, list):
+            value = tuple(value)
+        return MappingProxyType({
+            AquaAristonHandler._VALUE: value,
+            AquaAristonHandler._UNITS: record.units,
+        })
+
+    def _publish_snapshot(self, changed_data):
+        """Publish new snapshot, only changed sensors are copied"""
+        with self._snapshot_lock:
+            version = self._snapshot.version + 1
+            values = dict(self._snapshot.values)
+            versions = dict(self._snapshot.versions)
+            for sensor, record in changed_data.items():
+                values[sensor] = self._freeze_sensor(record)
+                versions[sensor] = version
+            self._snapshot = SensorSnapshot(
+                version=version,
+                values=MappingProxyType(values),
+                versions=MappingProxyType(versions))
+
     def _subscribers_statuses_inform(self, changed_data):
         """Inform subscribers about changed API statuses"""
         for iteration in range(len(self._subscribed2)):
@@ -758,14 +1747,112 @@ class AquaAristonHandler:
 
         'units' key is used to fetch units of measurement for specific sensor/parameter.
 
+        Dictionary is being changed while data is fetched, use 'snapshot' for consistent data.
         """
         return self._ariston_sensors
 
+    def snapshot(self) -> SensorSnapshot:
+        """
+        Return latest immutable snapshot of sensors.
+
+        Snapshot can be read from any thread without locking. Use 'version' of the snapshot and
+        'changed_since' to check if anything changed since previously read snapshot.
+        """
+        return self._snapshot
+
     @property
     def setting_data(self) -> bool:
         """Return if setting of data is in progress."""
         return self._changing_data
 
+    @property
+    def energy_reports(self) -> list:
+        """
+        Return aggregated energy reports for day, week, month and year as a list of dictionaries with keys:
+            - 'total' - total energy use;
+            - 'periods' - energy use per period;
+            - 'deltas' - change of energy use from the previous period;
+            - 'running_sums' - energy use since the first period.
+        Missing reports are returned as None.
+        """
+        return self._energy_reports
+
+    def energy_history(self, series: str) -> tuple:
+        """
+        Return long term energy use history as a tuple of period start timestamps and values.
+        'series' is one of 'day', 'week', 'month' or 'year' and defines length of periods,
+        which equals length of respective report divided by amount of values in it.
+        History is collected only if any of energy use sensors is used.
+        """
+        if self._energy_history is None or series not in _EnergyHistory.SERIES:
+            return (), ()
+        return self._energy_history.history(series)
+
+    def energy_use_between(self, series: str, start: float, end: float) -> Union[float, None]:
+        """
+        Return energy use from long term history for periods of the 'series' starting
+        between timestamps 'start' (included) and 'end' (excluded).
+        """
+        if self._energy_history is None or series not in _EnergyHistory.SERIES:
+            return None
+        return self._energy_history.energy_use(series, start, end)
+
+    @property
+    def current_program_setpoint(self) -> Union[float, None]:
+        """Return setpoint of time program active at this moment or None if time program is not known."""
+        time_program = self._time_program
+        if time_program is None:
+            return None
+        return time_program.current(time.time())
+
+    @property
+    def next_program_event(self) -> Union[tuple, None]:
+        """
+        Return next change of time program as a tuple of timestamp and setpoint
+        or None if time program is not known.
+        """
+        time_program = self._time_program
+        if time_program is None:
+            return None
+        return time_program.next_event(time.time())
+
+    @property
+    def temperature_estimate(self) -> Union[tuple, None]:
+        """
+        Return temperature estimated by thermal model at this moment and its confidence between 0 and 1
+        or None if no temperature was fetched yet.
+        """
+        now = time.time()
+        thermal_state = self._thermal_state
+        estimate = thermal_state.estimate(now)
+        if estimate is None:
+            return None
+        return round(estimate, 1), round(thermal_state.confidence(now), 2)
+
+    @property
+    def hedging_stats(self) -> dict:
+        """
+        Return statistics of hedged main data requests:
+            - 'requests' - number of main data requests;
+            - 'hedged' - number of requests where second request was sent;
+            - 'hedge_won' - number of requests where second request replied first;
+            - 'threshold' - current delay in seconds before second request is sent;
+            - 'joined' - number of data requests joined to identical request in progress.
+        """
+        with self._hedge_lock:
+            stats = dict(self._hedge_stats)
+            stats["threshold"] = self._hedge_threshold(self._timeout_long)
+        stats["joined"] = self._single_flight.joined
+        return stats
+
+    @property
+    def circuit_breakers(self) -> dict:
+        """
+        Return state of circuit breakers per request for troubleshooting.
+        Requests with 'open' breaker are skipped until 'retry_in' seconds pass.
+        """
+        return {request: breaker.diagnostics() for request, breaker in self._breakers.items()}
+
     @property
     def supported_sensors_get(self) -> set:
         """
@@ -795,7 +1882,34 @@ class AquaAristonHandler:
                 - 'step' is used to indicate step;
 
         data from this property is used for 'set_http_data' method.
+        Dictionary is shared between calls until allowed values change and must not be modified.
         """
+        key = self._set_values_key()
+        if key != self._set_values_cache_key:
+            self._set_values_cache = self._build_set_values()
+            self._set_values_cache_key = key
+        return self._set_values_cache
+
+    def _set_values_key(self):
+        """Data allowed values to be set depend on"""
+        mode = None
+        if self._boiler_type == self._TYPE_LYDOS_HYBRID:
+            mode = self._ariston_sensors[self._PARAM_MODE].value
+        cleanse = self._ariston_cleanse_data
+        showers = self._ariston_shower_data
+        return (
+            bool(cleanse),
+            cleanse.get("MedMaxSetpointTemperatureMin") if cleanse else None,
+            cleanse.get("MedMaxSetpointTemperatureMax") if cleanse else None,
+            bool(showers),
+            showers.get("maxReqShw") if showers else None,
+            self._max_temp_boiler,
+            self._max_temp_green,
+            mode,
+        )
+
+    def _build_set_values(self):
+        """Build dictionary of allowed values to be set"""
         sensors_dictionary = {}
         for parameter in self._SENSOR_SET_LIST:
             if parameter == self._PARAM_MODE:
@@ -821,7 +1935,7 @@ class AquaAristonHandler:
                 param_values["max"] = self._max_temp_boiler
                 if self._boiler_type == self._TYPE_LYDOS_HYBRID:
                     if self._ariston_sensors and self._PARAM_MODE in self._ariston_sensors:
-                        if self._ariston_sensors[self._PARAM_MODE][self._VALUE] in {self._MODE_GREEN}:
+                        if self._ariston_sensors[self._PARAM_MODE].value in {self._MODE_GREEN}:
                             param_values["max"] = self._max_temp_green
                 param_values["step"] = 1.
                 sensors_dictionary[parameter] = param_values
@@ -867,26 +1981,30 @@ class AquaAristonHandler:
             self._write_showers_temp()
 
     def _check_showers_temp(self):
+        if self._boiler_type == self._TYPE_VELIS and self._showers_controller \
+                and self._ariston_main_data and self._ariston_shower_data:
+            self._showers_controller.observe(
+                self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS].value,
+                self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE].value,
+                self._ariston_sensors[self._PARAM_HEATING].value)
         if self._boiler_type == self._TYPE_VELIS and self._showers_mode == self._VAL_TEMPERATURE \
-                and self._ariston_main_data and self._ariston_shower_data and self._showers_required_temp:
+                and self._showers_controller and self._ariston_main_data and self._ariston_shower_data \
+                and self._showers_required_temp and self._PARAM_REQUIRED_SHOWERS not in self._set_param:
             try:
-                current_temp = self.sensor_values[self._PARAM_CURRENT_TEMPERATURE][self._VALUE]
-                current_showers = self.sensor_values[self._PARAM_REQUIRED_SHOWERS][self._VALUE]
+                current_temp = self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE].value
+                current_showers = self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS].value
                 max_showers = self.supported_sensors_set_values[self._PARAM_REQUIRED_SHOWERS]["max"]
-                min_showers = self.supported_sensors_set_values[self._PARAM_REQUIRED_SHOWERS]["max"]
-                heating = self.sensor_values[self._PARAM_HEATING][self._VALUE]
-                power = self.sensor_values[self._PARAM_ON][self._VALUE]
-                required_showers = current_showers
-                if current_temp and current_showers and max_showers and min_showers:
-                    if current_temp > self._showers_required_temp:
-                        # decrease showers
-                        if current_showers > min_showers and power:
-                            required_showers = current_showers - 1
-                    elif current_temp < self._showers_required_temp - 2:
-                        # increase showers
-                        if current_showers < max_showers and not heating and power:
-                            required_showers = current_showers + 1
+                min_showers = self.supported_sensors_set_values[self._PARAM_REQUIRED_SHOWERS]["min"]
+                heating = self._ariston_sensors[self._PARAM_HEATING].value
+                power = self._ariston_sensors[self._PARAM_ON].value
+                if current_temp and current_showers and max_showers and min_showers and power:
+                    required_showers = self._showers_controller.target(
+                        current_showers, min_showers, max_showers, current_temp, self._showers_required_temp, heating)
                     if current_showers != required_showers:
+                        if not self._showers_controller.allow_set(time.time()):
+                            self._LOGGER.debug('Showers change to %s postponed, hourly limit of changes reached',
+                                               required_showers)
+                            return
                         self._set_param[self._PARAM_REQUIRED_SHOWERS] = required_showers
                         self._set_visible_data()
                         self._set_new_data_pending = True
@@ -896,9 +2014,105 @@ class AquaAristonHandler:
                             self._timer_set_delay = threading.Timer(1, self._preparing_setting_http_data)
                             self._timer_set_delay.start()
             except KeyError:
-                self._LOGGER.info("%s check showers exception", self)
+                self._LOGGER.info("check showers exception")
         return
 
+    def _account_gateways(self, plant_id, refresh=False):
+        """
+        Return gateways of the account. The list is fetched once for all handlers of the same account
+        and kept for a time to live, so that repeated logins skip fetching and parsing of the page.
+        """
+        key = (self._url, self._user)
+        with _GATEWAY_CACHE_LOCK:
+            fetch_lock = _GATEWAY_FETCH_LOCKS.setdefault(key, threading.Lock())
+        with fetch_lock:
+            cached = _GATEWAY_CACHE.get(key)
+            if not refresh and cached and time.time() - cached[0] < self._GATEWAY_CACHE_TTL:
+                return cached[1]
+            url = self._url + "/R2/PlantManagement/Index/" + plant_id
+            try:
+                resp = self._session.get(
+                        url,
+                        auth=self._token,
+                        timeout=self._HTTP_TIMEOUT_LOGIN,
+                        verify=True)
+            except requests.exceptions.RequestException:
+                self._LOGGER.warning('Checking gateways error')
+                raise Exception("Checking gateways error")
+            if resp.status_code != 200:
+                self._LOGGER.warning('Checking gateways error')
+                raise Exception("Checking gateways error")
+            gateways = frozenset(self._GW_ID_PATTERN.findall(resp.text))
+            if gateways:
+                _GATEWAY_CACHE[key] = (time.time(), gateways)
+            return gateways
+
+    def _account_plants(self):
+        """
+        Return time when the listing was requested and plants of the account by gateway. The listing
+        is fetched once per cycle for all handlers of the same account.
+        """
+        key = (self._url, self._user)
+        with _FLEET_CACHE_LOCK:
+            fetch_lock = _FLEET_FETCH_LOCKS.setdefault(key, threading.Lock())
+        with fetch_lock:
+            cached = _FLEET_CACHE.get(key)
+            if cached and time.time() - cached[0] < self._timer_between_param_delay:
+                return cached
+            started = time.time()
+            url = self._url + "/api/v2/velis/plants?appId=com.remotethermo.velis"
+            try:
+                resp = self._session.get(
+                    url,
+                    auth=self._token,
+                    timeout=self._timeout_long,
+                    verify=True)
+            except requests.exceptions.RequestException:
+                raise Exception("Plants listing has failed with an exception")
+            if resp.status_code != 200:
+                raise Exception("Unexpected code {} received for plants listing".format(resp.status_code))
+            try:
+                listing = resp.json()
+            except ValueError:
+                listing = None
+            if not isinstance(listing, list):
+                raise Exception("Plants listing is not a list")
+            plants = {
+                plant[self._FLEET_PLANT_KEY]: plant for plant in listing
+                if isinstance(plant, dict) and self._FLEET_PLANT_KEY in plant
+            }
+            _FLEET_CACHE[key] = (started, plants)
+            return _FLEET_CACHE[key]
+
+    def _fleet_main_read(self):
+        """Update main data from plants listing, return False if main data is to be fetched from the plant"""
+        with self._data_lock:
+            main_data = self._ariston_main_data
+            if not main_data or self._set_param or \
+                    time.time() - self._get_time_start[self._REQUEST_GET_MAIN] >= self._fleet_main_max_age:
+                return False
+        try:
+            started, plants = self._account_plants()
+            plant = plants.get(self._plant_id)
+        except Exception as ex:
+            self._LOGGER.warning('Reading plants listing failed: %s', ex)
+            return False
+        polled_values = self._FLEET_MAIN_VALUES & main_data.keys()
+        if not plant or not polled_values <= plant.keys():
+            self._LOGGER.debug('Main values are missing in plants listing')
+            return False
+        with self._data_lock:
+            if self._set_param:
+                return False
+            data = dict(self._ariston_main_data)
+            data.update((key, plant[key]) for key in self._FLEET_MAIN_VALUES & data.keys())
+            self._store_data(data, self._REQUEST_GET_MAIN)
+            self._get_data_start[self._REQUEST_GET_MAIN] = started
+            # next reply of the plant itself is to be parsed again
+            self._body_hashes.pop(self._REQUEST_GET_MAIN, None)
+        self._store_fetched_data(self._REQUEST_GET_MAIN)
+        return True
+
     def _get_plant_id(self, resp):
         plant_id = ""
         if resp.url.startswith(self._url + "/PlantDashboard/Index/") or resp.url.startswith(
@@ -917,34 +2131,22 @@ class AquaAristonHandler:
         elif resp.url.startswith(self._url + "/R2/Plant/Index/"):
             plant_id = resp.url.split("/")[6].split("?")[0]
         else:
-            self._LOGGER.warning('%s Authentication login error', self)
+            self._LOGGER.warning('Authentication login error')
             raise Exception("Login parsing of URL failed")
         if plant_id:
             if self._default_gw:
                 # If GW is specified, it can differ from the default
-                url = self._url + "/R2/PlantManagement/Index/" + plant_id
-                try:
-                    resp = self._session.get(
-                            url,
-                            auth=self._token,
-                            timeout=self._HTTP_TIMEOUT_LOGIN,
-                            verify=True)
-                except requests.exceptions.RequestException:
-                    self._LOGGER.warning('%s Checking gateways error', self)
-                    raise Exception("Checking gateways error")
-                if resp.status_code != 200:
-                    self._LOGGER.warning('%s Checking gateways error', self)
-                    raise Exception("Checking gateways error")
-                gateways = set()
-                for item in re.findall(r'"GwId":"[a-zA-Z0-9]+"', resp.text):
-                    detected_gw = item.replace('"GwId"', '').replace(':', '').replace('"', '').replace(' ', '')
-                    gateways.add(detected_gw)
+                gateways = self._account_gateways(plant_id)
+                if self._default_gw not in gateways:
+                    # gateway might have been added to the account after the list was cached
+                    gateways = self._account_gateways(plant_id, refresh=True)
                 gateways_txt = ", ".join(gateways)
                 if self._default_gw not in gateways:
-                    self._LOGGER.error(f'Gateway "{self._default_gw}" is not in the list of allowed gateways: {gateways_txt}')
+                    self._LOGGER.error('Gateway "%s" is not in the list of allowed gateways: %s',
+                                       self._default_gw, gateways_txt)
                     raise Exception(f'Gateway "{self._default_gw}" is not in the list of allowed gateways: {gateways_txt}')
                 else:
-                    self._LOGGER.info(f'Allowed gateways: {gateways_txt}')
+                    self._LOGGER.info('Allowed gateways: %s', gateways_txt)
                 plant_id = self._default_gw
 
         return plant_id
@@ -965,7 +2167,7 @@ class AquaAristonHandler:
                     json=login_data,
                     verify=True)
             except requests.exceptions.RequestException:
-                self._LOGGER.warning('%s Authentication login error', self)
+                self._LOGGER.warning('Authentication login error')
                 raise Exception("Login request exception")
             if resp.status_code != 200:
                 if self._store_file:
@@ -975,7 +2177,7 @@ class AquaAristonHandler:
                     store_file_path = os.path.join(self._store_folder, store_file)
                     with open(store_file_path, "w") as f:
                         f.write(resp.text)
-                self._LOGGER.warning('%s Unexpected reply during login: %s', self, resp.status_code)
+                self._LOGGER.warning('Unexpected reply during login: %s', resp.status_code)
                 raise Exception("Login unexpected reply code")
 
             plant_id = self._get_plant_id(resp)  
@@ -984,12 +2186,23 @@ class AquaAristonHandler:
                 with self._plant_id_lock:
                     self._plant_id = plant_id
                     self._gw_name = plant_id + '_'
+                    self._endpoint_urls = {
+                        request: endpoint.url.format(url=self._url, boiler=self._boiler_str, plant=plant_id)
+                        for request, endpoint in self._ENDPOINTS.items()
+                    }
+                    self._log_context["device"] = plant_id
                 # self._model_fetch()
                 if self._boiler_type == self._TYPE_LYDOS_HYBRID:
                     self._fetch_max_temp()
+                if self._valid_requests[self._REQUEST_GET_USE] and self._energy_history is None:
+                    self._energy_history = _EnergyHistory(self._store_folder, self._gw_name)
+                if self._boiler_type == self._TYPE_VELIS and self._showers_controller is None:
+                    self._showers_controller = _ShowersController(self._store_folder, self._gw_name)
+                if self._capabilities is None:
+                    self._discover_capabilities()
                 with self._plant_id_lock:
                     self._login = True
-                    self._LOGGER.info('%s Plant ID is %s', self, self._plant_id)
+                    self._LOGGER.info('Plant ID is %s', self._plant_id)
         return
 
     def _model_fetch(self):
@@ -1002,7 +2215,7 @@ class AquaAristonHandler:
                 timeout=self._timeout_long,
                 verify=True)
         except requests.exceptions.RequestException:
-            self._LOGGER.warning('%s Authentication model fetch error', self)
+            self._LOGGER.warning('Authentication model fetch error')
             raise Exception("Model fetch exception")
         if resp.status_code != 200:
             if self._store_file:
@@ -1012,7 +2225,7 @@ class AquaAristonHandler:
                 store_file_path = os.path.join(self._store_folder, store_file)
                 with open(store_file_path, "w") as f:
                     f.write(resp.text)
-            self._LOGGER.warning('%s Unexpected reply during model fetch: %s', self, resp.status_code)
+            self._LOGGER.warning('Unexpected reply during model fetch: %s', resp.status_code)
             raise Exception("Model unexpected reply code")
         if self._json_validator(resp.json()):
             for plant_instance in resp.json():
@@ -1035,13 +2248,13 @@ class AquaAristonHandler:
                     timeout=self._timeout_long,
                     verify=True)
             except requests.exceptions.RequestException as ex:
-                self._LOGGER.warning('%s Could not fetch maximum: %s', self, ex)
+                self._LOGGER.warning('Could not fetch maximum: %s', ex)
                 time.sleep(5)
                 continue
             else:
 
                 if resp.status_code != 200 or not self._json_validator(resp.json()):
-                    self._LOGGER.warning('%s Could not fetch maximum', self)
+                    self._LOGGER.warning('Could not fetch maximum')
                     time.sleep(5)
                     continue
 
@@ -1071,22 +2284,22 @@ class AquaAristonHandler:
             if self.available and self._ariston_main_data != {}:
 
                 try:
-                    self._ariston_sensors[self._PARAM_MODE][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_MODE].value = \
                         self._val_to_mode[self._ariston_main_data["mode"]]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_MODE][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_MODE].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_ON][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_ON].value = \
                         self._ariston_main_data["on"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_ON][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_ON].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE].value = \
                         self._ariston_main_data["temp"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE].value = None
 
                 try:
                     required_temp = self._ariston_main_data["reqTemp"]
@@ -1095,109 +2308,109 @@ class AquaAristonHandler:
                             self._read_showers_temp()
                             # mode to base on temperature for boiler using only showers
                             required_temp = self._showers_required_temp
-                    self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE][self._VALUE] = required_temp
+                    self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE].value = required_temp
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_SHOWERS][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_SHOWERS].value = \
                         self._ariston_main_data["avShw"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_SHOWERS][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_SHOWERS].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_HEATING][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_HEATING].value = \
                         self._ariston_main_data["heatReq"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_HEATING][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_HEATING].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_CLEANSE][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_CLEANSE].value = \
                         self._ariston_main_data["antiLeg"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_CLEANSE][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_CLEANSE].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_ECO][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_ECO].value = \
                         self._ariston_main_data["eco"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_ECO][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_ECO].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_TIMER][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_TIMER].value = \
                         self._ariston_main_data["rmTm"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_TIMER][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_TIMER].value = None
 
             else:
-                self._ariston_sensors[self._PARAM_MODE][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ON][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_SHOWERS][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_HEATING][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_CLEANSE][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ECO][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_TIMER][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_MODE].value = None
+                self._ariston_sensors[self._PARAM_ON].value = None
+                self._ariston_sensors[self._PARAM_CURRENT_TEMPERATURE].value = None
+                self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE].value = None
+                self._ariston_sensors[self._PARAM_SHOWERS].value = None
+                self._ariston_sensors[self._PARAM_HEATING].value = None
+                self._ariston_sensors[self._PARAM_CLEANSE].value = None
+                self._ariston_sensors[self._PARAM_ECO].value = None
+                self._ariston_sensors[self._PARAM_TIMER].value = None
 
         elif request_type == self._REQUEST_GET_SHOWERS:
 
             if self.available and self._ariston_shower_data:
 
                 try:
-                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS].value = \
                         self._ariston_shower_data["reqShw"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS_MAX][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS_MAX].value = \
                         self._ariston_shower_data["maxReqShw"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS_MAX][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS_MAX].value = None
 
             else:
-                self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS_MAX][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS].value = None
+                self._ariston_sensors[self._PARAM_REQUIRED_SHOWERS_MAX].value = None
 
         elif request_type == self._REQUEST_GET_ERROR:
 
             if self.available:
 
                 try:
-                    self._ariston_sensors[self._PARAM_ERRORS][self._VALUE] = self._ariston_error_data
+                    self._ariston_sensors[self._PARAM_ERRORS].value = self._ariston_error_data
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_ERRORS][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_ERRORS].value = None
 
             else:
-                self._ariston_sensors[self._PARAM_ERRORS][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_ERRORS].value = None
 
         elif request_type == self._REQUEST_GET_CLEANSE:
 
             if self.available and self._ariston_cleanse_data != []:
 
                 try:
-                    self._ariston_sensors[self._PARAM_CLEANSE_MIN][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_CLEANSE_MIN].value = \
                         self._ariston_cleanse_data["MedMaxSetpointTemperatureMin"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_CLEANSE_MIN][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_CLEANSE_MIN].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_CLEANSE_MAX][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_CLEANSE_MAX].value = \
                         self._ariston_cleanse_data["MedMaxSetpointTemperatureMax"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_CLEANSE_MAX][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_CLEANSE_MAX].value = None
 
                 try:
-                    self._ariston_sensors[self._PARAM_CLEANSE_TEMPERATURE][self._VALUE] = \
+                    self._ariston_sensors[self._PARAM_CLEANSE_TEMPERATURE].value = \
                         self._ariston_cleanse_data["MedMaxSetpointTemperature"]
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_CLEANSE_TEMPERATURE][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_CLEANSE_TEMPERATURE].value = None
 
             else:
-                self._ariston_sensors[self._PARAM_CLEANSE_MIN][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_CLEANSE_MAX][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_CLEANSE_TEMPERATURE][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_CLEANSE_MIN].value = None
+                self._ariston_sensors[self._PARAM_CLEANSE_MAX].value = None
+                self._ariston_sensors[self._PARAM_CLEANSE_TEMPERATURE].value = None
 
         elif request_type == self._REQUEST_GET_TIME_PROG:
 
@@ -1213,79 +2426,47 @@ class AquaAristonHandler:
                                     str(showers["temp"]) + "°C"
                     if not time_prog:
                         time_prog = None
-                    self._ariston_sensors[self._PARAM_TIME_PROGRAM][self._VALUE] = time_prog
+                    self._ariston_sensors[self._PARAM_TIME_PROGRAM].value = time_prog
                 except KeyError:
-                    self._ariston_sensors[self._PARAM_TIME_PROGRAM][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_TIME_PROGRAM].value = None
+
+                try:
+                    time_program = _TimeProgram(self._ariston_time_prog_data)
+                    self._time_program = time_program if time_program else None
+                except (KeyError, TypeError, ValueError):
+                    self._time_program = None
 
             else:
-                self._ariston_sensors[self._PARAM_TIME_PROGRAM][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_TIME_PROGRAM].value = None
+                self._time_program = None
 
         elif request_type == self._REQUEST_GET_USE:
 
             if self.available and self._ariston_use_data != {}:
 
-                try:
-                    total_use = 0
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_DAY_PERIODS][self._VALUE] = {}
-                    for iteration, item in enumerate(self._ariston_use_data[0]['v'], 1):
-                        self._ariston_sensors[self._PARAM_ENERGY_USE_DAY_PERIODS][self._VALUE][
-                            'Period' + str(iteration)] = round(item, 2)
-                        total_use += item
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_DAY][self._VALUE] = round(total_use, 2)
-                except KeyError:
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_DAY][self._VALUE] = None
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_DAY_PERIODS][self._VALUE] = None
-
-                try:
-                    total_use = 0
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK_PERIODS][self._VALUE] = {}
-                    for iteration, item in enumerate(self._ariston_use_data[1]['v'], 1):
-                        self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK_PERIODS][self._VALUE][
-                            'Period' + str(iteration)] = round(item, 2)
-                        total_use += item
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK][self._VALUE] = round(total_use, 2)
-                except KeyError:
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK][self._VALUE] = None
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK_PERIODS][self._VALUE] = None
-
-                try:
-                    total_use = 0
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH_PERIODS][self._VALUE] = {}
-                    for iteration, item in enumerate(self._ariston_use_data[2]['v'], 1):
-                        self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH_PERIODS][self._VALUE][
-                            'Period' + str(iteration)] = round(item, 2)
-                        total_use += item
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH][self._VALUE] = round(total_use, 2)
-                except KeyError:
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH][self._VALUE] = None
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH_PERIODS][self._VALUE] = None
-
-                try:
-                    total_use = 0
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR_PERIODS][self._VALUE] = {}
-                    for iteration, item in enumerate(self._ariston_use_data[3]['v'], 1):
-                        self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR_PERIODS][self._VALUE][
-                            'Period' + str(iteration)] = round(item, 2)
-                        total_use += item
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR][self._VALUE] = round(total_use, 2)
-                except KeyError:
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR][self._VALUE] = None
-                    self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR_PERIODS][self._VALUE] = None
+                self._energy_reports = _aggregate_energy(self._ariston_use_data, len(self._ENERGY_USE_SENSORS))
+                for (total_sensor, periods_sensor), report in zip(self._ENERGY_USE_SENSORS, self._energy_reports):
+                    if report is not None:
+                        self._ariston_sensors[periods_sensor].value = report["periods"]
+                        self._ariston_sensors[total_sensor].value = report["total"]
+                    else:
+                        self._ariston_sensors[total_sensor].value = None
+                        self._ariston_sensors[periods_sensor].value = None
 
             else:
-                self._ariston_sensors[self._PARAM_ENERGY_USE_DAY][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_DAY_PERIODS][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK_PERIODS][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH_PERIODS][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR_PERIODS][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_DAY].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_DAY_PERIODS].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_WEEK_PERIODS].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_MONTH_PERIODS].value = None
+                self._ariston_sensors[self._PARAM_ENERGY_USE_YEAR_PERIODS].value = None
 
         elif request_type == self._REQUEST_GET_VERSION:
             try:
                 if self._version != "":
-                    self._ariston_sensors[self._PARAM_ONLINE_VERSION][self._VALUE] = self._version
+                    self._ariston_sensors[self._PARAM_ONLINE_VERSION].value = self._version
                     web_version = self._version.split(".")
                     installed_version = self._VERSION.split(".")
                     web_symbols = len(web_version)
@@ -1294,20 +2475,20 @@ class AquaAristonHandler:
                         # same amount of symbols to check, update available if web has higher value
                         for symbol in range(0, web_symbols):
                             if int(web_version[symbol]) > int(installed_version[symbol]):
-                                self._ariston_sensors[self._PARAM_UPDATE][self._VALUE] = True
+                                self._ariston_sensors[self._PARAM_UPDATE].value = True
                                 break
                         else:
-                            self._ariston_sensors[self._PARAM_UPDATE][self._VALUE] = False
+                            self._ariston_sensors[self._PARAM_UPDATE].value = False
                     else:
                         # update available if web has higher value
-                        self._ariston_sensors[self._PARAM_UPDATE][self._VALUE] = True
+                        self._ariston_sensors[self._PARAM_UPDATE].value = True
                 else:
-                    self._ariston_sensors[self._PARAM_UPDATE][self._VALUE] = None
-                    self._ariston_sensors[self._PARAM_ONLINE_VERSION][self._VALUE] = None
+                    self._ariston_sensors[self._PARAM_UPDATE].value = None
+                    self._ariston_sensors[self._PARAM_ONLINE_VERSION].value = None
 
             except KeyError:
-                self._ariston_sensors[self._PARAM_UPDATE][self._VALUE] = None
-                self._ariston_sensors[self._PARAM_ONLINE_VERSION][self._VALUE] = None
+                self._ariston_sensors[self._PARAM_UPDATE].value = None
+                self._ariston_sensors[self._PARAM_ONLINE_VERSION].value = None
 
     def _set_visible_data(self):
         # set visible values as if they have in fact changed
@@ -1319,27 +2500,27 @@ class AquaAristonHandler:
 
                         if parameter == self._PARAM_MODE:
 
-                            self._ariston_sensors[parameter][self._VALUE] = self._val_to_mode[value]
+                            self._ariston_sensors[parameter].value = self._val_to_mode[value]
 
                         elif parameter == self._PARAM_ON:
 
-                            self._ariston_sensors[parameter][self._VALUE] = value
+                            self._ariston_sensors[parameter].value = value
 
                         elif parameter == self._PARAM_REQUIRED_TEMPERATURE:
 
-                            self._ariston_sensors[parameter][self._VALUE] = value
+                            self._ariston_sensors[parameter].value = value
 
                         elif parameter == self._PARAM_ECO:
 
-                            self._ariston_sensors[parameter][self._VALUE] = value
+                            self._ariston_sensors[parameter].value = value
 
                         elif parameter == self._PARAM_CLEANSE_TEMPERATURE:
 
-                            self._ariston_sensors[parameter][self._VALUE] = value
+                            self._ariston_sensors[parameter].value = value
 
                         elif parameter == self._PARAM_REQUIRED_SHOWERS:
 
-                            self._ariston_sensors[parameter][self._VALUE] = value
+                            self._ariston_sensors[parameter].value = value
 
             except KeyError:
                 continue
@@ -1347,8 +2528,8 @@ class AquaAristonHandler:
         self._subscribers_sensors_inform()
 
 
-    def _store_data(self, resp, request_type=""):
-        """Store received dictionary"""
+    def _parse_data(self, resp, request_type=""):
+        """Validate received reply and return its data"""
         if resp.status_code != 200:
             if self._store_file:
                 if not os.path.isdir(self._store_folder):
@@ -1357,9 +2538,13 @@ class AquaAristonHandler:
                 store_file_path = os.path.join(self._store_folder, store_file)
                 with open(store_file_path, "w") as f:
                     f.write(resp.text)
-            self._LOGGER.warning('%s %s invalid reply code %s', self, request_type, resp.status_code)
+            self._LOGGER.warning('%s invalid reply code %s', request_type, resp.status_code)
             raise Exception("Unexpected code {} received for the request {}".format(resp.status_code, request_type))
-        if not self._json_validator(resp.json()):
+        try:
+            data = resp.json()
+        except ValueError:
+            data = None
+        if not self._json_validator(data):
             if self._store_file:
                 if not os.path.isdir(self._store_folder):
                     os.makedirs(self._store_folder)
@@ -1367,97 +2552,95 @@ class AquaAristonHandler:
                 store_file_path = os.path.join(self._store_folder, store_file)
                 with open(store_file_path, "w") as f:
                     f.write(resp.text)
-            self._LOGGER.warning('%s %s No json detected', self, request_type)
+            self._LOGGER.warning('%s No json detected', request_type)
             raise Exception("JSON did not pass validation for the request {}".format(request_type))
+        return data
+
+    def _store_data(self, data, request_type=""):
+        """Store received dictionary, freshly parsed data replaces previous one as a whole"""
         if request_type == self._REQUEST_GET_MAIN:
-            try:
-                self._ariston_main_data = copy.deepcopy(resp.json())
-            except copy.error:
-                self._ariston_main_data = {}
-                self._set_statuses()
-                self._LOGGER.warning("%s Invalid data received for Main, not JSON", self)
-                raise Exception("Corruption at reading data of the request {}".format(request_type))
 
+            self._ariston_main_data = data
             self._set_statuses()
             self._set_sensors(request_type)
+            self._update_thermal_model(data)
             self._set_sensors(self._REQUEST_GET_VERSION)
             self._set_visible_data()
             self._read_showers_temp()
             self._check_showers_temp()
 
         elif request_type == self._REQUEST_GET_ERROR:
-            try:
-                self._ariston_error_data = copy.deepcopy(resp.json())
-            except copy.error:
-                self._ariston_error_data = []
-                self._LOGGER.warning("%s Invalid data received for Errors, not JSON", self)
-                raise Exception("Corruption at reading data of the request {}".format(request_type))
 
+            self._ariston_error_data = data
             self._set_sensors(request_type)
             self._set_visible_data()
 
         elif request_type == self._REQUEST_GET_CLEANSE:
 
-            try:
-                self._ariston_cleanse_data = copy.deepcopy(resp.json())
-            except copy.error:
-                self._ariston_cleanse_data = {}
-                self._LOGGER.warning("%s Invalid data received for cleanse, not JSON", self)
-                raise Exception("Corruption at reading data of the request {}".format(request_type))
-
+            self._ariston_cleanse_data = data
             self._set_sensors(request_type)
             self._set_visible_data()
 
         elif request_type == self._REQUEST_GET_TIME_PROG:
 
-            try:
-                self._ariston_time_prog_data = copy.deepcopy(resp.json())
-            except copy.error:
-                self._ariston_time_prog_data = {}
-                self._LOGGER.warning("%s Invalid data received for schedule, not JSON", self)
-                raise Exception("Corruption at reading data of the request {}".format(request_type))
-
+            self._ariston_time_prog_data = data
             self._set_sensors(request_type)
             self._set_visible_data()
 
         elif request_type == self._REQUEST_GET_USE:
 
-            try:
-                self._ariston_use_data = copy.deepcopy(resp.json())
-            except copy.error:
-                self._ariston_use_data = {}
-                self._LOGGER.warning("%s Invalid data received for use, not JSON", self)
-                raise Exception("Corruption at reading data of the request {}".format(request_type))
-
+            self._ariston_use_data = data
             self._set_sensors(request_type)
             self._set_visible_data()
 
         elif request_type == self._REQUEST_GET_SHOWERS:
 
-            try:
-                self._ariston_shower_data = copy.deepcopy(resp.json())
-            except copy.error:
-                self._ariston_shower_data = {}
-                self._set_statuses()
-                self._LOGGER.warning("%s Invalid data received for showers, not JSON", self)
-                raise Exception("Corruption at reading data of the request {}".format(request_type))
-
+            self._ariston_shower_data = data
             self._set_statuses()
             self._set_sensors(request_type)
             self._set_visible_data()
 
         elif request_type == self._REQUEST_GET_VERSION:
             try:
-                self._version = resp.json()["info"]["version"]
-            except KeyError:
+                self._version = data["info"]["version"]
+            except (KeyError, TypeError):
                 self._version = ""
-                self._LOGGER.warning("%s Invalid version fetched", self)
+                self._LOGGER.warning("Invalid version fetched")
 
             self._set_sensors(request_type)
             self._set_visible_data()
 
         self._get_time_end[request_type] = time.time()
 
+    def _update_thermal_model(self, data):
+        """Add main data to thermal model and publish copy of it for readers without lock"""
+        self._thermal_model.update(
+            time.time(), data.get("temp"), data.get("heatReq"),
+            self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE].value, data.get("rmTm"))
+        self._thermal_state = self._thermal_model.copy()
+
+    def _store_unchanged_data(self, request_type=""):
+        """Refresh state that depends on time of fetching when reply did not change"""
+        if request_type == self._REQUEST_GET_MAIN:
+            self._update_thermal_model(self._ariston_main_data)
+            self._check_showers_temp()
+        self._get_time_end[request_type] = time.time()
+
+    def _store_energy_history(self, data):
+        """Merge reports into long term energy history"""
+        if self._energy_history is None:
+            return
+        fetched = self._get_time_end[self._REQUEST_GET_USE]
+        for series, report in zip(_EnergyHistory.SERIES, data):
+            try:
+                self._energy_history.merge(series, report['v'], fetched)
+            except (KeyError, TypeError, ValueError):
+                self._LOGGER.warning('Invalid %s energy report for history', series)
+            except OSError as ex:
+                self._LOGGER.warning('Energy history could not be stored: %s', ex)
+
+    def _store_fetched_data(self, request_type=""):
+        """Store fetched data in files for troubleshooting"""
         if self._store_file:
             if not os.path.isdir(self._store_folder):
                 os.makedirs(self._store_folder)
@@ -1495,53 +2678,178 @@ class AquaAristonHandler:
                 last_set_of_data = 0
             if time.time() - last_set_of_data > self._HTTP_TIMER_SET_LOCK:
                 # do not read immediately during set attempt
-                if request_type == self._REQUEST_GET_CLEANSE:
-                    url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}/plantSettings?wheType=Med&appId=com.remotethermo.velis"
-                    http_timeout = self._timeout_medium
-                elif request_type == self._REQUEST_GET_ERROR:
-                    url = f"{self._url}/api/v2/busErrors?gatewayId={self._plant_id}&culture=en-US&appId=com.remotethermo.velis"
-                    http_timeout = self._timeout_medium
-                elif request_type == self._REQUEST_GET_TIME_PROG:
-                    url = f"{self._url}/api/v2/velis/timeProgs/{self._plant_id}?appId=com.remotethermo.velis"
-                    http_timeout = self._timeout_long
-                elif request_type == self._REQUEST_GET_USE:
-                    url = f"{self._url}/api/v2/velis/reports/{self._plant_id }?usages=Dhw&appId=com.remotethermo.velis"
-                    http_timeout = self._timeout_long
-                elif request_type == self._REQUEST_GET_SHOWERS:
-                    url = f"{self._url}/api/v2/velis/plantData/{self._plant_id}?appId=com.remotethermo.velis"
-                    http_timeout = self._timeout_long
-                elif request_type == self._REQUEST_GET_VERSION:
-                    url = self._GITHUB_LATEST_RELEASE
-                    http_timeout = self._timeout_short
-                else:
-                    # main data
-                    url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}?appId=com.remotethermo.velis"
-                    if self.available:
-                        http_timeout = self._timeout_long
+                url = self._endpoint_urls[request_type]
+                http_timeout = self._timeouts[self._ENDPOINTS[request_type].timeout]
+                if request_type == self._REQUEST_GET_MAIN and not self.available:
+                    # for not available give a bit more time
+                    http_timeout += 4
+                if request_type == self._REQUEST_GET_MAIN and self._fleet_read and self._fleet_main_read():
+                    return True
+                # network request and parsing are done without locks, so setting of data is never blocked
+                try:
+                    started = time.time()
+                    self._get_time_start[request_type] = started
+                    if request_type == self._REQUEST_GET_MAIN and self._hedging:
+                        resp = self._hedged_get(url, http_timeout)
                     else:
-                        # for not available give a bit more time
-                        http_timeout = self._timeout_long + 4
-                with self._data_lock:
-                    try:
-                        self._get_time_start[request_type] = time.time()
                         resp = self._session.get(
                             url,
                             auth=self._token,
                             timeout=http_timeout,
                             verify=True)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning("%s %s Problem reading data", self, request_type)
-                        raise Exception("Request {} has failed with an exception".format(request_type))
-                    self._store_data(resp, request_type)
+                except requests.exceptions.RequestException:
+                    self._LOGGER.warning("%s Problem reading data", request_type)
+                    raise Exception("Request {} has failed with an exception".format(request_type))
+                if self._capability_rejected(request_type, resp):
+                    return False
+                body_hash = hashlib.blake2b(resp.content, digest_size=16).digest()
+                with self._data_lock:
+                    unchanged = resp.status_code == 200 and not self._set_param and \
+                        self._body_hashes.get(request_type) == body_hash
+                    if unchanged:
+                        # same reply as the last accepted one, nothing to parse or compare
+                        self._store_unchanged_data(request_type)
+                        self._get_data_start[request_type] = started
+                if not unchanged:
+                    data = self._parse_data(resp, request_type)
+                    with self._data_lock:
+                        self._store_data(data, request_type)
+                        self._get_data_start[request_type] = started
+                        self._body_hashes[request_type] = body_hash
+                    if request_type == self._REQUEST_GET_USE:
+                        self._store_energy_history(data)
+                    self._store_fetched_data(request_type)
             else:
-                self._LOGGER.debug("%s %s Still setting data, read restricted", self, request_type)
+                self._LOGGER.debug("%s Still setting data, read restricted", request_type)
                 return False
         else:
-            self._LOGGER.warning("%s %s Not properly logged in to get the data", self, request_type)
+            self._LOGGER.warning("%s Not properly logged in to get the data", request_type)
             raise Exception("Not logged in to fetch the data")
         self._LOGGER.info('Data fetched')
         return True
 
+    def _schedule_request(self, request_type):
+        """Add reading request to the schedule"""
+        endpoint = self._ENDPOINTS[request_type]
+        self._scheduler.add(request_type, endpoint.max_age * self._polling, endpoint.weight)
+
+    def _discover_capabilities(self):
+        """Load endpoints supported by the heater, main data and version are always polled"""
+        requests_to_probe = {
+            request for request, valid in self._valid_requests.items()
+            if valid and request not in {self._REQUEST_GET_MAIN, self._REQUEST_GET_VERSION}
+        }
+        self._capabilities = _Capabilities(self._store_folder, self._gw_name, self._boiler_type, requests_to_probe)
+        for request_type in self._capabilities.unsupported:
+            self._scheduler.remove(request_type)
+            self._LOGGER.info('%s is not supported by the heater, not polled', request_type)
+
+    def _reprobe_capabilities(self):
+        """Return unsupported endpoints to the schedule once in a while"""
+        if self._capabilities is not None:
+            for request_type in self._capabilities.reprobe(time.time()):
+                self._schedule_request(request_type)
+                self._LOGGER.info('%s is probed again', request_type)
+
+    def _capability_rejected(self, request_type, resp):
+        """Probe endpoint with its reply, return True if endpoint is not supported by the heater"""
+        capabilities = self._capabilities
+        if capabilities is None or request_type not in capabilities.probing:
+            return False
+        if resp.status_code == 200:
+            capabilities.record(request_type, True)
+            return False
+        if resp.status_code not in self._CAPABILITY_REJECT_CODES:
+            # temporary problem does not tell anything
+            return False
+        if not capabilities.record(request_type, False):
+            # reply is handled as any other error until rejection repeats
+            return False
+        self._scheduler.remove(request_type)
+        self._LOGGER.info('%s is not supported by the heater, polling stopped', request_type)
+        return True
+
+    def _request_allowed(self, request_type):
+        """Check if scheduled request may be sent now, breakers are only inspected"""
+        if not self._breakers[request_type].can_request():
+            self._LOGGER.debug('%s Circuit breaker is open, skipping request', request_type)
+            return False
+        if request_type == self._REQUEST_GET_MAIN and self._main_poll_skippable():
+            # main data is not expected to change
+            self._LOGGER.debug('Main data request skipped')
+            return False
+        return True
+
+    def _hedge_threshold(self, http_timeout):
+        """Delay before second request is sent, None if hedging is not allowed, to be called with hedge lock"""
+        if len(self._main_latencies) < self._HEDGE_MIN_SAMPLES:
+            return None
+        if sum(self._hedged_recently) >= self._HEDGE_SAMPLES * self._HEDGE_MAX_RATIO:
+            # limit extra load on the server among recent requests
+            return None
+        latencies = sorted(self._main_latencies)
+        threshold = max(latencies[int(self._HEDGE_PERCENTILE * (len(latencies) - 1))], self._HEDGE_MIN_DELAY)
+        if threshold >= http_timeout:
+            return None
+        return threshold
+
+    def _hedged_get(self, url, http_timeout):
+        """Get data and send second request if first one is slower than usually, first reply is used"""
+        replies = queue.Queue()
+
+        def _request(attempt):
+            try:
+                reply = self._session.get(
+                    url,
+                    auth=self._token,
+                    timeout=http_timeout,
+                    verify=True)
+            except Exception as ex:
+                # any error is passed on, waiting for the reply would never end otherwise
+                reply = ex
+            replies.put((attempt, reply))
+
+        def _reply(deadline):
+            try:
+                return replies.get(timeout=max(deadline - time.time(), 0.))
+            except queue.Empty:
+                raise requests.exceptions.Timeout("No reply within {} seconds".format(http_timeout))
+
+        with self._hedge_lock:
+            threshold = self._hedge_threshold(http_timeout)
+            self._hedge_stats["requests"] += 1
+        # latency is measured from the original request, so that hedging does not lower the percentile
+        start = time.time()
+        deadline = start + http_timeout
+        threading.Thread(target=_request, args=(1,), daemon=True).start()
+        hedged = False
+        reply = None
+        if threshold is not None:
+            try:
+                attempt, reply = replies.get(timeout=threshold)
+            except queue.Empty:
+                hedged = True
+        with self._hedge_lock:
+            self._hedged_recently.append(hedged)
+            if hedged:
+                self._hedge_stats["hedged"] += 1
+        if hedged:
+            self._LOGGER.debug('No reply within %s seconds, sending second request', round(threshold, 2))
+            threading.Thread(target=_request, args=(2,), daemon=True).start()
+            deadline = time.time() + http_timeout
+        if reply is None:
+            attempt, reply = _reply(deadline)
+        if isinstance(reply, Exception) and hedged:
+            # other request might still succeed
+            attempt, reply = _reply(deadline)
+        if isinstance(reply, Exception):
+            raise reply
+        with self._hedge_lock:
+            if attempt == 2:
+                self._hedge_stats["hedge_won"] += 1
+            self._main_latencies.append(time.time() - start)
+        return reply
+
     def _queue_get_data(self):
         """Queue all request items"""
         with self._data_lock:
@@ -1551,26 +2859,24 @@ class AquaAristonHandler:
                 retry_in = self._timer_between_param_delay * self._HTTP_DELAY_MULTIPLY
                 self._timer_between_set = self._timer_between_param_delay * self._HTTP_DELAY_MULTIPLY + \
                                           self._HTTP_TIMER_SET_WAIT
-                self._LOGGER.warning('%s Retrying in %s seconds', self, retry_in)
+                self._LOGGER.warning('Retrying in %s seconds', retry_in)
             else:
                 # work as usual
                 retry_in = self._timer_between_param_delay
                 self._timer_between_set = self._timer_between_param_delay + self._HTTP_TIMER_SET_WAIT
-                self._LOGGER.debug('%s Fetching next data in %s seconds', self, retry_in)
+                self._LOGGER.debug('Fetching next data in %s seconds', retry_in)
             self._timer_periodic_read.cancel()
             if self._started:
                 self._timer_periodic_read = threading.Timer(retry_in, self._queue_get_data)
                 self._timer_periodic_read.start()
 
             if not self.available or self._errors > 0:
-                # first always initiate main data
+                # first always initiate main data unless server is given time to recover
                 self._timer_queue_delay.cancel()
-                if self._started:
+                if self._started and self._breakers[self._REQUEST_GET_MAIN].allow_request():
                     self._timer_queue_delay = threading.Timer(1, self._control_availability_state,
                                                               [self._REQUEST_GET_MAIN])
                     self._timer_queue_delay.start()
-                # force skip after fetching data
-                self._get_request_number_high_prio = 1
             # next trigger fetching parameters that are being changed
             elif self._set_param_group[self._REQUEST_GET_MAIN]:
                 # setting of main data is ongoing, prioritize it
@@ -1599,38 +2905,23 @@ class AquaAristonHandler:
                     self._timer_queue_delay.start()
                 if not self._set_scheduled:
                     self._set_param_group[self._REQUEST_GET_CLEANSE] = False
+            elif self._program_main_poll() and self._breakers[self._REQUEST_GET_MAIN].allow_request():
+                # time program has changed setpoint, fetch it without waiting for the turn
+                self._timer_queue_delay.cancel()
+                if self._started:
+                    self._timer_queue_delay = threading.Timer(1, self._control_availability_state,
+                                                              [self._REQUEST_GET_MAIN])
+                    self._timer_queue_delay.start()
             else:
-                # last is fetch higher priority list items
-                # select next item from high priority list
-                if self._get_request_number_high_prio < len(self._request_list_high_prio):
-                    # item is available in the list
+                # last fetch the most overdue data, endpoints with open circuit breaker wait for their turn
+                self._reprobe_capabilities()
+                request_type = self._scheduler.next(time.time(), self._request_allowed)
+                if request_type is not None and self._breakers[request_type].allow_request():
                     self._timer_queue_delay.cancel()
                     if self._started:
                         self._timer_queue_delay = threading.Timer(
-                            1, self._control_availability_state,
-                            [self._request_list_high_prio[self._get_request_number_high_prio]])
+                            1, self._control_availability_state, [request_type])
                         self._timer_queue_delay.start()
-                    self._get_request_number_high_prio += 1
-                elif self._get_request_number_high_prio > len(self._request_list_high_prio):
-                    # start from the beginning of the list
-                    self._get_request_number_high_prio = 0
-                else:
-                    # third we reserve one place for one of lower priority tasks among higher priority ones
-                    self._get_request_number_high_prio += 1
-                    if self._errors < self._MAX_ERRORS_TIMER_EXTEND:
-                        # skip lower priority requests if too many errors and give time to recover
-                        # other data is not that important, so just handle in queue
-                        if self._get_request_number_low_prio < len(self._request_list_low_prio):
-                            # item is available in the list
-                            self._timer_queue_delay.cancel()
-                            if self._started:
-                                self._timer_queue_delay = threading.Timer(
-                                    1, self._control_availability_state,
-                                    [self._request_list_low_prio[self._get_request_number_low_prio]])
-                                self._timer_queue_delay.start()
-                            self._get_request_number_low_prio += 1
-                        if self._get_request_number_low_prio >= len(self._request_list_low_prio):
-                            self._get_request_number_low_prio = 0
 
             if self._store_file:
                 if not os.path.isdir(self._store_folder):
@@ -1640,8 +2931,41 @@ class AquaAristonHandler:
                 with open(store_file_path, 'w') as ariston_fetched:
                     json.dump(self._set_param_group, ariston_fetched)
 
+    def _program_main_poll(self) -> Union[bool, None]:
+        """
+        Decide on main data request while heater follows time program:
+            - True - transition took place since last fetch, main data is to be fetched now;
+            - False - no transition nearby, main data request may be skipped;
+            - None - time program does not affect polling.
+        """
+        time_program = self._time_program
+        if time_program is None or \
+                self._val_to_mode.get(self._ariston_main_data.get("mode")) != self._MODE_PROGRAM:
+            return None
+        now = time.time()
+        transition = time_program.previous_event(now)[0] + self._PROGRAM_TRANSITION_DELAY
+        fetched = self._get_time_end[self._REQUEST_GET_MAIN]
+        if now >= transition > fetched:
+            return True
+        if now - transition < self._PROGRAM_DENSE_WINDOW or now - fetched >= self._PROGRAM_SPARSE_INTERVAL:
+            return None
+        return False
+
+    def _main_poll_skippable(self) -> bool:
+        """Return True if main data request may be skipped due to time program or confident estimate."""
+        program_poll = self._program_main_poll()
+        if program_poll is not None:
+            return not program_poll
+        now = time.time()
+        if now - self._get_time_end[self._REQUEST_GET_MAIN] >= self._THERMAL_MAX_SKIP * self._polling:
+            return False
+        # uncertain estimate is never trusted for longer than one main data interval
+        next_request = now + self._ENDPOINTS[self._REQUEST_GET_MAIN].max_age * self._polling
+        return self._thermal_model.confidence(next_request) >= self._THERMAL_CONFIDENCE
+
     def _error_detected(self, request_type):
         """Error detected"""
+        self._body_hashes.pop(request_type, None)
         if request_type in {
             self._REQUEST_GET_MAIN,
             self._REQUEST_SET_MAIN,
@@ -1670,18 +2994,41 @@ class AquaAristonHandler:
                 self._LOGGER.info("No more errors")
                 
     def _control_availability_state(self, request_type=""):
-        """Control component availability"""
+        """Control component availability, identical request in progress is joined instead of repeated"""
+        self._single_flight.do((request_type, self._plant_id), self._fetch_and_control, request_type)
+
+    def _fetch_and_control(self, request_type=""):
+        """Fetch data and control component availability"""
+        breaker = self._breakers[request_type]
+        old_state = breaker.state
         try:
             result_ok = self._get_http_data(request_type)
-            self._LOGGER.info(f"ariston action ok for {request_type}")
+            self._LOGGER.info("ariston action ok for %s", request_type)
         except Exception as ex:
+            breaker.record_failure()
             self._error_detected(request_type)
-            self._LOGGER.warning(f"ariston action nok for {request_type}: {ex}")
-            return
-        if result_ok:
-            self._no_error_detected(request_type)
+            self._LOGGER.warning("ariston action nok for %s: %s", request_type, ex)
+            result_ok = False
+        else:
+            if result_ok:
+                breaker.record_success()
+                self._scheduler.done(request_type, time.time())
+                self._no_error_detected(request_type)
+        if breaker.state != old_state:
+            self._LOGGER.info('%s Circuit breaker is %s', request_type, breaker.state)
+            self._store_breakers()
         return
 
+    def _store_breakers(self):
+        """Store circuit breakers state for troubleshooting"""
+        if self._store_file:
+            if not os.path.isdir(self._store_folder):
+                os.makedirs(self._store_folder)
+            store_file = self._gw_name + 'data_ariston_breakers.json'
+            store_file_path = os.path.join(self._store_folder, store_file)
+            with open(store_file_path, 'w') as ariston_fetched:
+                json.dump(self.circuit_breakers, ariston_fetched)
+
     def _setting_http_data(self, set_data, request_type=""):
         """setting of data"""
         self._LOGGER.info('setting http data')
@@ -1703,30 +3050,14 @@ class AquaAristonHandler:
                     json.dump([self._set_time_start, self._set_time_end, self._get_time_start, self._get_time_end],
                               ariston_fetched)
         except TypeError:
-            self._LOGGER.warning('%s Problem storing files', self)
-        if request_type == self._REQUEST_SET_CLEANSE:
-            url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}/plantSettings?appId=com.remotethermo.velis"
-            http_timeout = self._timeout_medium
-        elif request_type == self._REQUEST_SET_ECO:
-            url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}/switchEco?appId=com.remotethermo.velis"
-            http_timeout = self._timeout_medium
-        elif request_type == self._REQUEST_SET_ON:
-            url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}/switch?appId=com.remotethermo.velis"
-            http_timeout = self._timeout_medium
-        elif request_type == self._REQUEST_SET_TEMPERATURE:
-            boost_str = ""
-            if self._boiler_type == self._TYPE_LYDOS_HYBRID and self._ariston_sensors and \
-                    self._PARAM_MODE in self._ariston_sensors and \
-                    self._ariston_sensors[self._PARAM_MODE][self._VALUE] == self._MODE_BOOST:
-                boost_str = "boost"
-            url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}/{boost_str}temperature?appId=com.remotethermo.velis"
-            http_timeout = self._timeout_medium
-        elif request_type == self._REQUEST_SET_SHOWERS:
-            url = f"{self._url}/api/v2/velis/plantData/{self._plant_id}/showers?appId=com.remotethermo.velis"
-            http_timeout = self._timeout_medium
-        else: # mode
-            url = f"{self._url}/api/v2/velis/{self._boiler_str}PlantData/{self._plant_id}/mode?appId=com.remotethermo.velis"
-            http_timeout = self._timeout_long
+            self._LOGGER.warning('Problem storing files')
+        endpoint_request = request_type
+        if request_type == self._REQUEST_SET_TEMPERATURE and self._boiler_type == self._TYPE_LYDOS_HYBRID and \
+                self._ariston_sensors and self._PARAM_MODE in self._ariston_sensors and \
+                self._ariston_sensors[self._PARAM_MODE].value == self._MODE_BOOST:
+            endpoint_request = self._REQUEST_SET_BOOST_TEMPERATURE
+        url = self._endpoint_urls[endpoint_request]
+        http_timeout = self._timeouts[self._ENDPOINTS[endpoint_request].timeout]
         try:
             self._set_time_start[request_type] = time.time()
             resp = self._session.post(
@@ -1737,7 +3068,7 @@ class AquaAristonHandler:
                 verify=True)
         except requests.exceptions.RequestException:
             self._error_detected(request_type)
-            self._LOGGER.warning('%s %s error', self, request_type)
+            self._LOGGER.warning('%s error', request_type)
             raise Exception("Unexpected error for setting in the request {}".format(request_type))
         if resp.status_code != 200:
             self._error_detected(request_type)
@@ -1748,343 +3079,306 @@ class AquaAristonHandler:
                 store_file_path = os.path.join(self._store_folder, store_file)
                 with open(store_file_path, "w") as f:
                     f.write(resp.text)
-            self._LOGGER.warning("%s %s Command to set data failed with code: %s", self, request_type, resp.status_code)
+            self._LOGGER.warning("%s Command to set data failed with code: %s", request_type, resp.status_code)
             raise Exception("Unexpected code {} for setting in the request {}".format(resp.status_code, request_type))
         self._set_time_end[request_type] = time.time()
         self._no_error_detected(request_type)
-        self._LOGGER.info('%s %s Data was presumably changed', self, request_type)
+        self._LOGGER.info('%s Data was presumably changed', request_type)
 
     def _preparing_setting_http_data(self):
         """Preparing and setting http data"""
         self._login_session()
         with self._data_lock:
-            if not self._set_new_data_pending:
-                # initiated from schedule, no longer scheduled
-                self._set_scheduled = False
-            else:
-                # initiated from set_http_data, no longer pending
-                self._set_new_data_pending = False
-                for request_item in self._set_retry:
-                    self._set_retry[request_item] = 0
-                if self._set_scheduled:
-                    # we wait for another attempt after timeout, data will be set then
-                    return
-            if self._login and self.available and self._plant_id != "" and self._ariston_main_data:
-                changed_parameter = {
-                    self._REQUEST_SET_MAIN: {},
-                    self._REQUEST_SET_ON: {},
-                    self._REQUEST_SET_TEMPERATURE: {},
-                    self._REQUEST_SET_ECO: {},
-                    self._REQUEST_SET_CLEANSE: {},
-                    self._REQUEST_SET_SHOWERS: {},
-                }
-                
-                set_eco_on = False
-                set_power_on = False
-
-                set_mode_data = dict()
-                set_mode_data["old"] = self._ariston_main_data["mode"]
-                set_mode_data["new"] = self._ariston_main_data["mode"]
-
-                set_temperature_data = dict()
-                if self._boiler_type != self._TYPE_LYDOS_HYBRID:
-                    set_temperature_data["eco"] = self._ariston_main_data["eco"]
-                set_temperature_data["old"] = self._ariston_main_data["reqTemp"]
-                set_temperature_data["new"] = self._ariston_main_data["reqTemp"]
-
-                set_cleanse_data = dict()
-                set_showers_data = dict()
-                if self._PARAM_CLEANSE_TEMPERATURE in self._set_param:
-                    try:
-                        set_cleanse_data["MedMaxSetpointTemperature"] = dict()
-                        set_cleanse_data["MedMaxSetpointTemperature"]["old"] = \
-                            self._ariston_cleanse_data["MedMaxSetpointTemperature"]
-                        set_cleanse_data["MedMaxSetpointTemperature"]["new"] = \
-                            self._ariston_cleanse_data["MedMaxSetpointTemperature"]
-                    except KeyError:
-                        set_cleanse_data = {}
-                        self._LOGGER.error(
-                            '%s antilegionella temperature can not be set as no valid sensor data available', self)
+            set_request = self._prepare_set_request()
+        if set_request:
+            # request is sent without locks, so reading and setting of data are not blocked meanwhile
+            set_data, request_type, description = set_request
+            try:
+                self._setting_http_data(set_data, request_type)
+            except Exception:
+                self._LOGGER.warning('Setting %s failed', description)
+
+    def _prepare_set_request(self):
+        """Prepare data to be set, returns data, request and its description if anything to be sent"""
+        set_request = None
+        if not self._set_new_data_pending:
+            # initiated from schedule, no longer scheduled
+            self._set_scheduled = False
+        else:
+            # initiated from set_http_data, no longer pending
+            self._set_new_data_pending = False
+            for request_item in self._set_retry:
+                self._set_retry[request_item] = 0
+            if self._set_scheduled:
+                # we wait for another attempt after timeout, data will be set then
+                return None
+        if self._login and self.available and self._plant_id != "" and self._ariston_main_data:
+            changed_parameter = {
+                self._REQUEST_SET_MAIN: {},
+                self._REQUEST_SET_ON: {},
+                self._REQUEST_SET_TEMPERATURE: {},
+                self._REQUEST_SET_ECO: {},
+                self._REQUEST_SET_CLEANSE: {},
+                self._REQUEST_SET_SHOWERS: {},
+            }
+            
+            set_eco_on = False
+            set_power_on = False
+
+            set_mode_data = dict()
+            set_mode_data["old"] = self._ariston_main_data["mode"]
+            set_mode_data["new"] = self._ariston_main_data["mode"]
+
+            set_temperature_data = dict()
+            if self._boiler_type != self._TYPE_LYDOS_HYBRID:
+                set_temperature_data["eco"] = self._ariston_main_data["eco"]
+            set_temperature_data["old"] = self._ariston_main_data["reqTemp"]
+            set_temperature_data["new"] = self._ariston_main_data["reqTemp"]
+
+            set_cleanse_data = dict()
+            set_showers_data = dict()
+            if self._PARAM_CLEANSE_TEMPERATURE in self._set_param:
+                try:
+                    set_cleanse_data["MedMaxSetpointTemperature"] = dict()
+                    set_cleanse_data["MedMaxSetpointTemperature"]["old"] = \
+                        self._ariston_cleanse_data["MedMaxSetpointTemperature"]
+                    set_cleanse_data["MedMaxSetpointTemperature"]["new"] = \
+                        self._ariston_cleanse_data["MedMaxSetpointTemperature"]
+                except KeyError:
+                    set_cleanse_data = {}
+                    self._LOGGER.error(
+                        'antilegionella temperature can not be set as no valid sensor data available')
 
-                elif self._PARAM_REQUIRED_SHOWERS in self._set_param:
-                    try:
-                        set_showers_data["old"] = self._ariston_shower_data["reqShw"]
-                        set_showers_data["new"] = self._ariston_shower_data["reqShw"]
-                    except KeyError:
-                        set_showers_data = {}
-                        self._LOGGER.error(
-                            '%s required showers can not be set as no valid sensor data available', self)
+            elif self._PARAM_REQUIRED_SHOWERS in self._set_param:
+                try:
+                    set_showers_data["old"] = self._ariston_shower_data["reqShw"]
+                    set_showers_data["new"] = self._ariston_shower_data["reqShw"]
+                except KeyError:
+                    set_showers_data = {}
+                    self._LOGGER.error(
+                        'required showers can not be set as no valid sensor data available')
 
-                if self._PARAM_MODE in self._set_param:
+            if self._PARAM_MODE in self._set_param:
 
-                    if set_mode_data["old"] == self._set_param[self._PARAM_MODE]:
-                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_MODE)] < \
-                                self._get_time_end[self._get_request_for_parameter(self._PARAM_MODE)]:
-                            # value should be up to date and match to remove from setting
-                            del self._set_param[self._PARAM_MODE]
-                        else:
-                            # assume data was not yet changed
-                            changed_parameter[self._set_request_for_parameter(self._PARAM_MODE)][
-                                self._get_request_for_parameter(self._PARAM_MODE)] = True
+                if set_mode_data["old"] == self._set_param[self._PARAM_MODE]:
+                    if self._set_time_start[self._set_request_for_parameter(self._PARAM_MODE)] < \
+                            self._get_data_start[self._get_request_for_parameter(self._PARAM_MODE)]:
+                        # value should be up to date and match to remove from setting
+                        del self._set_param[self._PARAM_MODE]
                     else:
-                        set_mode_data["new"] = self._set_param[self._PARAM_MODE]
+                        # assume data was not yet changed
                         changed_parameter[self._set_request_for_parameter(self._PARAM_MODE)][
                             self._get_request_for_parameter(self._PARAM_MODE)] = True
-
-                if self._PARAM_REQUIRED_SHOWERS in self._set_param:
-
-                    if self._ariston_shower_data and math.isclose(
-                            self._ariston_shower_data["reqShw"],
-                            self._set_param[self._PARAM_REQUIRED_SHOWERS],
-                            abs_tol=0.01):
-                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)] < \
-                                self._get_time_end[self._get_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)]:
-                            # value should be up to date and match to remove from setting
-                            del self._set_param[self._PARAM_REQUIRED_SHOWERS]
-                        else:
-                            # assume data was not yet changed
-                            changed_parameter[self._set_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)][
-                                self._get_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)] = True
+                else:
+                    set_mode_data["new"] = self._set_param[self._PARAM_MODE]
+                    changed_parameter[self._set_request_for_parameter(self._PARAM_MODE)][
+                        self._get_request_for_parameter(self._PARAM_MODE)] = True
+
+            if self._PARAM_REQUIRED_SHOWERS in self._set_param:
+
+                if self._ariston_shower_data and math.isclose(
+                        self._ariston_shower_data["reqShw"],
+                        self._set_param[self._PARAM_REQUIRED_SHOWERS],
+                        abs_tol=0.01):
+                    if self._set_time_start[self._set_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)] < \
+                            self._get_data_start[self._get_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)]:
+                        # value should be up to date and match to remove from setting
+                        del self._set_param[self._PARAM_REQUIRED_SHOWERS]
                     else:
-                        set_showers_data["new"] = self._set_param[self._PARAM_REQUIRED_SHOWERS]
+                        # assume data was not yet changed
                         changed_parameter[self._set_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)][
                             self._get_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)] = True
+                else:
+                    set_showers_data["new"] = self._set_param[self._PARAM_REQUIRED_SHOWERS]
+                    changed_parameter[self._set_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)][
+                        self._get_request_for_parameter(self._PARAM_REQUIRED_SHOWERS)] = True
 
-                if self._PARAM_ON in self._set_param:
+            if self._PARAM_ON in self._set_param:
 
-                    if self._ariston_main_data["on"] == self._set_param[self._PARAM_ON]:
-                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_ON)] < \
-                                self._get_time_end[self._get_request_for_parameter(self._PARAM_ON)]:
-                            # value should be up to date and match to remove from setting
-                            del self._set_param[self._PARAM_ON]
-                        else:
-                            # assume data was not yet changed
-                            changed_parameter[self._set_request_for_parameter(self._PARAM_ON)][
-                                self._get_request_for_parameter(self._PARAM_ON)] = True
+                if self._ariston_main_data["on"] == self._set_param[self._PARAM_ON]:
+                    if self._set_time_start[self._set_request_for_parameter(self._PARAM_ON)] < \
+                            self._get_data_start[self._get_request_for_parameter(self._PARAM_ON)]:
+                        # value should be up to date and match to remove from setting
+                        del self._set_param[self._PARAM_ON]
                     else:
-                        set_power_on = self._set_param[self._PARAM_ON]
+                        # assume data was not yet changed
                         changed_parameter[self._set_request_for_parameter(self._PARAM_ON)][
                             self._get_request_for_parameter(self._PARAM_ON)] = True
-
-                if self._PARAM_REQUIRED_TEMPERATURE in self._set_param:
-
-                    if math.isclose(
-                            self._ariston_main_data["reqTemp"],
-                            self._set_param[self._PARAM_REQUIRED_TEMPERATURE],
-                            abs_tol=0.01):
-                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)] < \
-                                self._get_time_end[self._get_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)]:
-                            # value should be up to date and match to remove from setting
-                            del self._set_param[self._PARAM_REQUIRED_TEMPERATURE]
-                        else:
-                            # assume data was not yet changed
-                            changed_parameter[self._set_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)][
-                                self._get_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)] = True
+                else:
+                    set_power_on = self._set_param[self._PARAM_ON]
+                    changed_parameter[self._set_request_for_parameter(self._PARAM_ON)][
+                        self._get_request_for_parameter(self._PARAM_ON)] = True
+
+            if self._PARAM_REQUIRED_TEMPERATURE in self._set_param:
+
+                if math.isclose(
+                        self._ariston_main_data["reqTemp"],
+                        self._set_param[self._PARAM_REQUIRED_TEMPERATURE],
+                        abs_tol=0.01):
+                    if self._set_time_start[self._set_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)] < \
+                            self._get_data_start[self._get_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)]:
+                        # value should be up to date and match to remove from setting
+                        del self._set_param[self._PARAM_REQUIRED_TEMPERATURE]
                     else:
-                        set_temperature_data["new"] = self._set_param[self._PARAM_REQUIRED_TEMPERATURE]
+                        # assume data was not yet changed
                         changed_parameter[self._set_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)][
                             self._get_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)] = True
+                else:
+                    set_temperature_data["new"] = self._set_param[self._PARAM_REQUIRED_TEMPERATURE]
+                    changed_parameter[self._set_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)][
+                        self._get_request_for_parameter(self._PARAM_REQUIRED_TEMPERATURE)] = True
 
-                if self._PARAM_ECO in self._set_param:
-                
-                    if self._set_param[self._PARAM_ECO]:
-                        # On differs from Off
-                        if self._ariston_main_data["eco"] is True:
-                            if self._set_time_start[self._set_request_for_parameter(self._PARAM_ECO)] < \
-                                    self._get_time_end[self._get_request_for_parameter(self._PARAM_ECO)]:
-                                # value should be up to date and match to remove from setting
-                                del self._set_param[self._PARAM_ECO]
-                            else:
-                                # assume data was not yet changed
-                                changed_parameter[self._set_request_for_parameter(self._PARAM_ECO)][
-                                    self._get_request_for_parameter(self._PARAM_ECO)] = True
+            if self._PARAM_ECO in self._set_param:
+            
+                if self._set_param[self._PARAM_ECO]:
+                    # On differs from Off
+                    if self._ariston_main_data["eco"] is True:
+                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_ECO)] < \
+                                self._get_data_start[self._get_request_for_parameter(self._PARAM_ECO)]:
+                            # value should be up to date and match to remove from setting
+                            del self._set_param[self._PARAM_ECO]
                         else:
-                            set_eco_on = True
+                            # assume data was not yet changed
                             changed_parameter[self._set_request_for_parameter(self._PARAM_ECO)][
                                 self._get_request_for_parameter(self._PARAM_ECO)] = True
-
                     else:
-                        # Off is change of mode to the same value
-                        if self._ariston_main_data["eco"] is False:
-                            if self._set_time_start[self._set_request_for_parameter(self._PARAM_ECO)] < \
-                                    self._get_time_end[self._get_request_for_parameter(self._PARAM_ECO)]:
-                                # value should be up to date and match to remove from setting
-                                del self._set_param[self._PARAM_ECO]
-                            else:
-                                # assume data was not yet changed
-                                changed_parameter[self._REQUEST_SET_MAIN][
-                                    self._get_request_for_parameter(self._PARAM_ECO)] = True
-                        else:
-                            changed_parameter[self._REQUEST_SET_MAIN][
-                                self._get_request_for_parameter(self._PARAM_ECO)] = True
-
-                if self._PARAM_CLEANSE_TEMPERATURE in self._set_param:
+                        set_eco_on = True
+                        changed_parameter[self._set_request_for_parameter(self._PARAM_ECO)][
+                            self._get_request_for_parameter(self._PARAM_ECO)] = True
 
-                    if self._ariston_cleanse_data and math.isclose(
-                            self._ariston_cleanse_data["MedMaxSetpointTemperature"],
-                            self._set_param[self._PARAM_CLEANSE_TEMPERATURE],
-                            abs_tol=0.01):
-                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)] < \
-                                self._get_time_end[self._get_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)]:
+                else:
+                    # Off is change of mode to the same value
+                    if self._ariston_main_data["eco"] is False:
+                        if self._set_time_start[self._set_request_for_parameter(self._PARAM_ECO)] < \
+                                self._get_data_start[self._get_request_for_parameter(self._PARAM_ECO)]:
                             # value should be up to date and match to remove from setting
-                            del self._set_param[self._PARAM_CLEANSE_TEMPERATURE]
+                            del self._set_param[self._PARAM_ECO]
                         else:
                             # assume data was not yet changed
-                            changed_parameter[self._set_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)][
-                                self._get_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)] = True
+                            changed_parameter[self._REQUEST_SET_MAIN][
+                                self._get_request_for_parameter(self._PARAM_ECO)] = True
                     else:
-                        set_cleanse_data["MedMaxSetpointTemperature"]["new"] = \
-                            self._set_param[self._PARAM_CLEANSE_TEMPERATURE]
+                        changed_parameter[self._REQUEST_SET_MAIN][
+                            self._get_request_for_parameter(self._PARAM_ECO)] = True
+
+            if self._PARAM_CLEANSE_TEMPERATURE in self._set_param:
+
+                if self._ariston_cleanse_data and math.isclose(
+                        self._ariston_cleanse_data["MedMaxSetpointTemperature"],
+                        self._set_param[self._PARAM_CLEANSE_TEMPERATURE],
+                        abs_tol=0.01):
+                    if self._set_time_start[self._set_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)] < \
+                            self._get_data_start[self._get_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)]:
+                        # value should be up to date and match to remove from setting
+                        del self._set_param[self._PARAM_CLEANSE_TEMPERATURE]
+                    else:
+                        # assume data was not yet changed
                         changed_parameter[self._set_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)][
                             self._get_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)] = True
-
-                for request_item in self._set_param_group:
-                    self._set_param_group[request_item] = False
-
-                for key, value in changed_parameter.items():
-                    if value != {} and self._set_retry[key] < self._set_max_retries:
-                        if not self._set_scheduled:
-                            # retry again after enough time
-                            retry_in = self._timer_between_set
-                            self._timer_periodic_set.cancel()
-                            if self._started:
-                                self._timer_periodic_set = threading.Timer(retry_in, self._preparing_setting_http_data)
-                                self._timer_periodic_set.start()
-                            self._set_retry[key] += 1
-                            self._set_scheduled = True
-                    elif value != {} and self._set_retry[key] == self._set_max_retries:
-                        # last retry, we keep changed parameter but do not schedule anything
+                else:
+                    set_cleanse_data["MedMaxSetpointTemperature"]["new"] = \
+                        self._set_param[self._PARAM_CLEANSE_TEMPERATURE]
+                    changed_parameter[self._set_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)][
+                        self._get_request_for_parameter(self._PARAM_CLEANSE_TEMPERATURE)] = True
+
+            for request_item in self._set_param_group:
+                self._set_param_group[request_item] = False
+
+            for key, value in changed_parameter.items():
+                if value != {} and self._set_retry[key] < self._set_max_retries:
+                    if not self._set_scheduled:
+                        # retry again after enough time
+                        retry_in = self._timer_between_set
+                        self._timer_periodic_set.cancel()
+                        if self._started:
+                            self._timer_periodic_set = threading.Timer(retry_in, self._preparing_setting_http_data)
+                            self._timer_periodic_set.start()
                         self._set_retry[key] += 1
-                    else:
-                        changed_parameter[key] = {}
+                        self._set_scheduled = True
+                elif value != {} and self._set_retry[key] == self._set_max_retries:
+                    # last retry, we keep changed parameter but do not schedule anything
+                    self._set_retry[key] += 1
+                else:
+                    changed_parameter[key] = {}
     
-                try:
-                    for parameter, value in self._set_param.items():
-                        if parameter == self._PARAM_ECO and value is False:
-                            if self._REQUEST_GET_MAIN not in changed_parameter[self._REQUEST_SET_MAIN]:
-                                del self._set_param[parameter]
-                        elif self._get_request_for_parameter(parameter) not in \
-                                changed_parameter[self._set_request_for_parameter(parameter)]:
+            try:
+                for parameter, value in self._set_param.items():
+                    if parameter == self._PARAM_ECO and value is False:
+                        if self._REQUEST_GET_MAIN not in changed_parameter[self._REQUEST_SET_MAIN]:
                             del self._set_param[parameter]
-                except KeyError:
-                    self._LOGGER.warning('%s Can not clear set parameters', self)
-
-                # show data as changed in case we were able to read data in between requests
-                self._set_visible_data()
-
-                if changed_parameter[self._REQUEST_SET_MAIN] != {}:
-
-                    try:
-                        self._setting_http_data(set_mode_data, self._REQUEST_SET_MAIN)
-                    except TypeError:
-                        self._LOGGER.warning('%s Setting mode failed', self)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning('%s Setting mode failed', self)
-                    except Exception:
-                        self._LOGGER.warning('%s Setting mode failed', self)
-
-                elif changed_parameter[self._REQUEST_SET_ON] != {}:
-
-                    try:
-                        self._setting_http_data(set_power_on, self._REQUEST_SET_ON)
-                    except TypeError:
-                        self._LOGGER.warning('%s Setting power failed', self)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning('%s Setting power failed', self)
-                    except Exception:
-                        self._LOGGER.warning('%s Setting power failed', self)
-
-                elif changed_parameter[self._REQUEST_SET_TEMPERATURE] != {}:
-
-                    try:
-                        self._setting_http_data(set_temperature_data, self._REQUEST_SET_TEMPERATURE)
-                    except TypeError:
-                        self._LOGGER.warning('%s Setting temperature failed', self)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning('%s Setting temperature failed', self)
-                    except Exception:
-                        self._LOGGER.warning('%s Setting temperature failed', self)
+                    elif self._get_request_for_parameter(parameter) not in \
+                            changed_parameter[self._set_request_for_parameter(parameter)]:
+                        del self._set_param[parameter]
+            except KeyError:
+                self._LOGGER.warning('Can not clear set parameters')
 
-                elif changed_parameter[self._REQUEST_SET_SHOWERS] != {}:
+            # show data as changed in case we were able to read data in between requests
+            self._set_visible_data()
 
-                    try:
-                        self._setting_http_data(set_showers_data, self._REQUEST_SET_SHOWERS)
-                    except TypeError:
-                        self._LOGGER.warning('%s Setting showers failed', self)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning('%s Setting showers failed', self)
-                    except Exception:
-                        self._LOGGER.warning('%s Setting showers failed', self)
+            if changed_parameter[self._REQUEST_SET_MAIN] != {}:
+                set_request = (set_mode_data, self._REQUEST_SET_MAIN, "mode")
+            elif changed_parameter[self._REQUEST_SET_ON] != {}:
+                set_request = (set_power_on, self._REQUEST_SET_ON, "power")
+            elif changed_parameter[self._REQUEST_SET_TEMPERATURE] != {}:
+                set_request = (set_temperature_data, self._REQUEST_SET_TEMPERATURE, "temperature")
+            elif changed_parameter[self._REQUEST_SET_SHOWERS] != {}:
+                set_request = (set_showers_data, self._REQUEST_SET_SHOWERS, "showers")
+            elif changed_parameter[self._REQUEST_SET_CLEANSE] != {}:
+                set_request = (set_cleanse_data, self._REQUEST_SET_CLEANSE, "antilegionella")
+            elif changed_parameter[self._REQUEST_SET_ECO] != {}:
+                set_request = (set_eco_on, self._REQUEST_SET_ECO, "eco")
+            else:
+                self._LOGGER.debug('Same data was used')
 
-                elif changed_parameter[self._REQUEST_SET_CLEANSE] != {}:
+            if set_request:
+                # restrict reading of data from the moment request is prepared
+                self._set_time_start[set_request[1]] = time.time()
 
-                    try:
-                        self._setting_http_data(set_cleanse_data, self._REQUEST_SET_CLEANSE)
-                    except TypeError:
-                        self._LOGGER.warning('%s Setting antilegionella failed', self)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning('%s Setting antilegionella failed', self)
-                    except Exception:
-                        self._LOGGER.warning('%s Setting antilegionella failed', self)
+            for key, value in changed_parameter.items():
+                if value != {}:
+                    for request_item in value:
+                        self._set_param_group[request_item] = True
 
-                elif changed_parameter[self._REQUEST_SET_ECO] != {}:
+            if not self._set_scheduled:
+                # no more retries or no changes, no need to keep any changed data
+                self._set_param = {}
+                self._set_statuses()
 
-                    try:
-                        self._setting_http_data(set_eco_on, self._REQUEST_SET_ECO)
-                    except TypeError:
-                        self._LOGGER.warning('%s Setting eco failed', self)
-                    except requests.exceptions.RequestException:
-                        self._LOGGER.warning('%s Setting eco failed', self)
-                    except Exception:
-                        self._LOGGER.warning('%s Setting eco failed', self)
+            if self._store_file:
+                if not os.path.isdir(self._store_folder):
+                    os.makedirs(self._store_folder)
+                store_file = self._gw_name + 'data_ariston_all_set_get.json'
+                store_file_path = os.path.join(self._store_folder, store_file)
+                with open(store_file_path, 'w') as ariston_fetched:
+                    json.dump(self._set_param_group, ariston_fetched)
+                store_file = self._gw_name + 'data_ariston_all_set.json'
+                store_file_path = os.path.join(self._store_folder, store_file)
+                with open(store_file_path, 'w') as ariston_fetched:
+                    json.dump(self._set_param, ariston_fetched)
 
+        else:
+            # api is down
+            if not self._set_scheduled:
+                if self._set_retry[self._REQUEST_SET_MAIN] < self._set_max_retries:
+                    # retry again after enough time to fetch data twice
+                    retry_in = self._timer_between_set
+                    self._timer_periodic_set.cancel()
+                    if self._started:
+                        self._timer_periodic_set = threading.Timer(retry_in, self._preparing_setting_http_data)
+                        self._timer_periodic_set.start()
+                    self._set_retry[self._REQUEST_SET_MAIN] += 1
+                    self._set_scheduled = True
                 else:
-                    self._LOGGER.debug('%s Same data was used', self)
-
-                for key, value in changed_parameter.items():
-                    if value != {}:
-                        for request_item in value:
-                            self._set_param_group[request_item] = True
-
-                if not self._set_scheduled:
-                    # no more retries or no changes, no need to keep any changed data
+                    # no more retries, no need to keep changed data
                     self._set_param = {}
                     self._set_statuses()
 
-                if self._store_file:
-                    if not os.path.isdir(self._store_folder):
-                        os.makedirs(self._store_folder)
-                    store_file = self._gw_name + 'data_ariston_all_set_get.json'
-                    store_file_path = os.path.join(self._store_folder, store_file)
-                    with open(store_file_path, 'w') as ariston_fetched:
-                        json.dump(self._set_param_group, ariston_fetched)
-                    store_file = self._gw_name + 'data_ariston_all_set.json'
-                    store_file_path = os.path.join(self._store_folder, store_file)
-                    with open(store_file_path, 'w') as ariston_fetched:
-                        json.dump(self._set_param, ariston_fetched)
-
-            else:
-                # api is down
-                if not self._set_scheduled:
-                    if self._set_retry[self._REQUEST_SET_MAIN] < self._set_max_retries:
-                        # retry again after enough time to fetch data twice
-                        retry_in = self._timer_between_set
-                        self._timer_periodic_set.cancel()
-                        if self._started:
-                            self._timer_periodic_set = threading.Timer(retry_in, self._preparing_setting_http_data)
-                            self._timer_periodic_set.start()
-                        self._set_retry[self._REQUEST_SET_MAIN] += 1
-                        self._set_scheduled = True
-                    else:
-                        # no more retries, no need to keep changed data
-                        self._set_param = {}
-                        self._set_statuses()
-
-                        for request_item in self._set_param_group:
-                            self._set_param_group[request_item] = False
+                    for request_item in self._set_param_group:
+                        self._set_param_group[request_item] = False
 
-                        self._LOGGER.warning("%s No stable connection to set the data", self)
-                        raise Exception("Unstable connection to set the data")
+                    self._LOGGER.warning("No stable connection to set the data")
+                    raise Exception("Unstable connection to set the data")
+        return set_request
 
     def set_http_data(self, **parameter_list: Union[str, int, float, bool]) -> None:
         """
@@ -2151,15 +3445,15 @@ class AquaAristonHandler:
                         self._showers_mode = self._VAL_SHOWERS
                         self._write_showers_temp()
                         try:
-                            self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE][self._VALUE] = \
+                            self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE].value = \
                                 self._ariston_main_data["reqTemp"]
                         except KeyError:
-                            self._LOGGER.warning("%s no temperature during showers set", self)
+                            self._LOGGER.warning("no temperature during showers set")
                     elif self._PARAM_REQUIRED_TEMPERATURE in good_values:
                         self._showers_mode = self._VAL_TEMPERATURE
                         self._showers_required_temp = good_values[self._PARAM_REQUIRED_TEMPERATURE]
                         self._write_showers_temp()
-                        self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE][self._VALUE] = \
+                        self._ariston_sensors[self._PARAM_REQUIRED_TEMPERATURE].value = \
                             self._showers_required_temp
                         del good_values[self._PARAM_REQUIRED_TEMPERATURE]
 
@@ -2167,46 +3461,46 @@ class AquaAristonHandler:
                 if self._PARAM_MODE in good_values:
                     try:
                         self._set_param[self._PARAM_MODE] = self._mode_to_val[good_values[self._PARAM_MODE]]
-                        self._LOGGER.info('%s New mode %s', self, good_values[self._PARAM_MODE])
+                        self._LOGGER.info('New mode %s', good_values[self._PARAM_MODE])
                     except KeyError:
-                        self._LOGGER.warning('%s Unknown or unsupported mode or key error: %s', self,
-                                        good_values[self._PARAM_MODE])
+                        self._LOGGER.warning('Unknown or unsupported mode or key error: %s',
+                                             good_values[self._PARAM_MODE])
                         bad_values[self._PARAM_MODE] = good_values[self._PARAM_MODE]
 
                 if self._PARAM_ON in good_values:
                     try:
                         self._set_param[self._PARAM_ON] = self._STRING_TO_VALUE[good_values[self._PARAM_ON]]
-                        self._LOGGER.info('%s New mode %s', self, good_values[self._PARAM_ON])
+                        self._LOGGER.info('New mode %s', good_values[self._PARAM_ON])
                     except KeyError:
-                        self._LOGGER.warning('%s Unknown or unsupported power or key error: %s', self,
-                                        good_values[self._PARAM_ON])
+                        self._LOGGER.warning('Unknown or unsupported power or key error: %s',
+                                             good_values[self._PARAM_ON])
                         bad_values[self._PARAM_ON] = good_values[self._PARAM_ON]
 
                 if self._PARAM_ECO in good_values:
                     try:
                         self._set_param[self._PARAM_ECO] = self._STRING_TO_VALUE[good_values[self._PARAM_ECO]]
-                        self._LOGGER.info('%s New mode %s', self, good_values[self._PARAM_ECO])
+                        self._LOGGER.info('New mode %s', good_values[self._PARAM_ECO])
                     except KeyError:
-                        self._LOGGER.warning('%s Unknown or unsupported eco or key error: %s', self,
-                                        good_values[self._PARAM_ECO])
+                        self._LOGGER.warning('Unknown or unsupported eco or key error: %s',
+                                             good_values[self._PARAM_ECO])
                         bad_values[self._PARAM_ECO] = good_values[self._PARAM_ECO]
 
                 if self._PARAM_REQUIRED_SHOWERS in good_values:
                     try:
                         self._set_param[self._PARAM_REQUIRED_SHOWERS] = good_values[self._PARAM_REQUIRED_SHOWERS]
-                        self._LOGGER.info('%s New mode %s', self, good_values[self._PARAM_REQUIRED_SHOWERS])
+                        self._LOGGER.info('New mode %s', good_values[self._PARAM_REQUIRED_SHOWERS])
                     except KeyError:
-                        self._LOGGER.warning('%s Unknown or unsupported showers or key error: %s', self,
-                                        good_values[self._PARAM_REQUIRED_SHOWERS])
+                        self._LOGGER.warning('Unknown or unsupported showers or key error: %s',
+                                             good_values[self._PARAM_REQUIRED_SHOWERS])
                         bad_values[self._PARAM_REQUIRED_SHOWERS] = good_values[self._PARAM_REQUIRED_SHOWERS]
 
                 if self._PARAM_REQUIRED_TEMPERATURE in good_values:
                     try:
                         self._set_param[self._PARAM_REQUIRED_TEMPERATURE] = \
                             good_values[self._PARAM_REQUIRED_TEMPERATURE]
-                        self._LOGGER.info('%s New mode %s', self, good_values[self._PARAM_REQUIRED_TEMPERATURE])
+                        self._LOGGER.info('New mode %s', good_values[self._PARAM_REQUIRED_TEMPERATURE])
                     except KeyError:
-                        self._LOGGER.warning('%s Unknown or unsupported set temperature or key error: %s', self,
+                        self._LOGGER.warning('Unknown or unsupported set temperature or key error: %s',
                                              good_values[self._PARAM_REQUIRED_TEMPERATURE])
                         bad_values[self._PARAM_REQUIRED_TEMPERATURE] = good_values[self._PARAM_REQUIRED_TEMPERATURE]
 
@@ -2214,10 +3508,10 @@ class AquaAristonHandler:
                     try:
                         self._set_param[self._PARAM_CLEANSE_TEMPERATURE] = \
                             good_values[self._PARAM_CLEANSE_TEMPERATURE]
-                        self._LOGGER.info('%s New mode %s', self, good_values[self._PARAM_CLEANSE_TEMPERATURE])
+                        self._LOGGER.info('New mode %s', good_values[self._PARAM_CLEANSE_TEMPERATURE])
                     except KeyError:
-                        self._LOGGER.warning('%s Unknown or unsupported antilegionella temperature or key error: %s',
-                                             self, good_values[self._PARAM_CLEANSE_TEMPERATURE])
+                        self._LOGGER.warning('Unknown or unsupported antilegionella temperature or key error: %s',
+                                             good_values[self._PARAM_CLEANSE_TEMPERATURE])
                         bad_values[self._PARAM_CLEANSE_TEMPERATURE] = good_values[self._PARAM_CLEANSE_TEMPERATURE]
 
                 self._set_visible_data()
@@ -2232,11 +3526,11 @@ class AquaAristonHandler:
                     self._timer_set_delay.start()
 
                 if bad_values != {}:
-                    self._LOGGER.warning("{} Following values could not be set: {}".format(self, bad_values))
+                    self._LOGGER.warning("Following values could not be set: %s", bad_values)
                     raise Exception("Following values could not be set: {}".format(bad_values))
 
         else:
-            self._LOGGER.warning("%s No valid data fetched from server to set changes", self)
+            self._LOGGER.warning("No valid data fetched from server to set changes")
             raise Exception("Connection data error, problem to set data")
 
     def _clear_data(self):
@@ -2248,9 +3542,10 @@ class AquaAristonHandler:
         self._ariston_time_prog_data = {}
         self._ariston_use_data = {}
         self._ariston_shower_data = {}
+        self._body_hashes.clear()
         for sensor in self._SENSOR_LIST:
             if sensor in self._ariston_sensors:
-                self._ariston_sensors[sensor][self._VALUE] = None
+                self._ariston_sensors[sensor].value = None
         self._subscribers_sensors_inform()
 
     def start(self) -> None:
@@ -2278,7 +3573,7 @@ class AquaAristonHandler:
                     json={},
                     verify=True)
             except requests.exceptions.RequestException:
-                self._LOGGER.warning('%s Logout error', self)
+                self._LOGGER.warning('Logout error')
         self._session.close()
         self._clear_data()
         self._set_statuses()
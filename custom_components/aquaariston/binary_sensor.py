@@ -1,66 +1,35 @@
 """Suppoort for Ariston Aqua binary sensors."""
 
-from homeassistant.components.binary_sensor import (
-    DEVICE_CLASS_CONNECTIVITY,
-    DEVICE_CLASS_POWER,
-    DEVICE_CLASS_HEAT,
-    DEVICE_CLASS_UPDATE,
-    BinarySensorEntity,
-)
+from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.const import CONF_BINARY_SENSORS, CONF_NAME
 
 import logging
 from datetime import timedelta
 
 from .const import (
+    BINARY_SENSORS,
     DATA_ARISTONAQUA,
     DEVICES,
     VALUE,
-    PARAM_ON,
-    PARAM_HEATING,
-    PARAM_CLEANSE,
-    PARAM_ECO,
     PARAM_UPDATE,
     PARAM_ONLINE,
     PARAM_CHANGING_DATA,
     PARAM_ONLINE_VERSION,
 )
 
-BINARY_SENSOR_ON = "Power"
-BINARY_SENSOR_HEATING = "Heating"
-BINARY_SENSOR_CLEANSE = "Antilegionella"
-BINARY_SENSOR_ECO = "Eco"
-BINARY_SENSOR_ONLINE = "Online"
-BINARY_SENSOR_UPDATE = "Update Available"
-BINARY_SENSOR_CHANGING_DATA = "Changing Data Ongoing"
-
 SCAN_INTERVAL = timedelta(seconds=2)
 
 _LOGGER = logging.getLogger(__name__)
 
-# Binary sensor types are defined like: Name, device class, icon
-BINARY_SENSORS = {
-    PARAM_ONLINE: (BINARY_SENSOR_ONLINE, DEVICE_CLASS_CONNECTIVITY, None),
-    PARAM_CHANGING_DATA: (BINARY_SENSOR_CHANGING_DATA, None, "mdi:cogs"),
-    PARAM_UPDATE: (BINARY_SENSOR_UPDATE, DEVICE_CLASS_UPDATE, None),
-    PARAM_ON: (BINARY_SENSOR_ON, DEVICE_CLASS_POWER, "mdi:power"),
-    PARAM_HEATING: (BINARY_SENSOR_HEATING, DEVICE_CLASS_HEAT, None),
-    PARAM_CLEANSE: (BINARY_SENSOR_CLEANSE, None, "mdi:bacteria-outline"),
-    PARAM_ECO: (BINARY_SENSOR_ECO, None, "mdi:leaf"),
-}
-
-
-def setup_platform(hass, config, add_entities, discovery_info=None):
-    """Set up a binary sensor for Ariston Aqua."""
-    if discovery_info is None:
-        return
 
-    name = discovery_info[CONF_NAME]
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up binary sensors for Ariston Aqua config entry."""
+    name = entry.data[CONF_NAME]
     device = hass.data[DATA_ARISTONAQUA][DEVICES][name]
-    add_entities(
+    async_add_entities(
         [
             AristonAquaBinarySensor(name, device, sensor_type)
-            for sensor_type in discovery_info[CONF_BINARY_SENSORS]
+            for sensor_type in entry.data.get(CONF_BINARY_SENSORS) or []
         ],
         True,
     )
@@ -119,7 +88,7 @@ class AristonAquaBinarySensor(BinarySensorEntity):
         else:
             return (
                 self._api.available
-                and not self._api.sensor_values[self._sensor_type][VALUE] is None
+                and not self._api.snapshot().values[self._sensor_type][VALUE] is None
             )
 
     @property
@@ -129,23 +98,20 @@ class AristonAquaBinarySensor(BinarySensorEntity):
 
     def update(self):
         """Update entity."""
-        try:
-            if self._sensor_type == PARAM_ONLINE:
-                self._state = self._api.available
-            elif self._sensor_type == PARAM_CHANGING_DATA:
-                self._state = self._api.setting_data
-            elif self._sensor_type == PARAM_UPDATE:
-                self._attrs["Installed"] = self._api.version
-                self._state = self._api.sensor_values[self._sensor_type][VALUE]
-                self._attrs["Online"] = self._api.sensor_values[PARAM_ONLINE_VERSION][
-                    VALUE
-                ]
+        if self._sensor_type == PARAM_ONLINE:
+            self._state = self._api.available
+        elif self._sensor_type == PARAM_CHANGING_DATA:
+            self._state = self._api.setting_data
+        elif self._sensor_type == PARAM_UPDATE:
+            values = self._api.snapshot().values
+            self._attrs["Installed"] = self._api.version
+            self._state = values[self._sensor_type][VALUE]
+            self._attrs["Online"] = values[PARAM_ONLINE_VERSION][VALUE]
+        else:
+            if not self._api.available:
+                return
+            value = self._api.snapshot().values[self._sensor_type][VALUE]
+            if not value is None:
+                self._state = value
             else:
-                if not self._api.available:
-                    return
-                if not self._api.sensor_values[self._sensor_type][VALUE] is None:
-                    self._state = self._api.sensor_values[self._sensor_type][VALUE]
-                else:
-                    self._state = False
-        except KeyError:
-            _LOGGER.warning("Problem updating binary_sensors for Ariston Aqua")
+                self._state = False
@@ -0,0 +1,56 @@
+"""Config flow for Ariston Aqua."""
+import voluptuous as vol
+from homeassistant import config_entries
+from homeassistant.const import CONF_NAME, CONF_PASSWORD, CONF_USERNAME
+
+from .const import (
+    DOMAIN,
+    CONF_GW,
+    CONF_TYPE,
+    TYPE_LYDOS,
+    TYPE_LYDOS_HYBRID,
+    TYPE_VELIS,
+)
+
+DEFAULT_NAME = "Aqua Ariston"
+
+USER_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_USERNAME): str,
+        vol.Required(CONF_PASSWORD): str,
+        vol.Required(CONF_TYPE): vol.In([TYPE_LYDOS, TYPE_LYDOS_HYBRID, TYPE_VELIS]),
+        vol.Optional(CONF_NAME, default=DEFAULT_NAME): str,
+        vol.Optional(CONF_GW, default=""): str,
+    }
+)
+
+
+class AquaAristonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+    """Config flow creating one entry per water heater."""
+
+    VERSION = 1
+
+    def _gw_in_use(self, device):
+        """Check if other entry uses the same gateway."""
+        return any(
+            entry.data.get(CONF_GW, "") == device.get(CONF_GW, "")
+            and entry.unique_id != device[CONF_NAME]
+            for entry in self._async_current_entries()
+        )
+
+    async def _async_create_device_entry(self, device):
+        await self.async_set_unique_id(device[CONF_NAME])
+        self._abort_if_unique_id_configured(updates=device)
+        if self._gw_in_use(device):
+            return self.async_abort(reason="duplicate_gw")
+        return self.async_create_entry(title=device[CONF_NAME], data=device)
+
+    async def async_step_import(self, import_config):
+        """Import water heater from YAML configuration."""
+        return await self._async_create_device_entry(dict(import_config))
+
+    async def async_step_user(self, user_input=None):
+        """Add water heater from the user interface."""
+        if user_input is not None:
+            return await self._async_create_device_entry(dict(user_input))
+        return self.async_show_form(step_id="user", data_schema=USER_SCHEMA)
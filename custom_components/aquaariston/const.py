@@ -48,6 +48,8 @@ CONF_POLLING = "polling"
 CONF_LOG = "logging"
 CONF_PATH = "path"
 CONF_GW = "gw"
+CONF_HEDGING = "hedging"
+CONF_FLEET_READ = "fleet_read"
 
 VALUE = "value"
 UNITS = "units"
@@ -57,3 +59,77 @@ DATA_ARISTONAQUA = DOMAIN
 DEVICES = "aqua_devices"
 SERVICE_SET_DATA = "aqua_set_data"
 WATER_HEATERS = "aqua_water_heaters"
+
+# device classes are plain strings, so platform metadata does not import Home Assistant
+DEVICE_CLASS_CONNECTIVITY = "connectivity"
+DEVICE_CLASS_ENERGY = "energy"
+DEVICE_CLASS_HEAT = "heat"
+DEVICE_CLASS_POWER = "power"
+DEVICE_CLASS_TEMPERATURE = "temperature"
+DEVICE_CLASS_UPDATE = "update"
+
+BINARY_SENSOR_ON = "Power"
+BINARY_SENSOR_HEATING = "Heating"
+BINARY_SENSOR_CLEANSE = "Antilegionella"
+BINARY_SENSOR_ECO = "Eco"
+BINARY_SENSOR_ONLINE = "Online"
+BINARY_SENSOR_UPDATE = "Update Available"
+BINARY_SENSOR_CHANGING_DATA = "Changing Data Ongoing"
+
+# Binary sensor types are defined like: Name, device class, icon
+BINARY_SENSORS = {
+    PARAM_ONLINE: (BINARY_SENSOR_ONLINE, DEVICE_CLASS_CONNECTIVITY, None),
+    PARAM_CHANGING_DATA: (BINARY_SENSOR_CHANGING_DATA, None, "mdi:cogs"),
+    PARAM_UPDATE: (BINARY_SENSOR_UPDATE, DEVICE_CLASS_UPDATE, None),
+    PARAM_ON: (BINARY_SENSOR_ON, DEVICE_CLASS_POWER, "mdi:power"),
+    PARAM_HEATING: (BINARY_SENSOR_HEATING, DEVICE_CLASS_HEAT, None),
+    PARAM_CLEANSE: (BINARY_SENSOR_CLEANSE, None, "mdi:bacteria-outline"),
+    PARAM_ECO: (BINARY_SENSOR_ECO, None, "mdi:leaf"),
+}
+
+SENSOR_ERRORS = "Active Errors"
+SENSOR_CURRENT_TEMPERATURE = "Current Temperature"
+SENSOR_REQUIRED_TEMPERATURE = "Required Temperature"
+SENSOR_MODE = "Mode"
+SENSOR_SHOWERS = "Average Showers"
+SENSOR_TIMER = "Time Left to Heat"
+SENSOR_CLEANSE_TEMPERATURE = "Antilegionella Temperature"
+SENSOR_TIME_PROGRAM = "Time Program"
+SENSOR_ENERGY_USE_DAY = "Energy Use in the Last Day"
+SENSOR_ENERGY_USE_WEEK = "Energy Use in the Last Week"
+SENSOR_ENERGY_USE_MONTH = "Energy Use in the Last Month"
+SENSOR_ENERGY_USE_YEAR = "Energy Use in the Last Year"
+SENSOR_REQUIRED_SHOWERS = "Required Showers"
+SENSOR_TEMPERATURE_MODE = "Temperature Mode"
+
+# Sensor types are defined like: Name, units, icon
+SENSORS = {
+    PARAM_ERRORS: [SENSOR_ERRORS, None, "mdi:alert-outline"],
+    PARAM_CURRENT_TEMPERATURE: [SENSOR_CURRENT_TEMPERATURE, DEVICE_CLASS_TEMPERATURE, "mdi:thermometer"],
+    PARAM_REQUIRED_TEMPERATURE: [SENSOR_REQUIRED_TEMPERATURE, DEVICE_CLASS_TEMPERATURE, "mdi:thermometer"],
+    PARAM_MODE: [SENSOR_MODE, None, "mdi:cursor-pointer"],
+    PARAM_SHOWERS: [SENSOR_SHOWERS, None, "mdi:shower-head"],
+    PARAM_TIMER: [SENSOR_TIMER, None, "mdi:timer"],
+    PARAM_CLEANSE_TEMPERATURE: [SENSOR_CLEANSE_TEMPERATURE, DEVICE_CLASS_TEMPERATURE, "mdi:thermometer"],
+    PARAM_TIME_PROGRAM: [SENSOR_TIME_PROGRAM, None, "mdi:calendar-month"],
+    PARAM_ENERGY_USE_DAY: [SENSOR_ENERGY_USE_DAY, DEVICE_CLASS_ENERGY, "mdi:cash"],
+    PARAM_ENERGY_USE_WEEK: [SENSOR_ENERGY_USE_WEEK, DEVICE_CLASS_ENERGY, "mdi:cash"],
+    PARAM_ENERGY_USE_MONTH: [SENSOR_ENERGY_USE_MONTH, DEVICE_CLASS_ENERGY, "mdi:cash"],
+    PARAM_ENERGY_USE_YEAR: [SENSOR_ENERGY_USE_YEAR, DEVICE_CLASS_ENERGY, "mdi:cash"],
+    PARAM_REQUIRED_SHOWERS: [SENSOR_REQUIRED_SHOWERS, None, "mdi:shower-head"],
+    PARAM_TEMPERATURE_MODE: [SENSOR_TEMPERATURE_MODE, None, "mdi:thermometer"],
+}
+
+SWITCH_POWER = "Power"
+SWITCH_ECO = "Eco Mode"
+
+SWITCHES = {
+    PARAM_ON: (SWITCH_POWER, "mdi:power"),
+    PARAM_ECO: (SWITCH_ECO, "mdi:leaf"),
+}
+
+SELECT_MODE = "Boiler Mode"
+
+SELECTS = {
+    PARAM_MODE: (SELECT_MODE, "mdi:water-boiler"),
+}
@@ -0,0 +1,362 @@
+"""
+Standalone daemon running Ariston Aqua handlers without Home Assistant.
+
+Configuration is a YAML file with a list of heaters using the same keys as 'aquaariston' configuration
+of Home Assistant, the list may also be placed under 'aquaariston' key so the same file can be reused.
+Changes of sensors and statuses are published as JSON lines to clients of a local socket or as retained
+MQTT messages when paho-mqtt is installed. Data is set by sending {"name": ..., "set": {...}} line to
+the socket or the JSON dictionary of parameters to '<prefix>/<name>/set' topic.
+
+    python3 daemon.py aquaariston.yaml --socket /run/aquaariston.sock
+    python3 daemon.py aquaariston.yaml --mqtt localhost:1883 --processes 4
+"""
+import os
+import sys
+
+if not __package__:
+    # started as a script from the integration folder, where platform modules such as select.py
+    # would shadow standard library modules, so the folder is searched last; this must be done
+    # before any module importing them, such as socket, is imported
+    _FOLDER = os.path.dirname(os.path.abspath(__file__))
+    sys.path = [path for path in sys.path if os.path.abspath(path or os.curdir) != _FOLDER] + [_FOLDER]
+
+import argparse
+import json
+import logging
+import signal
+import socket
+import threading
+from collections.abc import Mapping
+
+if not __package__:
+    from aristonaqua import AquaAristonHandler
+    from sharding import ShardedAquaAriston
+    from const import (
+        DOMAIN,
+        CONF_MAX_RETRIES,
+        CONF_STORE_CONFIG_FILES,
+        CONF_TYPE,
+        CONF_POLLING,
+        CONF_LOG,
+        CONF_PATH,
+        CONF_GW,
+        CONF_HEDGING,
+        CONF_FLEET_READ,
+        PARAM_CHANGING_DATA,
+        PARAM_ONLINE,
+        TYPE_LYDOS,
+        TYPE_LYDOS_HYBRID,
+        TYPE_VELIS,
+    )
+else:
+    from .aristonaqua import AquaAristonHandler
+    from .sharding import ShardedAquaAriston
+    from .const import (
+        DOMAIN,
+        CONF_MAX_RETRIES,
+        CONF_STORE_CONFIG_FILES,
+        CONF_TYPE,
+        CONF_POLLING,
+        CONF_LOG,
+        CONF_PATH,
+        CONF_GW,
+        CONF_HEDGING,
+        CONF_FLEET_READ,
+        PARAM_CHANGING_DATA,
+        PARAM_ONLINE,
+        TYPE_LYDOS,
+        TYPE_LYDOS_HYBRID,
+        TYPE_VELIS,
+    )
+
+CONF_USERNAME = "username"
+CONF_PASSWORD = "password"
+CONF_NAME = "name"
+CONF_SENSORS = "sensors"
+CONF_BINARY_SENSORS = "binary_sensors"
+CONF_SWITCHES = "switches"
+CONF_SELECTOR = "selector"
+
+DEFAULT_NAME = "Aqua Ariston"
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_POLLING = 1.0
+DEFAULT_LOG = "DEBUG"
+DEFAULT_PATH = "/config/aquaariston_http_data"
+DEFAULT_MQTT_PORT = 1883
+DEFAULT_MQTT_PREFIX = DOMAIN
+
+BOILER_TYPES = [TYPE_LYDOS, TYPE_LYDOS_HYBRID, TYPE_VELIS]
+LOG_LEVELS = ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"]
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _sensor_list(device, key, supported):
+    """Return validated list of sensors under the key, single value is accepted as well."""
+    sensors = device.get(key) or []
+    if not isinstance(sensors, list):
+        sensors = [sensors]
+    for sensor in sensors:
+        if sensor not in supported:
+            raise Exception("Unsupported value in '{}': {}".format(key, sensor))
+    return sensors
+
+
+def heater_config(device: dict) -> tuple:
+    """
+    Validate configuration of one heater with the same keys and defaults as in Home Assistant.
+    Return a tuple of the name and keyword arguments of AquaAristonHandler.
+    """
+    if not isinstance(device, dict):
+        raise Exception("Heater configuration must be a dictionary")
+    for key in (CONF_USERNAME, CONF_PASSWORD, CONF_TYPE):
+        if key not in device:
+            raise Exception("Required key '{}' is missing".format(key))
+    if device[CONF_TYPE] not in BOILER_TYPES:
+        raise Exception("Invalid '{}': {}".format(CONF_TYPE, device[CONF_TYPE]))
+    max_retries = device.get(CONF_MAX_RETRIES, DEFAULT_MAX_RETRIES)
+    if not isinstance(max_retries, int) or not 1 <= max_retries <= 65535:
+        raise Exception("Invalid '{}': {}".format(CONF_MAX_RETRIES, max_retries))
+    polling = device.get(CONF_POLLING, DEFAULT_POLLING)
+    if not isinstance(polling, (int, float)) or not 1 <= polling <= 5:
+        raise Exception("Invalid '{}': {}".format(CONF_POLLING, polling))
+    log_level = device.get(CONF_LOG, DEFAULT_LOG)
+    if log_level not in LOG_LEVELS:
+        raise Exception("Invalid '{}': {}".format(CONF_LOG, log_level))
+
+    supported = {*AquaAristonHandler.api_data()[1], PARAM_ONLINE, PARAM_CHANGING_DATA}
+    sensors = set()
+    for key in (CONF_SENSORS, CONF_BINARY_SENSORS, CONF_SWITCHES, CONF_SELECTOR):
+        sensors.update(_sensor_list(device, key, supported))
+    # some sensors or switches are not part of API
+    sensors.discard(PARAM_ONLINE)
+    sensors.discard(PARAM_CHANGING_DATA)
+
+    return str(device.get(CONF_NAME, DEFAULT_NAME)), dict(
+        username=str(device[CONF_USERNAME]),
+        password=str(device[CONF_PASSWORD]),
+        boiler_type=device[CONF_TYPE],
+        sensors=sorted(sensors),
+        retries=max_retries,
+        polling=float(polling),
+        store_file=bool(device.get(CONF_STORE_CONFIG_FILES, False)),
+        store_folder=str(device.get(CONF_PATH, DEFAULT_PATH)),
+        logging_level=log_level,
+        gw=str(device.get(CONF_GW, "")),
+        hedging=bool(device.get(CONF_HEDGING, False)),
+        fleet_read=bool(device.get(CONF_FLEET_READ, False)),
+    )
+
+
+def load_config(path: str) -> dict:
+    """Load YAML configuration and return dictionary of heater names and handler arguments."""
+    import yaml
+
+    with open(path) as config_file:
+        config = yaml.safe_load(config_file)
+    if isinstance(config, dict):
+        config = config.get(DOMAIN)
+    if isinstance(config, dict):
+        config = [config]
+    if not config or not isinstance(config, list):
+        raise Exception("No heaters configured in {}".format(path))
+    heaters = dict()
+    gateways = set()
+    for device in config:
+        name, handler_config = heater_config(device)
+        if name in heaters:
+            raise Exception("Duplicate value of 'name': {}".format(name))
+        if handler_config["gw"] in gateways:
+            raise Exception("Duplicate value of 'gw': {}".format(handler_config["gw"]))
+        gateways.add(handler_config["gw"])
+        heaters[name] = handler_config
+    return heaters
+
+
+class _Heaters:
+    """Handlers running in this process with the same interface as ShardedAquaAriston."""
+
+    def __init__(self, heaters: dict) -> None:
+        self._handlers = {name: AquaAristonHandler(**config) for name, config in heaters.items()}
+
+    def subscribe_sensors(self, func, *args, **kwargs) -> None:
+        for name, handler in self._handlers.items():
+            handler.subscribe_sensors(self._named, func, name, *args, **kwargs)
+
+    def subscribe_statuses(self, func, *args, **kwargs) -> None:
+        for name, handler in self._handlers.items():
+            handler.subscribe_statuses(self._named, func, name, *args, **kwargs)
+
+    @staticmethod
+    def _named(changed_data, func, name, *args, **kwargs):
+        func(name, {key: dict(value) if isinstance(value, Mapping) else value
+                    for key, value in changed_data.items()}, *args, **kwargs)
+
+    def set_http_data(self, name: str, **parameter_list) -> None:
+        if name not in self._handlers:
+            raise Exception("Unknown heater {}".format(name))
+        self._handlers[name].set_http_data(**parameter_list)
+
+    def start(self) -> None:
+        for handler in self._handlers.values():
+            handler.start()
+
+    def stop(self) -> None:
+        for handler in self._handlers.values():
+            handler.stop()
+
+
+class _SocketPublisher:
+    """Publish changes as JSON lines to clients of a unix socket and accept set commands from them."""
+
+    def __init__(self, path: str, set_data) -> None:
+        self._path = path
+        self._set_data = set_data
+        self._clients = []
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            os.remove(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                break
+            with self._lock:
+                self._clients.append(client)
+            threading.Thread(target=self._read, args=(client,), daemon=True).start()
+
+    def _read(self, client):
+        with client.makefile("r") as lines:
+            for line in lines:
+                try:
+                    command = json.loads(line)
+                    self._set_data(command["name"], **command["set"])
+                except Exception as ex:
+                    _LOGGER.warning('Invalid command %s: %s', line.strip(), ex)
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def publish(self, name: str, kind: str, changed_data: dict) -> None:
+        message = (json.dumps({"name": name, kind: changed_data}, default=str) + "\n").encode()
+        with self._lock:
+            for client in list(self._clients):
+                try:
+                    client.sendall(message)
+                except OSError:
+                    self._clients.remove(client)
+
+    def close(self) -> None:
+        self._server.close()
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients = []
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+class _MqttPublisher:
+    """Publish changes as retained MQTT messages and accept set commands from '<prefix>/<name>/set'."""
+
+    def __init__(self, broker: str, prefix: str, set_data, username: str = "", password: str = "") -> None:
+        try:
+            import paho.mqtt.client as mqtt
+        except ImportError:
+            raise Exception("paho-mqtt is required to publish over MQTT")
+        host, _, port = broker.partition(":")
+        self._prefix = prefix
+        self._set_data = set_data
+        try:
+            self._client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        except AttributeError:
+            # paho-mqtt before 2.0
+            self._client = mqtt.Client()
+        if username:
+            self._client.username_pw_set(username, password)
+        self._client.on_connect = self._on_connect
+        self._client.on_message = self._on_message
+        self._client.connect(host, int(port) if port else DEFAULT_MQTT_PORT)
+        self._client.loop_start()
+
+    def _on_connect(self, client, *args):
+        client.subscribe("{}/+/set".format(self._prefix))
+
+    def _on_message(self, client, userdata, message):
+        name = message.topic[len(self._prefix) + 1:-len("/set")]
+        try:
+            self._set_data(name, **json.loads(message.payload))
+        except Exception as ex:
+            _LOGGER.warning('Invalid command for %s: %s', name, ex)
+
+    def publish(self, name: str, kind: str, changed_data: dict) -> None:
+        for key, value in changed_data.items():
+            self._client.publish("{}/{}/{}".format(self._prefix, name, key),
+                                 json.dumps(value, default=str), retain=True)
+
+    def close(self) -> None:
+        self._client.loop_stop()
+        self._client.disconnect()
+
+
+def main(argv=None) -> int:
+    """Run the daemon until interrupted."""
+    parser = argparse.ArgumentParser(description="Ariston Aqua daemon")
+    parser.add_argument("config", help="YAML file with configuration of heaters")
+    parser.add_argument("--socket", help="unix socket path to publish state")
+    parser.add_argument("--mqtt", help="MQTT broker as host[:port] to publish state")
+    parser.add_argument("--mqtt-prefix", default=DEFAULT_MQTT_PREFIX, help="MQTT topic prefix")
+    parser.add_argument("--mqtt-username", default="", help="MQTT username")
+    parser.add_argument("--mqtt-password", default="", help="MQTT password")
+    parser.add_argument("--processes", type=int, default=1, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    _LOGGER.addHandler(log_handler)
+    _LOGGER.setLevel(logging.INFO)
+    try:
+        heaters_config = load_config(args.config)
+        if args.processes > 1:
+            heaters = ShardedAquaAriston(heaters_config, args.processes)
+        else:
+            heaters = _Heaters(heaters_config)
+        publishers = []
+        if args.socket:
+            publishers.append(_SocketPublisher(args.socket, heaters.set_http_data))
+        if args.mqtt:
+            publishers.append(_MqttPublisher(
+                args.mqtt, args.mqtt_prefix, heaters.set_http_data, args.mqtt_username, args.mqtt_password))
+    except Exception as ex:
+        _LOGGER.error('%s', ex)
+        return 1
+    if not publishers:
+        _LOGGER.warning('Neither socket nor MQTT is configured, state is not published')
+
+    for publisher in publishers:
+        heaters.subscribe_sensors(lambda name, changed, publisher=publisher:
+                                  publisher.publish(name, "sensors", changed))
+        heaters.subscribe_statuses(lambda name, changed, publisher=publisher:
+                                   publisher.publish(name, "statuses", changed))
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    heaters.start()
+    _LOGGER.info('Running %s heaters', len(heaters_config))
+    while not stop.wait(1):
+        pass
+    heaters.stop()
+    for publisher in publishers:
+        publisher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
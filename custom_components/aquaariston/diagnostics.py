@@ -0,0 +1,24 @@
+"""Diagnostics support for Ariston Aqua."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_NAME, CONF_PASSWORD, CONF_USERNAME
+
+from .const import CONF_GW, DATA_ARISTONAQUA, DEVICES
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, CONF_GW}
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Return diagnostics of the water heater, including request circuit breakers and hedging."""
+    diagnostics = {"entry": async_redact_data(dict(entry.data), TO_REDACT)}
+    device = hass.data[DATA_ARISTONAQUA][DEVICES].get(entry.data[CONF_NAME])
+    if device is not None:
+        api = device.api.ariston_api
+        diagnostics.update(
+            {
+                "available": api.available,
+                "version": api.version,
+                "circuit_breakers": api.circuit_breakers,
+                "hedging": api.hedging_stats,
+            }
+        )
+    return diagnostics
@@ -0,0 +1,105 @@
+"""Import of Ariston Aqua energy history into long-term statistics."""
+import logging
+from datetime import datetime, timezone
+from itertools import accumulate
+
+from homeassistant.core import callback
+from homeassistant.util import slugify
+
+from .const import (
+    DOMAIN,
+    PARAM_ENERGY_USE_DAY,
+    PARAM_ENERGY_USE_DAY_PERIODS,
+    PARAM_ENERGY_USE_MONTH,
+    PARAM_ENERGY_USE_MONTH_PERIODS,
+    PARAM_ENERGY_USE_WEEK,
+    PARAM_ENERGY_USE_WEEK_PERIODS,
+    PARAM_ENERGY_USE_YEAR,
+    PARAM_ENERGY_USE_YEAR_PERIODS,
+)
+
+# series of energy history and number of latest periods imported, older periods do not change
+IMPORT_PERIODS = {
+    "day": 48,
+    "week": 14,
+    "month": 62,
+    "year": 24,
+}
+# periods of daily reports are hours, each of them is one row of statistics
+HOURLY_SERIES = "day"
+HOUR = 3600
+
+ENERGY_SENSORS = {
+    PARAM_ENERGY_USE_DAY,
+    PARAM_ENERGY_USE_DAY_PERIODS,
+    PARAM_ENERGY_USE_WEEK,
+    PARAM_ENERGY_USE_WEEK_PERIODS,
+    PARAM_ENERGY_USE_MONTH,
+    PARAM_ENERGY_USE_MONTH_PERIODS,
+    PARAM_ENERGY_USE_YEAR,
+    PARAM_ENERGY_USE_YEAR_PERIODS,
+}
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def statistic_id(name, series=HOURLY_SERIES):
+    """Return external statistic id of the energy use history of the series."""
+    if series == HOURLY_SERIES:
+        return f"{DOMAIN}:energy_{slugify(name)}"
+    return f"{DOMAIN}:energy_{slugify(name)}_{series}"
+
+
+def energy_changed(changed_data, hass, name, api):
+    """Schedule import of statistics when energy use was changed."""
+    if ENERGY_SENSORS & changed_data.keys():
+        hass.add_job(async_import_energy_statistics, hass, name, api)
+
+
+def _series_statistics(series, starts, values):
+    """
+    Return statistics of latest periods of the series, None if periods do not start on whole hours
+    or periods of the hourly series are not exactly one hour long.
+    """
+    first = max(len(starts) - IMPORT_PERIODS[series], 0)
+    imported = starts[first:]
+    if any(start % HOUR for start in imported):
+        return None
+    if series == HOURLY_SERIES and any(later - earlier != HOUR for earlier, later in zip(imported, imported[1:])):
+        return None
+    sums = list(accumulate(values))
+    return [
+        {
+            "start": datetime.fromtimestamp(start, tz=timezone.utc),
+            "state": round(value, 2),
+            "sum": round(total, 2),
+        }
+        for start, value, total in zip(imported, values[first:], sums[first:])
+    ]
+
+
+@callback
+def async_import_energy_statistics(hass, name, api):
+    """Import energy use history of all series as external statistics."""
+    if "recorder" not in hass.config.components:
+        return
+    from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+    for series in IMPORT_PERIODS:
+        starts, values = api.energy_history(series)
+        if len(starts) < 2:
+            continue
+        statistics = _series_statistics(series, starts, values)
+        if statistics is None:
+            _LOGGER.debug("Energy periods of %s %s series are not whole hours, statistics not imported",
+                          name, series)
+            continue
+        metadata = {
+            "has_mean": False,
+            "has_sum": True,
+            "name": f"{name} Energy Use" if series == HOURLY_SERIES else f"{name} Energy Use {series.title()}",
+            "source": DOMAIN,
+            "statistic_id": statistic_id(name, series),
+            "unit_of_measurement": "kWh",
+        }
+        async_add_external_statistics(hass, metadata, statistics)
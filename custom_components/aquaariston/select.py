@@ -5,32 +5,23 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.const import CONF_SELECTOR, CONF_NAME
 
 from .const import (
+    SELECTS,
     DATA_ARISTONAQUA,
     DEVICES,
-    PARAM_MODE,
     VALUE,
 )
 
-SELECT_MODE = "Boiler Mode"
-
 SCAN_INTERVAL = timedelta(seconds=2)
 
-SELECTS = {
-    PARAM_MODE: (SELECT_MODE, "mdi:water-boiler"),
-}
-
-
-def setup_platform(hass, config, add_entities, discovery_info=None):
-    """Set up a select for Ariston."""
-    if discovery_info is None:
-        return
 
-    name = discovery_info[CONF_NAME]
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up selects for Ariston Aqua config entry."""
+    name = entry.data[CONF_NAME]
     device = hass.data[DATA_ARISTONAQUA][DEVICES][name]
-    add_entities(
+    async_add_entities(
         [
             AristonAquaSelect(name, device, select_type)
-            for select_type in discovery_info[CONF_SELECTOR]
+            for select_type in entry.data.get(CONF_SELECTOR) or []
         ],
         True,
     )
@@ -71,21 +62,15 @@ class AristonAquaSelect(SelectEntity):
     @property
     def available(self):
         """Return True if entity is available."""
-        try:
-            return (
-                self._api.available
-                and not self._api.sensor_values[self._select_type][VALUE] is None
-            )
-        except KeyError:
-            return False
+        return (
+            self._api.available
+            and not self._api.snapshot().values[self._select_type][VALUE] is None
+        )
 
     @property
     def current_option(self):
         """Return current option."""
-        try:
-            return self._api.sensor_values[self._select_type][VALUE]
-        except KeyError:
-            return None
+        return self._api.snapshot().values[self._select_type][VALUE]
 
     @property
     def options(self):
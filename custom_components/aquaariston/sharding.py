@@ -0,0 +1,231 @@
+"""
+Multi-process runtime for large fleets of Ariston Aqua water heaters.
+
+Handlers are partitioned across worker processes, so each process has its own interpreter lock and its own
+connection pools. Heaters of the same account always share a worker, so that gateways and plants listing
+of the account are still fetched once for all of them. Workers send changes of sensors and statuses and
+replies to commands to the parent process over a shared queue, the parent sends commands to each worker
+over its own queue. The parent keeps latest values of all heaters and informs subscribers the same way as
+a single handler does.
+"""
+import itertools
+import logging
+import multiprocessing
+import threading
+from typing import Union
+
+try:
+    from .aristonaqua import AquaAristonHandler
+except ImportError:
+    from aristonaqua import AquaAristonHandler
+
+_LOGGER = logging.getLogger(__name__)
+
+_EVENT_SENSORS = "sensors"
+_EVENT_STATUSES = "statuses"
+_EVENT_REPLY = "reply"
+_COMMAND_SET = "set"
+_COMMAND_STOP = "stop"
+
+_STOP_TIMEOUT = 30.
+_REPLY_TIMEOUT = 30.
+
+
+def _send_sensors(changed_data, events, name):
+    """Send changed sensors of the heater to the parent process."""
+    events.put((_EVENT_SENSORS, name, {sensor: dict(record) for sensor, record in changed_data.items()}))
+
+
+def _send_statuses(changed_data, events, name):
+    """Send changed statuses of the heater to the parent process."""
+    events.put((_EVENT_STATUSES, name, dict(changed_data)))
+
+
+def _run_shard(heaters, commands, events, factory):
+    """Run handlers of the shard until stop command is received."""
+    handlers = {}
+    for name, config in heaters.items():
+        handler = factory(**config)
+        handler.subscribe_sensors(_send_sensors, events, name)
+        handler.subscribe_statuses(_send_statuses, events, name)
+        handlers[name] = handler
+    for handler in handlers.values():
+        handler.start()
+    while True:
+        command = commands.get()
+        if command[0] == _COMMAND_STOP:
+            break
+        if command[0] == _COMMAND_SET:
+            _, request_id, name, parameter_list = command
+            error = None
+            try:
+                handlers[name].set_http_data(**parameter_list)
+            except Exception as ex:
+                error = str(ex)
+            events.put((_EVENT_REPLY, request_id, error))
+    for handler in handlers.values():
+        handler.stop()
+
+
+class ShardedAquaAriston:
+    """
+    Ariston Aqua handlers spread across worker processes.
+
+    'heaters' is a dictionary of unique heater names and keyword arguments of AquaAristonHandler.
+    'processes' is number of worker processes, number of CPUs is used by default. Heaters of the same
+    account share a worker, so there are never more workers than accounts.
+    'factory' creates a handler in the worker from keyword arguments of the heater, AquaAristonHandler is used
+    by default. It is passed to worker processes, so it must be picklable, such as a module level function.
+    """
+
+    def __init__(self, heaters: dict, processes: int = 0, factory=AquaAristonHandler) -> None:
+        if not heaters:
+            raise Exception("No heaters to run")
+        if not isinstance(processes, int) or processes < 0:
+            raise Exception("Invalid processes")
+        accounts = dict()
+        for name, config in heaters.items():
+            accounts.setdefault(config.get("username"), []).append(name)
+        processes = min(processes or multiprocessing.cpu_count(), len(accounts))
+
+        self._shards = [dict() for _ in range(processes)]
+        self._shard_of = dict()
+        for index, names in enumerate(accounts.values()):
+            for name in names:
+                self._shards[index % processes][name] = dict(heaters[name])
+                self._shard_of[name] = index % processes
+
+        self._factory = factory
+        self._events = multiprocessing.Queue()
+        self._commands = [multiprocessing.Queue() for _ in range(processes)]
+        self._workers = []
+        self._listener = None
+
+        self._lock = threading.Lock()
+        self._sensor_values = {name: dict() for name in heaters}
+        self._statuses = {name: dict() for name in heaters}
+        self._subscribed = []
+        self._subscribed2 = []
+        self._request_ids = itertools.count()
+        self._replies = dict()
+
+    @property
+    def heaters(self) -> list:
+        """Return names of all heaters."""
+        return list(self._shard_of)
+
+    @property
+    def sensor_values(self) -> dict:
+        """
+        Return dictionary of heater names and dictionaries of their sensors.
+
+        Sensors are in the same format as 'sensor_values' of AquaAristonHandler.
+        """
+        with self._lock:
+            return {name: dict(sensors) for name, sensors in self._sensor_values.items()}
+
+    @property
+    def statuses(self) -> dict:
+        """Return dictionary of heater names and their latest statuses such as 'available'."""
+        with self._lock:
+            return {name: dict(statuses) for name, statuses in self._statuses.items()}
+
+    def available(self, name: str) -> bool:
+        """Return if Ariston's API is responding for the heater."""
+        with self._lock:
+            return self._statuses[name].get('available', False)
+
+    def subscribe_sensors(self, func, *args, **kwargs) -> None:
+        """
+        Subscribe to change of sensors value of any heater.
+
+        Function is called with heater name as a first argument and dictionary of changed sensors as a second.
+        """
+        self._subscribed.append((func, args, kwargs))
+
+    def subscribe_statuses(self, func, *args, **kwargs) -> None:
+        """
+        Subscribe to change of API statuses of any heater.
+
+        Function is called with heater name as a first argument and dictionary of changed statuses as a second.
+        """
+        self._subscribed2.append((func, args, kwargs))
+
+    def set_http_data(self, name: str, **parameter_list: Union[str, int, float, bool]) -> None:
+        """
+        Set data of the heater, parameters are the same as in 'set_http_data' of AquaAristonHandler.
+
+        Waits for the worker to accept the data and raises the same errors as the handler does.
+        """
+        if name not in self._shard_of:
+            raise Exception("Unknown heater {}".format(name))
+        if not self._workers:
+            raise Exception("Workers are not running")
+        request_id = next(self._request_ids)
+        reply = [threading.Event(), None]
+        with self._lock:
+            self._replies[request_id] = reply
+        try:
+            self._commands[self._shard_of[name]].put((_COMMAND_SET, request_id, name, parameter_list))
+            if not reply[0].wait(_REPLY_TIMEOUT):
+                raise Exception("No reply from the worker of {}".format(name))
+        finally:
+            with self._lock:
+                self._replies.pop(request_id, None)
+        if reply[1] is not None:
+            raise Exception(reply[1])
+
+    def _listen(self):
+        """Apply changes received from workers and inform subscribers."""
+        while True:
+            try:
+                event = self._events.get()
+            except (EOFError, OSError):
+                break
+            if event[0] == _COMMAND_STOP:
+                break
+            if event[0] == _EVENT_REPLY:
+                _, request_id, error = event
+                with self._lock:
+                    reply = self._replies.get(request_id)
+                if reply is not None:
+                    reply[1] = error
+                    reply[0].set()
+                continue
+            event_type, name, changed_data = event
+            if event_type == _EVENT_SENSORS:
+                values, subscribed = self._sensor_values, self._subscribed
+            else:
+                values, subscribed = self._statuses, self._subscribed2
+            with self._lock:
+                values[name].update(changed_data)
+            for func, args, kwargs in subscribed:
+                threading.Timer(0, func, args=(name, changed_data, *args), kwargs=kwargs).start()
+
+    def start(self) -> None:
+        """Start worker processes."""
+        if self._workers:
+            return
+        for shard, commands in zip(self._shards, self._commands):
+            worker = multiprocessing.Process(
+                target=_run_shard, args=(shard, commands, self._events, self._factory), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Stop worker processes."""
+        for commands in self._commands:
+            commands.put((_COMMAND_STOP,))
+        for worker in self._workers:
+            worker.join(_STOP_TIMEOUT)
+            if worker.is_alive():
+                _LOGGER.warning('Worker %s did not stop in time', worker.pid)
+                worker.terminate()
+                worker.join(_STOP_TIMEOUT)
+        self._workers = []
+        if self._listener is not None:
+            self._events.put((_COMMAND_STOP,))
+            self._listener.join(_STOP_TIMEOUT)
+            self._listener = None
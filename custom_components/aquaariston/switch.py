@@ -5,35 +5,23 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.const import CONF_SWITCHES, CONF_NAME
 
 from .const import (
+    SWITCHES,
     DATA_ARISTONAQUA,
     DEVICES,
     VALUE,
-    PARAM_ON,
-    PARAM_ECO,
 )
 
-SWITCH_POWER = "Power"
-SWITCH_ECO = "Eco Mode"
-
 SCAN_INTERVAL = timedelta(seconds=2)
 
-SWITCHES = {
-    PARAM_ON: (SWITCH_POWER, "mdi:power"),
-    PARAM_ECO: (SWITCH_ECO, "mdi:leaf"),
-}
-
 
-def setup_platform(hass, config, add_entities, discovery_info=None):
-    """Set up a switches for Ariston Aqua."""
-    if discovery_info is None:
-        return
-
-    name = discovery_info[CONF_NAME]
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up switches for Ariston Aqua config entry."""
+    name = entry.data[CONF_NAME]
     device = hass.data[DATA_ARISTONAQUA][DEVICES][name]
-    add_entities(
+    async_add_entities(
         [
             AristonAquaSwitch(name, device, switch_type)
-            for switch_type in discovery_info[CONF_SWITCHES]
+            for switch_type in entry.data.get(CONF_SWITCHES) or []
         ],
         True,
     )
@@ -74,23 +62,17 @@ class AristonAquaSwitch(SwitchEntity):
     @property
     def available(self):
         """Return True if entity is available."""
-        try:
-            return (
-                self._api.available
-                and not self._api.sensor_values[self._switch_type][VALUE] is None
-            )
-        except KeyError:
-            return False
+        return (
+            self._api.available
+            and not self._api.snapshot().values[self._switch_type][VALUE] is None
+        )
 
     @property
     def is_on(self):
         """Return true if switch is on."""
-        try:
-            if not self._api.available:
-                return False
-            return self._api.sensor_values[self._switch_type][VALUE]
-        except KeyError:
+        if not self._api.available:
             return False
+        return self._api.snapshot().values[self._switch_type][VALUE]
 
     def turn_on(self, **kwargs):
         """Turn the switch on."""
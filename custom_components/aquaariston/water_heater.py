@@ -13,10 +13,12 @@ from homeassistant.const import (
     TEMP_CELSIUS,
     TEMP_FAHRENHEIT,
 )
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DATA_ARISTONAQUA,
     DEVICES,
+    WATER_HEATERS,
     DOMAIN,
     VALUE,
     PARAM_ON,
@@ -35,15 +37,11 @@ SCAN_INTERVAL = timedelta(seconds=2)
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(hass, config, add_entities, discovery_info=None):
-    """Set up the Ariston Aqua water heater devices."""
-    if discovery_info is None:
-        return
-
-    name = discovery_info[CONF_NAME]
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up the Ariston Aqua water heater for config entry."""
+    name = entry.data[CONF_NAME]
     device = hass.data[DATA_ARISTONAQUA][DEVICES][name]
-
-    add_entities([AristonAquaWaterHeater(name, device)])
+    async_add_entities([AristonAquaWaterHeater(name, device)])
 
 
 class AristonAquaWaterHeater(WaterHeaterEntity):
@@ -52,8 +50,17 @@ class AristonAquaWaterHeater(WaterHeaterEntity):
     def __init__(self, name, device):
         """Initialize the thermostat."""
         self._name = name
+        self._device = device
         self._api = device.api.ariston_api
 
+    async def async_added_to_hass(self):
+        """Index the entity for the set data service."""
+        self.hass.data[DATA_ARISTONAQUA][WATER_HEATERS][self.entity_id] = self._device
+
+    async def async_will_remove_from_hass(self):
+        """Remove the entity from the set data service index."""
+        self.hass.data[DATA_ARISTONAQUA][WATER_HEATERS].pop(self.entity_id, None)
+
     @property
     def unique_id(self):
         """Return the unique ID for this thermostat."""
@@ -68,11 +75,8 @@ class AristonAquaWaterHeater(WaterHeaterEntity):
     def icon(self):
         """Return the name of the Water Heater device."""
         power_on = False
-        try:
-            if self._api.available:
-                power_on = self._api.sensor_values[PARAM_ON][VALUE]
-        except KeyError:
-            return "mdi:water-pump-off"
+        if self._api.available:
+            power_on = self._api.snapshot().values[PARAM_ON][VALUE]
         if power_on:
             return "mdi:water-pump"
         else:
@@ -96,11 +100,7 @@ class AristonAquaWaterHeater(WaterHeaterEntity):
     @property
     def current_temperature(self):
         """Return the temperature"""
-        try:
-            current_temp = self._api.sensor_values[PARAM_CURRENT_TEMPERATURE][VALUE]
-        except KeyError:
-            return None
-        return current_temp
+        return self._api.snapshot().values[PARAM_CURRENT_TEMPERATURE][VALUE]
 
     @property
     def temperature_unit(self):
@@ -128,11 +128,7 @@ class AristonAquaWaterHeater(WaterHeaterEntity):
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        try:
-            target_temp = self._api.sensor_values[PARAM_REQUIRED_TEMPERATURE][VALUE]
-        except KeyError:
-            return UNKNOWN_TEMP
-        return target_temp
+        return self._api.snapshot().values[PARAM_REQUIRED_TEMPERATURE][VALUE]
 
     @property
     def target_temperature_step(self):
@@ -150,14 +146,20 @@ class AristonAquaWaterHeater(WaterHeaterEntity):
             step = self._api.supported_sensors_set_values[PARAM_REQUIRED_TEMPERATURE]["step"]
         except KeyError:
             step = 1.0
-        try:
-            if self._api.sensor_values[PARAM_HEATING][VALUE]:
-                action = ACTION_HEATING
-            else:
-                action = ACTION_IDLE
-        except KeyError:
+        if self._api.snapshot().values[PARAM_HEATING][VALUE]:
+            action = ACTION_HEATING
+        else:
             action = ACTION_IDLE
-        return {"target_temp_step": step, "hvac_action": action}
+        attributes = {"target_temp_step": step, "hvac_action": action}
+        estimate = self._api.temperature_estimate
+        if estimate is not None:
+            attributes["estimated_temperature"], attributes["estimate_confidence"] = estimate
+        next_event = self._api.next_program_event
+        if next_event is not None:
+            attributes["program_setpoint"] = self._api.current_program_setpoint
+            attributes["next_program_time"] = dt_util.utc_from_timestamp(next_event[0]).isoformat()
+            attributes["next_program_setpoint"] = next_event[1]
+        return attributes
 
     @property
     def operation_list(self):
@@ -171,11 +173,7 @@ class AristonAquaWaterHeater(WaterHeaterEntity):
     @property
     def current_operation(self):
         """Return current operation"""
-        try:
-            current_op = self._api.sensor_values[PARAM_MODE][VALUE]
-        except KeyError:
-            return VAL_OFFLINE
-        return current_op
+        return self._api.snapshot().values[PARAM_MODE][VALUE]
 
     def set_temperature(self, **kwargs):
         """Set new target temperature."""
@@ -0,0 +1 @@
+"""Tests of Ariston Aqua library."""
@@ -0,0 +1,31 @@
+"""Common fixtures of tests, the library is imported from the integration folder."""
+import os
+import sys
+
+import pytest
+
+# the folder is searched last, so that platform modules such as select.py do not shadow standard library
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "aquaariston"))
+
+from tests.simulator import SimulatedApi  # noqa: E402
+
+
+@pytest.fixture
+def api():
+    """Simulated Ariston API with two plants of the same account."""
+    return SimulatedApi(plants=("ABC123", "DEF456"))
+
+
+@pytest.fixture
+def make_handler(api, tmp_path):
+    """Return function creating started handlers connected to the simulated API."""
+    from aristonaqua import AquaAristonHandler
+
+    def _make_handler(plant_id="ABC123", boiler_type="lydos", sensors=("current_temperature", "mode"), **kwargs):
+        handler = AquaAristonHandler(
+            "user", "password", boiler_type, sensors=list(sensors), store_folder=str(tmp_path), **kwargs)
+        handler._session = api.session(plant_id)
+        handler._started = True
+        return handler
+
+    return _make_handler
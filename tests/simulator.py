@@ -0,0 +1,141 @@
+"""
+Local simulator of Ariston API used by tests and benchmarks.
+
+Sessions of the simulator replace 'requests' sessions of handlers, each session is logged in to one plant.
+Replies are built from the state kept per plant, so tests and benchmarks may change it between requests.
+"""
+import json
+import threading
+import time
+from collections import Counter, deque
+
+BASE_URL = "https://www.ariston-net.remotethermo.com"
+
+MAIN_DATA = {
+    "mode": 1,
+    "on": True,
+    "temp": 41,
+    "reqTemp": 50,
+    "avShw": 2,
+    "heatReq": True,
+    "antiLeg": False,
+    "eco": False,
+    "rmTm": 30,
+}
+CLEANSE_DATA = {
+    "MedMaxSetpointTemperature": 70,
+    "MedMaxSetpointTemperatureMin": 40,
+    "MedMaxSetpointTemperatureMax": 80,
+}
+SHOWERS_DATA = {"reqShw": 2, "maxReqShw": 4}
+TIME_PROGRAM_DATA = {
+    "plan": [{"days": [1, 2, 3, 4, 5], "shws": [{"time": "06:00", "temp": 55}, {"time": "22:00", "temp": 40}]}]
+}
+REPORTS_DATA = [{"v": [1.0, 2.0, 0.5]}, {"v": [3, 4]}, {"v": [5]}, {"v": [6, 7]}]
+VERSION_DATA = {"info": {"version": "1.0.0"}}
+
+
+class SimulatedResponse:
+    """Reply with the attributes of 'requests' response used by the library."""
+
+    def __init__(self, url, status_code=200, content=b"{}"):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class SimulatedApi:
+    """
+    Ariston API of one account.
+
+    'main' holds main data of each plant, 'listing' is the reply of plants listing, 'latency' delays each
+    reply unless 'delays' holds delays of the next replies, 'requests' counts requests by path.
+    """
+
+    def __init__(self, plants=("ABC123",), latency=0.):
+        self.main = {plant: dict(MAIN_DATA) for plant in plants}
+        self.listing = [{"gw": plant, "name": plant} for plant in plants]
+        self.latency = latency
+        self.delays = deque()
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def session(self, plant_id):
+        """Return session logged in to the plant."""
+        return SimulatedSession(self, plant_id)
+
+    def reply(self, method, url, plant_id, data=None):
+        path = url[len(BASE_URL):].split("?")[0] if url.startswith(BASE_URL) else url
+        with self._lock:
+            self.requests[path] += 1
+        try:
+            delay = self.delays.popleft()
+        except IndexError:
+            delay = self.latency
+        if delay:
+            time.sleep(delay)
+        if method == "post":
+            if "/Account/Login" in path:
+                return SimulatedResponse(BASE_URL + "/R2/Plant/Index/" + plant_id + "?x=1")
+            if path.endswith("/mode") and data:
+                self.main[plant_id]["mode"] = data["new"]
+            elif path.endswith("/temperature") and data:
+                self.main[plant_id]["reqTemp"] = data["new"]
+            elif path.endswith("/switch"):
+                self.main[plant_id]["on"] = data
+            return SimulatedResponse(url)
+        if path == "/api/v2/velis/plants":
+            body = self.listing
+        elif path.endswith("/plantSettings"):
+            body = CLEANSE_DATA
+        elif path.startswith("/api/v2/busErrors"):
+            body = []
+        elif path.startswith("/api/v2/velis/timeProgs/"):
+            body = TIME_PROGRAM_DATA
+        elif path.startswith("/api/v2/velis/reports/"):
+            body = REPORTS_DATA
+        elif path.startswith("/api/v2/velis/plantData/"):
+            body = SHOWERS_DATA
+        elif path.endswith("PlantData/" + plant_id):
+            body = self.main[plant_id]
+        elif "pypi" in url:
+            body = VERSION_DATA
+        else:
+            return SimulatedResponse(url, 404, b"")
+        return SimulatedResponse(url, 200, json.dumps(body).encode())
+
+
+class SimulatedSession:
+    """Session of the simulated API with the interface of 'requests' session used by the library."""
+
+    def __init__(self, api, plant_id):
+        self.api = api
+        self._plant_id = plant_id
+
+    def get(self, url, **kwargs):
+        return self.api.reply("get", url, self._plant_id)
+
+    def post(self, url, json=None, **kwargs):
+        return self.api.reply("post", url, self._plant_id, json)
+
+    def close(self):
+        pass
+
+
+def simulated_handler(plant_id="ABC123", **config):
+    """
+    Return handler connected to its own simulated API, used as factory of the sharded runtime.
+    'plant_id' selects the plant the session is logged in to, other arguments are passed to the handler.
+    """
+    from aristonaqua import AquaAristonHandler
+
+    handler = AquaAristonHandler(**config)
+    handler._session = SimulatedApi(plants=(plant_id,)).session(plant_id)
+    return handler
@@ -0,0 +1,37 @@
+"""Tests of aggregation of energy reports of all horizons."""
+import random
+
+import pytest
+
+import aristonaqua
+from aristonaqua import _aggregate_energy
+
+REPORTS = [{"v": [1.0, 2.0, 0.5]}, {"v": [3, 4]}, {"v": []}]
+
+
+def aggregate_without_numpy(monkeypatch, reports, horizons=4):
+    with monkeypatch.context() as patch:
+        patch.setattr(aristonaqua, "_numpy", lambda: None)
+        return _aggregate_energy(reports, horizons)
+
+
+def test_horizons_aggregated(monkeypatch):
+    day, week, month, year = aggregate_without_numpy(monkeypatch, REPORTS)
+    assert day["total"] == 3.5
+    assert list(day["periods"].values()) == [1.0, 2.0, 0.5]
+    assert day["deltas"] == [0., 1.0, -1.5]
+    assert day["running_sums"] == [1.0, 3.0, 3.5]
+    assert week["total"] == 7
+    assert week["deltas"] == [0., 1]
+    assert month == {"total": 0, "periods": {}, "deltas": [], "running_sums": []}
+    assert year is None
+
+
+def test_numpy_matches_plain_python(monkeypatch):
+    pytest.importorskip("numpy")
+    values = random.Random(0)
+    for _ in range(50):
+        reports = [{"v": [round(values.uniform(0, 3), 3) for _ in range(length)]} for length in (24, 7, 31, 0)]
+        for horizons in (4, 5):
+            assert _aggregate_energy(reports, horizons) == aggregate_without_numpy(monkeypatch, reports, horizons)
+    assert _aggregate_energy(REPORTS) == aggregate_without_numpy(monkeypatch, REPORTS)
@@ -0,0 +1,71 @@
+"""Tests of discovery of endpoints supported by the heater model."""
+import pytest
+
+from aristonaqua import _Capabilities
+
+REQUEST_TYPES = {"main", "errors", "showers"}
+
+
+@pytest.fixture
+def capabilities(tmp_path):
+    def _capabilities(model="lydos_ABC123"):
+        return _Capabilities(str(tmp_path), "aquaariston_ABC123_", model, set(REQUEST_TYPES))
+    return _capabilities
+
+
+def test_all_endpoints_probed_initially(capabilities):
+    discovered = capabilities()
+    assert discovered.probing == REQUEST_TYPES
+    assert not discovered.supported
+    assert not discovered.unsupported
+
+
+def test_unsupported_after_consecutive_rejects(capabilities):
+    discovered = capabilities()
+    for _ in range(_Capabilities.MIN_REJECTS - 1):
+        assert not discovered.record("showers", False)
+    assert "showers" in discovered.probing
+    assert discovered.record("showers", False)
+    assert discovered.unsupported == {"showers"}
+    assert "showers" not in discovered.probing
+
+
+def test_success_resets_rejects(capabilities):
+    discovered = capabilities()
+    for _ in range(_Capabilities.MIN_REJECTS - 1):
+        discovered.record("showers", False)
+    assert not discovered.record("showers", True)
+    assert discovered.supported == {"showers"}
+    for _ in range(_Capabilities.MIN_REJECTS - 1):
+        assert not discovered.record("showers", False)
+    assert discovered.supported == {"showers"}
+
+
+def test_result_stored_for_same_model(capabilities):
+    discovered = capabilities()
+    discovered.record("main", True)
+    for _ in range(_Capabilities.MIN_REJECTS):
+        discovered.record("showers", False)
+    reloaded = capabilities()
+    assert reloaded.supported == {"main"}
+    assert reloaded.unsupported == {"showers"}
+    assert reloaded.probing == {"errors"}
+    assert reloaded.probed == discovered.probed
+
+
+def test_model_change_probes_again(capabilities):
+    discovered = capabilities()
+    discovered.record("main", True)
+    reloaded = capabilities(model="velis_ABC123")
+    assert reloaded.probing == REQUEST_TYPES
+
+
+def test_unsupported_probed_again_after_interval(capabilities):
+    discovered = capabilities()
+    for _ in range(_Capabilities.MIN_REJECTS):
+        discovered.record("showers", False)
+    assert discovered.reprobe(discovered.probed + 60.) == set()
+    timestamp = discovered.probed + _Capabilities.REPROBE
+    assert discovered.reprobe(timestamp) == {"showers"}
+    assert "showers" in discovered.probing
+    assert discovered.reprobe(timestamp + 60.) == set()
@@ -0,0 +1,54 @@
+"""Tests of per-endpoint circuit breaker."""
+import pytest
+
+import aristonaqua
+from aristonaqua import _CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.]
+    monkeypatch.setattr(aristonaqua.time, "time", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_failures(clock):
+    breaker = _CircuitBreaker(threshold=3, backoff=10., max_backoff=100., jitter=0.)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == _CircuitBreaker.STATE_CLOSED
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == _CircuitBreaker.STATE_OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_after_backoff_and_closes_on_success(clock):
+    breaker = _CircuitBreaker(threshold=1, backoff=10., max_backoff=100., jitter=0.)
+    breaker.record_failure()
+    clock[0] += 10.
+    assert breaker.allow_request()
+    assert breaker.state == _CircuitBreaker.STATE_HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == _CircuitBreaker.STATE_CLOSED
+    assert breaker.diagnostics()["failures"] == 0
+
+
+def test_backoff_doubles_up_to_maximum(clock):
+    breaker = _CircuitBreaker(threshold=1, backoff=10., max_backoff=25., jitter=0.)
+    retries = []
+    for _ in range(3):
+        breaker.record_failure()
+        retries.append(breaker.diagnostics()["retry_in"])
+        clock[0] += retries[-1]
+        assert breaker.allow_request()
+    assert retries == [10., 20., 25.]
+
+
+def test_can_request_does_not_change_state(clock):
+    breaker = _CircuitBreaker(threshold=1, backoff=10., max_backoff=100., jitter=0.)
+    breaker.record_failure()
+    assert not breaker.can_request()
+    clock[0] += 10.
+    assert breaker.can_request()
+    assert breaker.state == _CircuitBreaker.STATE_OPEN
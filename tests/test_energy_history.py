@@ -0,0 +1,63 @@
+"""Tests of long term energy history."""
+import time
+
+import pytest
+
+from aristonaqua import _EnergyHistory
+
+# tuesday 3rd of March 2026, 10:30 local time
+FETCHED = time.mktime((2026, 3, 3, 10, 30, 0, 0, 0, -1))
+
+
+def local(year, month, day, hour=0):
+    return int(time.mktime((year, month, day, hour, 0, 0, 0, 0, -1)))
+
+
+@pytest.fixture
+def history(tmp_path):
+    return _EnergyHistory(str(tmp_path), "ABC123_")
+
+
+def test_day_is_split_into_local_hours():
+    starts = _EnergyHistory.period_starts("day", 12, FETCHED)
+    assert starts[-1] == local(2026, 3, 3, 10)
+    assert starts[0] == local(2026, 3, 2, 12)
+    assert len(starts) == 12
+
+
+def test_month_periods_are_local_days_for_any_month_length():
+    for count in (28, 31):
+        starts = _EnergyHistory.period_starts("month", count, FETCHED)
+        assert starts[-1] == local(2026, 3, 3)
+        assert starts[-2] == local(2026, 3, 2)
+        assert len(starts) == count
+
+
+def test_year_periods_are_local_months():
+    starts = _EnergyHistory.period_starts("year", 12, FETCHED)
+    assert starts[-1] == local(2026, 3, 1)
+    assert starts[-3] == local(2026, 1, 1)
+    assert starts[0] == local(2025, 4, 1)
+
+
+def test_newer_report_replaces_overlapping_periods(history):
+    history.merge("week", [1, 2, 3, 4, 5, 6, 7], FETCHED)
+    history.merge("week", [2, 3, 4, 5, 6, 7, 10], FETCHED + 86400)
+    starts, values = history.history("week")
+    assert len(starts) == 8
+    assert list(starts) == sorted(set(starts))
+    assert values == (1., 2., 3., 4., 5., 6., 7., 10.)
+
+
+def test_energy_use_between_moments(history):
+    history.merge("week", [1, 2, 3, 4, 5, 6, 7], FETCHED)
+    assert history.energy_use("week", local(2026, 3, 1), local(2026, 3, 4)) == 6. + 7. + 5.
+    assert history.energy_use("week", 0, FETCHED) == 28.
+    assert history.energy_use("week", FETCHED, FETCHED + 86400) == 0.
+
+
+def test_history_is_reloaded(tmp_path, history):
+    history.merge("month", list(range(30)), FETCHED)
+    reloaded = _EnergyHistory(str(tmp_path), "ABC123_")
+    assert reloaded.history("month") == history.history("month")
+    assert reloaded.energy_use("month", 0, FETCHED) == sum(range(30))
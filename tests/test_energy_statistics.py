@@ -0,0 +1,50 @@
+"""Tests of energy history rows imported into long-term statistics, Home Assistant is required."""
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.aquaariston.energy_statistics import (  # noqa: E402
+    IMPORT_PERIODS,
+    _series_statistics,
+    statistic_id,
+)
+
+START = int(datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp())
+HOUR = 3600
+
+
+def test_hourly_rows_with_running_sum():
+    starts = [START + HOUR * index for index in range(3)]
+    rows = _series_statistics("day", starts, [1.0, 0.5, 0.25])
+    assert [row["start"] for row in rows] == [datetime.fromtimestamp(start, tz=timezone.utc) for start in starts]
+    assert [row["state"] for row in rows] == [1.0, 0.5, 0.25]
+    assert [row["sum"] for row in rows] == [1.0, 1.5, 1.75]
+
+
+def test_only_latest_periods_imported_with_sums_of_whole_history():
+    count = IMPORT_PERIODS["day"] + 10
+    rows = _series_statistics("day", [START + HOUR * index for index in range(count)], [1.0] * count)
+    assert len(rows) == IMPORT_PERIODS["day"]
+    assert rows[0]["sum"] == 11.
+    assert rows[-1]["sum"] == count
+
+
+def test_hourly_series_needs_single_hours():
+    assert _series_statistics("day", [START, START + 2 * HOUR, START + 4 * HOUR], [1., 2., 3.]) is None
+
+
+def test_periods_must_start_on_whole_hours():
+    assert _series_statistics("week", [START + 1800, START + 1800 + 24 * HOUR], [1., 2.]) is None
+
+
+def test_daily_and_monthly_series_imported():
+    rows = _series_statistics("week", [START + 24 * HOUR * index for index in range(7)], [2.] * 7)
+    assert rows[-1]["sum"] == 14.
+    assert _series_statistics("year", [START, START + 31 * 24 * HOUR], [10., 20.])[-1]["sum"] == 30.
+
+
+def test_statistic_ids():
+    assert statistic_id("Aqua Ariston") == "aquaariston:energy_aqua_ariston"
+    assert statistic_id("Aqua Ariston", "month") == "aquaariston:energy_aqua_ariston_month"
@@ -0,0 +1,46 @@
+"""Tests of reading main data of all plants of the account from the plants listing."""
+import pytest
+
+import aristonaqua
+
+MAIN_PATH = "/api/v2/velis/medPlantData/"
+LISTING_PATH = "/api/v2/velis/plants"
+
+
+@pytest.fixture(autouse=True)
+def clear_fleet_cache():
+    aristonaqua._FLEET_CACHE.clear()
+    yield
+    aristonaqua._FLEET_CACHE.clear()
+
+
+def test_main_data_fetched_when_listing_lacks_values(api, make_handler):
+    handler = make_handler(fleet_read=True)
+    assert handler._get_http_data(handler._REQUEST_GET_MAIN)
+    assert handler._get_http_data(handler._REQUEST_GET_MAIN)
+    assert api.requests[MAIN_PATH + "ABC123"] == 2
+    assert api.requests[LISTING_PATH] == 1
+
+
+def test_listing_shared_by_handlers_of_account(api, make_handler):
+    handlers = [make_handler(plant_id, fleet_read=True) for plant_id in ("ABC123", "DEF456")]
+    for handler in handlers:
+        assert handler._get_http_data(handler._REQUEST_GET_MAIN)
+    for plant in api.listing:
+        plant.update(api.main[plant["gw"]], temp=48)
+    for handler in handlers:
+        assert handler._get_http_data(handler._REQUEST_GET_MAIN)
+    assert api.requests[LISTING_PATH] == 1
+    assert api.requests[MAIN_PATH + "ABC123"] == 1
+    assert api.requests[MAIN_PATH + "DEF456"] == 1
+    for handler in handlers:
+        assert handler._ariston_main_data["temp"] == 48
+        assert handler._ariston_main_data["reqTemp"] == 50
+
+
+def test_main_data_fetched_without_fleet_read(api, make_handler):
+    handler = make_handler()
+    assert handler._get_http_data(handler._REQUEST_GET_MAIN)
+    assert handler._get_http_data(handler._REQUEST_GET_MAIN)
+    assert api.requests[MAIN_PATH + "ABC123"] == 2
+    assert api.requests[LISTING_PATH] == 0
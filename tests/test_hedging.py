@@ -0,0 +1,93 @@
+"""Tests of hedged requests of main data against delayed replies of the simulator."""
+import time
+
+import pytest
+import requests
+
+MAIN_PATH = "/api/v2/velis/medPlantData/ABC123"
+HTTP_TIMEOUT = 2.
+
+
+class FailingSession:
+    """Session whose requests fail with the given errors after the given delays."""
+
+    def __init__(self, *failures):
+        self._failures = list(failures)
+
+    def get(self, url, **kwargs):
+        delay, error = self._failures.pop(0)
+        time.sleep(delay)
+        raise error
+
+
+@pytest.fixture
+def handler(make_handler):
+    """Logged in handler with hedging after 0.1 s."""
+    handler = make_handler(hedging=True)
+    handler._login_session()
+    handler._HEDGE_MIN_DELAY = 0.1
+    handler._main_latencies.extend([0.01] * handler._HEDGE_SAMPLES)
+    return handler
+
+
+def hedged_get(handler):
+    return handler._hedged_get(handler._endpoint_urls[handler._REQUEST_GET_MAIN], HTTP_TIMEOUT)
+
+
+def test_second_request_wins(api, handler):
+    api.delays.extend([1., 0.])
+    started = time.time()
+    reply = hedged_get(handler)
+    assert reply.json()["temp"] == 41
+    assert time.time() - started < 1.
+    assert api.requests[MAIN_PATH] == 2
+    assert handler._hedge_stats == {"requests": 1, "hedged": 1, "hedge_won": 1}
+    # latency is measured from the first request
+    assert handler._main_latencies[-1] >= 0.1
+
+
+def test_fast_reply_is_not_hedged(api, handler):
+    hedged_get(handler)
+    assert api.requests[MAIN_PATH] == 1
+    assert handler._hedge_stats == {"requests": 1, "hedged": 0, "hedge_won": 0}
+
+
+def test_both_requests_fail(handler):
+    handler._session = FailingSession(
+        (0.3, requests.exceptions.ConnectionError("first")), (0., requests.exceptions.ConnectionError("second")))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        hedged_get(handler)
+    assert handler._hedge_stats["hedged"] == 1
+
+
+def test_unexpected_error_is_raised(handler):
+    handler._main_latencies.clear()
+    handler._session = FailingSession((0., ValueError("unexpected")))
+    with pytest.raises(ValueError):
+        hedged_get(handler)
+
+
+def test_reply_waits_up_to_timeout(api, handler):
+    handler._main_latencies.clear()
+    api.delays.append(HTTP_TIMEOUT + 2.)
+    started = time.time()
+    with pytest.raises(requests.exceptions.Timeout):
+        hedged_get(handler)
+    assert time.time() - started < HTTP_TIMEOUT + 1.
+
+
+def test_hedging_limited_among_recent_requests(api, handler):
+    limit = int(handler._HEDGE_SAMPLES * handler._HEDGE_MAX_RATIO)
+    for _ in range(limit + 3):
+        handler._main_latencies.extend([0.01] * handler._HEDGE_SAMPLES)
+        api.delays.extend([0.2, 0.2])
+        hedged_get(handler)
+    assert handler._hedge_stats["hedged"] == limit
+    # cap is released once hedged requests leave the window
+    api.delays.clear()
+    for _ in range(handler._HEDGE_SAMPLES):
+        hedged_get(handler)
+    handler._main_latencies.extend([0.01] * handler._HEDGE_SAMPLES)
+    api.delays.extend([0.2, 0.])
+    hedged_get(handler)
+    assert handler._hedge_stats["hedged"] == limit + 1
@@ -0,0 +1,25 @@
+"""Tests of modules imported with the library."""
+import os
+import subprocess
+import sys
+
+FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "aquaariston")
+
+
+def imported_modules(code):
+    """Return modules imported by a fresh interpreter after running the code."""
+    script = "import sys\nsys.path.append({!r})\n{}\nprint(' '.join(sys.modules))".format(FOLDER, code)
+    return set(subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout.split())
+
+
+def test_import_does_not_load_heavy_modules():
+    modules = imported_modules("import aristonaqua, const")
+    assert "requests" not in modules
+    assert "numpy" not in modules
+    assert "homeassistant" not in modules
+
+
+def test_requests_imported_with_first_handler():
+    modules = imported_modules("import aristonaqua\naristonaqua.AquaAristonHandler('user', 'password', 'lydos')")
+    assert "requests" in modules
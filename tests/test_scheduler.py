@@ -0,0 +1,57 @@
+"""Tests of scheduling of requests by freshness deadlines."""
+from aristonaqua import _DeadlineScheduler
+
+
+def test_new_jobs_are_due_immediately_then_after_max_age():
+    scheduler = _DeadlineScheduler()
+    scheduler.add("main", 40.)
+    assert "main" in scheduler
+    assert scheduler.next(1000.) == "main"
+    assert scheduler.next(1001.) is None
+    assert scheduler.next(1039.) is None
+    assert scheduler.next(1040.) == "main"
+
+
+def test_most_overdue_weighted_job_is_picked():
+    scheduler = _DeadlineScheduler()
+    scheduler.add("main", 40.)
+    scheduler.add("errors", 600.)
+    scheduler.done("main", 0.)
+    scheduler.done("errors", 0.)
+    # main is 20 s overdue of 40 s, errors 60 s overdue of 600 s
+    assert scheduler.next(660.) == "main"
+    scheduler.add("showers", 600., weight=10.)
+    scheduler.done("showers", 0.)
+    assert scheduler.next(660.) == "showers"
+    assert scheduler.next(660.) == "errors"
+    assert scheduler.next(660.) is None
+
+
+def test_job_not_allowed_stays_due():
+    scheduler = _DeadlineScheduler()
+    scheduler.add("main", 40.)
+    scheduler.add("errors", 600.)
+    assert scheduler.next(0., allowed=lambda job: job != "main") == "errors"
+    assert scheduler.next(1., allowed=lambda job: False) is None
+    assert scheduler.next(2.) == "main"
+
+
+def test_done_postpones_deadline():
+    scheduler = _DeadlineScheduler()
+    scheduler.add("main", 40.)
+    assert scheduler.next(0.) == "main"
+    scheduler.done("main", 30.)
+    assert scheduler.next(40.) is None
+    assert scheduler.next(70.) == "main"
+
+
+def test_removed_job_is_not_picked():
+    scheduler = _DeadlineScheduler()
+    scheduler.add("main", 40.)
+    scheduler.add("errors", 600.)
+    scheduler.remove("main")
+    assert "main" not in scheduler
+    assert scheduler.next(0.) == "errors"
+    assert scheduler.next(1000.) == "errors"
+    scheduler.done("main", 0.)
+    assert scheduler.next(5000.) == "errors"
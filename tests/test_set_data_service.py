@@ -0,0 +1,98 @@
+"""Tests of the service setting data of targeted water heaters, Home Assistant is required."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.exceptions import ServiceValidationError  # noqa: E402
+
+import custom_components.aquaariston as integration  # noqa: E402
+from custom_components.aquaariston.const import (  # noqa: E402
+    DATA_ARISTONAQUA,
+    DOMAIN,
+    SERVICE_SET_DATA,
+    WATER_HEATERS,
+)
+
+
+class FakeHandler:
+    """Handler recording settings, failing with the given error if any."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self._error = error
+
+    def set_http_data(self, **parameter_list):
+        self.calls.append(parameter_list)
+        if self._error is not None:
+            raise Exception(self._error)
+
+
+class FakeServices:
+    def __init__(self):
+        self.handlers = {}
+
+    def async_register(self, domain, service, handler, **kwargs):
+        self.handlers[(domain, service)] = handler
+
+
+class FakeHass:
+    """Minimal Home Assistant with services and executor jobs."""
+
+    def __init__(self):
+        self.data = {}
+        self.services = FakeServices()
+
+    def async_add_executor_job(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def call_service(monkeypatch, handlers, entity_ids, **data):
+    """Set up the integration, call its service targeting the entities and return the response."""
+    hass = FakeHass()
+    selected = SimpleNamespace(referenced=set(entity_ids), indirectly_referenced=set())
+    monkeypatch.setattr(integration, "async_extract_referenced_entity_ids", lambda hass, call: selected)
+
+    async def run():
+        await integration.async_setup(hass, {})
+        hass.data[DATA_ARISTONAQUA][WATER_HEATERS].update({
+            entity_id: SimpleNamespace(api=SimpleNamespace(ariston_api=handler))
+            for entity_id, handler in handlers.items()
+        })
+        service = hass.services.handlers[(DOMAIN, SERVICE_SET_DATA)]
+        return await service(SimpleNamespace(data=data))
+
+    return asyncio.run(run())
+
+
+def test_data_sent_to_all_targets(monkeypatch):
+    handlers = {"water_heater.kitchen": FakeHandler(), "water_heater.bathroom": FakeHandler()}
+    response = call_service(
+        monkeypatch, handlers, [*handlers, "light.kitchen"], required_temperature=45, mode="")
+    assert response == {"results": {
+        "water_heater.bathroom": {"success": True},
+        "water_heater.kitchen": {"success": True},
+    }}
+    for handler in handlers.values():
+        assert handler.calls == [{"required_temperature": "45"}]
+
+
+def test_result_reported_per_heater(monkeypatch):
+    handlers = {
+        "water_heater.kitchen": FakeHandler(),
+        "water_heater.bathroom": FakeHandler("Following values could not be set"),
+    }
+    response = call_service(monkeypatch, handlers, handlers, eco="On")
+    assert response["results"]["water_heater.kitchen"] == {"success": True}
+    assert response["results"]["water_heater.bathroom"] == {
+        "success": False, "error": "Following values could not be set"}
+    assert handlers["water_heater.kitchen"].calls == [{"eco": "on"}]
+
+
+def test_no_target_is_rejected(monkeypatch):
+    handlers = {"water_heater.kitchen": FakeHandler()}
+    with pytest.raises(ServiceValidationError):
+        call_service(monkeypatch, handlers, ["light.kitchen"], eco="on")
+    assert not handlers["water_heater.kitchen"].calls
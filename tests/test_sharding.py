@@ -0,0 +1,110 @@
+"""Tests of the sharded runtime running workers against the local simulator."""
+import time
+
+import pytest
+
+import sharding
+from sharding import ShardedAquaAriston
+from tests.simulator import simulated_handler
+
+
+def wait_until(predicate, timeout=15.):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def unresponsive_handler(**config):
+    """Handler never replying to settings."""
+    handler = simulated_handler(**config)
+    handler.set_http_data = lambda **parameter_list: time.sleep(5)
+    return handler
+
+
+def stuck_handler(**config):
+    """Handler blocking its worker on stop."""
+    handler = simulated_handler(**config)
+    handler.stop = lambda: time.sleep(30)
+    return handler
+
+
+@pytest.fixture
+def heaters(tmp_path):
+    def heater(username, plant_id):
+        return dict(
+            username=username, password="password", boiler_type="lydos", plant_id=plant_id,
+            sensors=["current_temperature", "required_temperature"], store_folder=str(tmp_path / plant_id))
+    return {
+        "kitchen": heater("first", "ABC123"),
+        "bathroom": heater("first", "DEF456"),
+        "garage": heater("second", "GHI789"),
+    }
+
+
+@pytest.fixture
+def runtime():
+    started = []
+
+    def _runtime(*args, **kwargs):
+        sharded = ShardedAquaAriston(*args, **kwargs)
+        sharded.start()
+        started.append(sharded)
+        return sharded
+
+    yield _runtime
+    for sharded in started:
+        sharded.stop()
+
+
+def test_heaters_of_account_share_worker(heaters):
+    sharded = ShardedAquaAriston(heaters, processes=4)
+    assert len(sharded._shards) == 2
+    assert sharded._shard_of["kitchen"] == sharded._shard_of["bathroom"] != sharded._shard_of["garage"]
+    assert sorted(sharded.heaters) == ["bathroom", "garage", "kitchen"]
+    assert len(ShardedAquaAriston(heaters, processes=1)._shards) == 1
+
+
+def test_set_reply_routed_to_heater(heaters, runtime):
+    sharded = runtime(heaters, processes=2, factory=simulated_handler)
+    assert wait_until(lambda: all(sharded.available(name) for name in sharded.heaters))
+    sharded.set_http_data("bathroom", required_temperature=45)
+    assert wait_until(lambda: sharded.sensor_values["bathroom"]["required_temperature"]["value"] == 45)
+    assert sharded.sensor_values["kitchen"]["required_temperature"]["value"] == 50
+    with pytest.raises(Exception, match="could not be set"):
+        sharded.set_http_data("garage", required_temperature=100)
+    with pytest.raises(Exception, match="Unknown heater"):
+        sharded.set_http_data("attic", required_temperature=45)
+    assert not sharded._replies
+
+
+def test_set_without_reply_times_out(heaters, runtime, monkeypatch):
+    monkeypatch.setattr(sharding, "_REPLY_TIMEOUT", 0.3)
+    sharded = runtime(heaters, processes=1, factory=unresponsive_handler)
+    with pytest.raises(Exception, match="No reply"):
+        sharded.set_http_data("kitchen", required_temperature=45)
+    assert not sharded._replies
+
+
+def test_stop_ends_workers(heaters):
+    sharded = ShardedAquaAriston(heaters, processes=2, factory=simulated_handler)
+    sharded.start()
+    workers = list(sharded._workers)
+    sharded.stop()
+    assert not any(worker.is_alive() for worker in workers)
+    assert sharded._listener is None
+    with pytest.raises(Exception, match="not running"):
+        sharded.set_http_data("kitchen", required_temperature=45)
+
+
+def test_stop_terminates_stuck_worker(heaters, monkeypatch):
+    monkeypatch.setattr(sharding, "_STOP_TIMEOUT", 0.5)
+    sharded = ShardedAquaAriston(heaters, processes=1, factory=stuck_handler)
+    sharded.start()
+    worker = sharded._workers[0]
+    started = time.monotonic()
+    sharded.stop()
+    assert time.monotonic() - started < 10
+    assert not worker.is_alive()
@@ -0,0 +1,67 @@
+"""Tests of deduplication of identical calls in progress."""
+import threading
+
+import pytest
+
+from aristonaqua import _SingleFlight
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_callers_share_one_call():
+    single_flight = _SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow_call():
+        calls.append(1)
+        release.wait(5)
+        return "data"
+
+    def caller():
+        results.append(single_flight.do(("_get_main", "ABC123"), slow_call))
+
+    timer = threading.Timer(0.5, release.set)
+    timer.start()
+    run_concurrently(5, caller)
+    assert len(calls) == 1
+    assert results == ["data"] * 5
+    assert single_flight.joined == 4
+
+
+def test_exception_is_shared():
+    single_flight = _SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing_call():
+        release.wait(5)
+        raise ValueError("failed")
+
+    def caller():
+        try:
+            single_flight.do("key", failing_call)
+        except ValueError as ex:
+            errors.append(str(ex))
+
+    threading.Timer(0.5, release.set).start()
+    run_concurrently(3, caller)
+    assert errors == ["failed"] * 3
+
+
+def test_sequential_and_different_calls_are_not_joined():
+    single_flight = _SingleFlight()
+    assert single_flight.do("a", lambda: 1) == 1
+    assert single_flight.do("a", lambda: 2) == 2
+    assert single_flight.do("b", lambda value: value, 3) == 3
+    assert single_flight.joined == 0
+    with pytest.raises(KeyError):
+        single_flight.do("a", dict().__getitem__, "missing")
+    assert single_flight.do("a", lambda: 4) == 4
@@ -0,0 +1,55 @@
+"""Tests of thermal model of the water tank."""
+import pytest
+
+from aristonaqua import _ThermalModel
+
+
+def heated_model():
+    model = _ThermalModel()
+    for minute in range(5):
+        model.update(minute * 60., 40. + minute, True, 60)
+    return model
+
+
+def test_heating_rate_is_learnt():
+    model = heated_model()
+    assert model.heating_rate == pytest.approx(1 / 60)
+    assert model.estimate(300.) == pytest.approx(45.)
+
+
+def test_estimate_does_not_exceed_target():
+    assert heated_model().estimate(3600.) == 60
+
+
+def test_standby_loss_is_learnt():
+    model = _ThermalModel()
+    for minute in range(5):
+        model.update(minute * 600., 50. - minute * 0.1, False)
+    assert model.loss_rate == pytest.approx(0.1 / 600)
+    assert model.estimate(3000.) == pytest.approx(49.5)
+
+
+def test_remaining_time_gives_heating_rate_before_observations():
+    model = _ThermalModel()
+    model.update(0., 40., True, 50, "00:10")
+    assert model.heating_rate == pytest.approx(10 / 600)
+
+
+def test_confidence():
+    model = _ThermalModel()
+    assert model.estimate(0.) is None
+    model.update(0., 40., True, 60)
+    assert model.confidence(0.) == 0.
+    model = heated_model()
+    assert 0. < model.confidence(300.) <= 1.
+    assert model.confidence(600.) < model.confidence(300.)
+    # heating is about to stop near target
+    assert model.confidence(240. + 19 * 60) == 0.
+
+
+def test_copy_is_independent():
+    model = heated_model()
+    copy = model.copy()
+    model.update(300., 30., False)
+    assert copy.temp == 44.
+    assert copy.estimate(300.) == pytest.approx(45.)
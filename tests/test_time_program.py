@@ -0,0 +1,46 @@
+"""Tests of compiled time program."""
+import time
+
+from aristonaqua import _TimeProgram
+
+PROGRAM = {
+    "plan": [
+        {"days": [1, 2, 3, 4, 5], "shws": [{"time": "06:00", "temp": 55}, {"time": "22:00", "temp": 40}]},
+        {"days": [0, 6], "shws": [{"time": "08:30", "temp": 50}]},
+    ]
+}
+
+
+def local(day, hour, minute=0):
+    """Local timestamp in the week starting with sunday 18th of October 2026."""
+    return time.mktime((2026, 10, 18 + day, hour, minute, 0, 0, 0, -1))
+
+
+def test_events_are_sorted_by_week_minute():
+    program = _TimeProgram(PROGRAM)
+    assert len(program) == 12
+    assert program.minutes == sorted(program.minutes)
+    assert program.minutes[0] == 8 * 60 + 30
+
+
+def test_current_setpoint():
+    program = _TimeProgram(PROGRAM)
+    assert program.current(local(1, 10)) == 55
+    assert program.current(local(1, 23)) == 40
+    # before first event of the week last event of previous week applies
+    assert program.current(local(0, 7)) == 50
+
+
+def test_previous_and_next_event():
+    program = _TimeProgram(PROGRAM)
+    assert program.previous_event(local(1, 10, 15)) == (local(1, 6), 55)
+    assert program.next_event(local(1, 10, 15)) == (local(1, 22), 40)
+    # saturday evening is followed by sunday morning of next week
+    assert program.next_event(local(6, 20)) == (local(7, 8, 30), 50)
+    assert program.previous_event(local(0, 7)) == (local(-1, 8, 30), 50)
+
+
+def test_empty_program():
+    program = _TimeProgram({"plan": []})
+    assert program.current(local(1, 10)) is None
+    assert program.next_event(local(1, 10)) is None